@@ -62,3 +62,22 @@ log_data = {
     "port": port,
 }
 print(json.dumps(log_data))
+
+
+# ---------------------------------------------------------------------------
+# ? Workers share metrics through files in METRICS_DIR, see src/core/metrics.py
+def on_starting(server):
+    from src.core.config import settings
+    from src.core.metrics import metrics_registry
+
+    # ? Metrics of the previous run must not be summed into this one
+    if settings.METRICS_ENABLED:
+        metrics_registry.reset()
+
+
+def child_exit(server, worker):
+    from src.core.config import settings
+    from src.core.metrics import metrics_registry
+
+    if settings.METRICS_ENABLED:
+        metrics_registry.mark_process_dead(worker.pid)
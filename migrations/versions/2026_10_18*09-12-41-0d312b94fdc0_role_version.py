@@ -0,0 +1,28 @@
+"""role version
+
+Revision ID: 0d312b94fdc0
+Revises: 82c3f9850f1d
+Create Date: 2026-10-18 09:12:41.503127
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0d312b94fdc0"
+down_revision: Union[str, None] = "82c3f9850f1d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "role",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("role", "version")
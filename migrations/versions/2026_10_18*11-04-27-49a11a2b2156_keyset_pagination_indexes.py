@@ -0,0 +1,64 @@
+"""keyset pagination indexes
+
+Revision ID: 49a11a2b2156
+Revises: 0d312b94fdc0
+Create Date: 2026-10-18 11:04:27.918342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "49a11a2b2156"
+down_revision: Union[str, None] = "0d312b94fdc0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    "ability",
+    "agent",
+    "agent_ability",
+    "agent_location",
+    "capital_transfer",
+    "card",
+    "contract",
+    "credit",
+    "crypto",
+    "fee",
+    "important_data",
+    "invoice",
+    "location",
+    "merchant",
+    "news",
+    "organization",
+    "permission",
+    "pos",
+    "position_request",
+    "role",
+    "role_permission",
+    "terminal",
+    "ticket",
+    "ticket_message",
+    "transaction",
+    "user",
+    "user_crypto",
+    "user_message",
+    "verify_phone",
+    "wallet",
+)
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(
+            f"ix_{table}_created_at_id",
+            table,
+            ["created_at", "id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_created_at_id", table_name=table)
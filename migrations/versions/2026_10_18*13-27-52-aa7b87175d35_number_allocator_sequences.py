@@ -0,0 +1,33 @@
+"""number allocator sequences
+
+Revision ID: aa7b87175d35
+Revises: 49a11a2b2156
+Create Date: 2026-10-18 13:27:52.160448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "aa7b87175d35"
+down_revision: Union[str, None] = "49a11a2b2156"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ? Sequences of src.utils.number_allocator, every value is one reserved block
+SEQUENCES = (
+    "ticket_number_seq",
+    "invoice_icart_number_seq",
+    "verify_phone_code_seq",
+)
+
+
+def upgrade() -> None:
+    for name in SEQUENCES:
+        op.execute(f"CREATE SEQUENCE IF NOT EXISTS {name} MINVALUE 0 START 0")
+
+
+def downgrade() -> None:
+    for name in SEQUENCES:
+        op.execute(f"DROP SEQUENCE IF EXISTS {name}")
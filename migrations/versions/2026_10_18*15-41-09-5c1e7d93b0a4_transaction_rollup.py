@@ -0,0 +1,109 @@
+"""transaction rollup
+
+Revision ID: 5c1e7d93b0a4
+Revises: aa7b87175d35
+Create Date: 2026-10-18 15:41:09.318274
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from src.core.config import settings
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e7d93b0a4"
+down_revision: Union[str, None] = "aa7b87175d35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ? Same aggregation as TransactionRollupCRUD.rebuild
+BACKFILL = """
+INSERT INTO transaction_rollup (
+    id, wallet_id, period, period_start, value_type,
+    in_total, in_count, out_total, out_count
+)
+SELECT
+    gen_random_uuid(), wallet_id, CAST(:period AS rollupperiod),
+    date_trunc(:field, created_at, :timezone), value_type,
+    sum(in_value), sum(in_count), sum(out_value), sum(out_count)
+FROM (
+    SELECT receiver_id AS wallet_id, value_type, created_at,
+        value AS in_value, 1 AS in_count, 0.0 AS out_value, 0 AS out_count
+    FROM transaction
+    UNION ALL
+    SELECT transferor_id, value_type, created_at, 0.0, 0, value, 1
+    FROM transaction
+) AS entry
+GROUP BY wallet_id, date_trunc(:field, created_at, :timezone), value_type
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transaction_rollup",
+        sa.Column(
+            "period",
+            sa.Enum("DAY", "MONTH", name="rollupperiod"),
+            nullable=False,
+        ),
+        sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "value_type",
+            sa.Enum("CASH", "CREDIT", name="transactionvaluetype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("in_total", sa.Float(), nullable=False),
+        sa.Column("in_count", sa.Integer(), nullable=False),
+        sa.Column("out_total", sa.Float(), nullable=False),
+        sa.Column("out_count", sa.Integer(), nullable=False),
+        sa.Column("wallet_id", sa.UUID(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallet.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "wallet_id",
+            "period",
+            "period_start",
+            "value_type",
+            name="uq_transaction_rollup_bucket",
+        ),
+    )
+    op.create_index(
+        op.f("ix_transaction_rollup_id"),
+        "transaction_rollup",
+        ["id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_transaction_rollup_created_at_id",
+        "transaction_rollup",
+        ["created_at", "id"],
+    )
+
+    for period in ("DAY", "MONTH"):
+        op.execute(
+            sa.text(BACKFILL).bindparams(
+                period=period,
+                field=period.lower(),
+                timezone=settings.ROLLUP_TIMEZONE,
+            ),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_transaction_rollup_created_at_id",
+        table_name="transaction_rollup",
+    )
+    op.drop_index(op.f("ix_transaction_rollup_id"), table_name="transaction_rollup")
+    op.drop_table("transaction_rollup")
+    sa.Enum(name="rollupperiod").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,143 @@
+"""lookup indexes
+
+Revision ID: e3b6a1f0c7d2
+Revises: 5c1e7d93b0a4
+Create Date: 2026-10-18 16:58:33.702915
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3b6a1f0c7d2"
+down_revision: Union[str, None] = "5c1e7d93b0a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ? Unique indexes of id, the primary key already covers them
+ID_INDEX_TABLES = (
+    "ability",
+    "agent",
+    "agent_ability",
+    "agent_location",
+    "capital_transfer",
+    "card",
+    "contract",
+    "credit",
+    "crypto",
+    "fee",
+    "important_data",
+    "invoice",
+    "location",
+    "merchant",
+    "news",
+    "organization",
+    "permission",
+    "pos",
+    "position_request",
+    "role",
+    "role_permission",
+    "terminal",
+    "ticket",
+    "ticket_message",
+    "transaction",
+    "transaction_rollup",
+    "user",
+    "user_crypto",
+    "user_message",
+    "verify_phone",
+    "wallet",
+)
+
+# ? name, table, columns, partial index condition
+INDEXES = (
+    (
+        "ix_transaction_receiver_id_created_at",
+        "transaction",
+        ["receiver_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_transaction_transferor_id_created_at",
+        "transaction",
+        ["transferor_id", "created_at", "id"],
+        None,
+    ),
+    ("ix_card_wallet_id_created_at", "card", ["wallet_id", "created_at", "id"], None),
+    ("ix_wallet_user_id", "wallet", ["user_id"], None),
+    (
+        "ix_capital_transfer_receiver_id_created_at",
+        "capital_transfer",
+        ["receiver_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_ticket_creator_id_created_at",
+        "ticket",
+        ["creator_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_user_message_user_id_created_at",
+        "user_message",
+        ["user_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_user_message_user_id_unread",
+        "user_message",
+        ["user_id", "created_at", "id"],
+        "status IS NOT true",
+    ),
+    (
+        "ix_position_request_next_approve_user_id_created_at",
+        "position_request",
+        ["next_approve_user_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_position_request_requester_user_id_created_at",
+        "position_request",
+        ["requester_user_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_position_request_creator_id_created_at",
+        "position_request",
+        ["creator_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_position_request_admin_queue",
+        "position_request",
+        ["created_at", "id"],
+        "next_approve_user_id IS NULL AND status = 'OPEN'",
+    ),
+)
+
+
+def upgrade() -> None:
+    # ? Build indexes without blocking writes of hot tables
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+            )
+
+    for table in ID_INDEX_TABLES:
+        op.drop_index(f"ix_{table}_id", table_name=table)
+
+
+def downgrade() -> None:
+    for table in ID_INDEX_TABLES:
+        op.create_index(f"ix_{table}_id", table, ["id"], unique=True)
+
+    for name, table, _, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,24 @@
+"""terminal invoice unique
+
+Revision ID: 9a4f2c6e81b3
+Revises: e3b6a1f0c7d2
+Create Date: 2026-10-18 18:06:14.227591
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4f2c6e81b3"
+down_revision: Union[str, None] = "e3b6a1f0c7d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_terminal_invoice_id", "terminal", ["invoice_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_terminal_invoice_id", table_name="terminal")
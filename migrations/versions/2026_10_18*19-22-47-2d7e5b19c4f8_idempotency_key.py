@@ -0,0 +1,64 @@
+"""idempotency key
+
+Revision ID: 2d7e5b19c4f8
+Revises: 9a4f2c6e81b3
+Create Date: 2026-10-18 19:22:47.615830
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "2d7e5b19c4f8"
+down_revision: Union[str, None] = "9a4f2c6e81b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_key",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PROCESSING", "COMPLETED", name="idempotencystatus"),
+            nullable=False,
+        ),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("response_status", sa.Integer(), nullable=True),
+        sa.Column(
+            "response_headers",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+        sa.Column("response_body", sa.LargeBinary(), nullable=True),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("scope", "key", name="uq_idempotency_key_scope_key"),
+    )
+    op.create_index(
+        "ix_idempotency_key_created_at_id",
+        "idempotency_key",
+        ["created_at", "id"],
+    )
+    op.create_index("ix_idempotency_key_expires_at", "idempotency_key", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_key_expires_at", table_name="idempotency_key")
+    op.drop_index("ix_idempotency_key_created_at_id", table_name="idempotency_key")
+    op.drop_table("idempotency_key")
+    sa.Enum(name="idempotencystatus").drop(op.get_bind(), checkfirst=True)
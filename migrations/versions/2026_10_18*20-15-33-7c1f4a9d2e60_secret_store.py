@@ -0,0 +1,80 @@
+"""secret store
+
+Revision ID: 7c1f4a9d2e60
+Revises: 2d7e5b19c4f8
+Create Date: 2026-10-18 20:15:33.418026
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f4a9d2e60"
+down_revision: Union[str, None] = "2d7e5b19c4f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ? Codes are kept in the secret store, pending codes are dropped
+    op.drop_index("ix_user_one_time_password", table_name="user")
+    op.drop_column("user", "one_time_password")
+    op.drop_column("user", "expiration_password_at")
+    op.drop_column("card", "dynamic_password")
+    op.drop_column("card", "dynamic_password_exp")
+    op.drop_table("verify_phone")
+    op.execute("DROP SEQUENCE IF EXISTS verify_phone_code_seq")
+
+
+def downgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS verify_phone_code_seq MINVALUE 0 START 0")
+    op.create_table(
+        "verify_phone",
+        sa.Column("phone_number", sa.String(), nullable=False),
+        sa.Column("verify_code", sa.Integer(), nullable=False),
+        sa.Column("expiration_code_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_verify_phone_phone_number",
+        "verify_phone",
+        ["phone_number"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_verify_phone_verify_code",
+        "verify_phone",
+        ["verify_code"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_verify_phone_created_at_id",
+        "verify_phone",
+        ["created_at", "id"],
+    )
+    op.add_column(
+        "card",
+        sa.Column("dynamic_password_exp", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column("card", sa.Column("dynamic_password", sa.Integer(), nullable=True))
+    op.add_column(
+        "user",
+        sa.Column("expiration_password_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column("user", sa.Column("one_time_password", sa.Integer(), nullable=True))
+    op.create_index(
+        "ix_user_one_time_password",
+        "user",
+        ["one_time_password"],
+        unique=False,
+    )
@@ -0,0 +1,49 @@
+"""location path
+
+Revision ID: 3f8b6d0a5c21
+Revises: 7c1f4a9d2e60
+Create Date: 2026-10-18 21:03:48.650213
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8b6d0a5c21"
+down_revision: Union[str, None] = "7c1f4a9d2e60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# ? Same format as src.location.tree.build_path
+BACKFILL = """
+WITH RECURSIVE tree AS (
+    SELECT id, replace(id::text, '-', '') || '.' AS path
+    FROM location
+    WHERE parent_id IS NULL
+    UNION ALL
+    SELECT child.id, tree.path || replace(child.id::text, '-', '') || '.'
+    FROM location AS child
+    JOIN tree ON child.parent_id = tree.id
+)
+UPDATE location
+SET path = tree.path
+FROM tree
+WHERE location.id = tree.id
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "location",
+        sa.Column("path", sa.String(collation="C"), nullable=True),
+    )
+    op.execute(BACKFILL)
+    op.alter_column("location", "path", nullable=False)
+    op.create_index("ix_location_path", "location", ["path"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_location_path", table_name="location")
+    op.drop_column("location", "path")
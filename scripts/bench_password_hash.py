@@ -0,0 +1,181 @@
+"""
+! Password hashing benchmark
+
+Measures bcrypt hash/verify cost and how PasswordHasher behaves under
+concurrent logins, to tune PASSWORD_HASH_ROUNDS, PASSWORD_HASH_WORKERS and
+PASSWORD_HASH_MAX_PENDING. For every worker count it reports login
+throughput & latency, rejected (busy) logins and the lag of the event loop,
+which is what every other request of the worker waits for.
+
+Run from the repository root with the application environment (.env):
+
+    python -m scripts.bench_password_hash --workers 1 2 4 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from src.core.config import settings
+from src.core.security import PasswordHasher, pwd_context
+from src.exception import ServerIsBusyException
+
+# ---------------------------------------------------------------------------
+PASSWORD = "correct horse battery staple"
+# ? Interval of event loop probe in seconds
+PROBE_INTERVAL = 0.01
+# ? Rejected clients retry after this many seconds, like a real client
+REJECT_BACKOFF = 0.05
+
+
+# ---------------------------------------------------------------------------
+def _percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.1f}ms"
+
+
+# ---------------------------------------------------------------------------
+def bench_single(repeat: int) -> None:
+    """
+    ! Cost of one hash & verify on the current thread
+    """
+    hashed = pwd_context.hash(PASSWORD)
+    for name, function in (
+        ("hash", lambda: pwd_context.hash(PASSWORD)),
+        ("verify", lambda: pwd_context.verify(PASSWORD, hashed)),
+    ):
+        durations = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            function()
+            durations.append(time.perf_counter() - started_at)
+        print(
+            f"{name:<8} rounds={settings.PASSWORD_HASH_ROUNDS}"
+            f"  mean={_ms(statistics.mean(durations))}"
+            f"  max={_ms(max(durations))}",
+        )
+
+
+# ---------------------------------------------------------------------------
+async def _probe_loop(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started_at - PROBE_INTERVAL)
+
+
+async def bench_logins(
+    *,
+    workers: int,
+    max_pending: int,
+    concurrency: int,
+    logins: int,
+) -> None:
+    """
+    ! Concurrent logins through PasswordHasher
+
+    Parameters
+    ----------
+    workers
+        Number of hashing threads
+    max_pending
+        Maximum number of running & waiting calls
+    concurrency
+        Number of clients that log in at the same time
+    logins
+        Total number of logins
+    """
+    hasher = PasswordHasher(workers=workers, max_pending=max_pending)
+    hashed = pwd_context.hash(PASSWORD)
+    latencies: list[float] = []
+    lags: list[float] = []
+    rejected = 0
+    remaining = logins
+
+    async def client() -> None:
+        nonlocal rejected, remaining
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            try:
+                await hasher.verify(PASSWORD, hashed)
+            except ServerIsBusyException:
+                rejected += 1
+                await asyncio.sleep(REJECT_BACKOFF)
+                continue
+            latencies.append(time.perf_counter() - started_at)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_loop(lags, stop))
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await probe
+    hasher.shutdown()
+
+    print(
+        f"workers={workers:<3} max_pending={max_pending:<4}"
+        f" concurrency={concurrency:<4}"
+        f" {len(latencies) / elapsed:7.1f} logins/s"
+        f"  rejected={rejected:<5}"
+        f" latency p50={_ms(_percentile(latencies, 50))}"
+        f" p95={_ms(_percentile(latencies, 95))}"
+        f"  loop lag p50={_ms(_percentile(lags, 50))}"
+        f" p99={_ms(_percentile(lags, 99))}"
+        f" max={_ms(max(lags, default=0.0))}",
+    )
+
+
+# ---------------------------------------------------------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[settings.PASSWORD_HASH_WORKERS],
+        help="hashing thread counts to compare",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=settings.PASSWORD_HASH_MAX_PENDING,
+        help="maximum running & waiting hashes",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="clients that log in at the same time",
+    )
+    parser.add_argument("--logins", type=int, default=200, help="total logins")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="repeats of single hash & verify",
+    )
+    args = parser.parse_args()
+
+    bench_single(repeat=args.repeat)
+    for workers in args.workers:
+        asyncio.run(
+            bench_logins(
+                workers=workers,
+                max_pending=args.max_pending,
+                concurrency=args.concurrency,
+                logins=args.logins,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
 from sqlalchemy import or_, select
 
 from src import deps
@@ -13,7 +13,9 @@ from src.ability.schema import (
     AbilityRead,
     AbilityUpdate,
 )
-from src.agent.crud import agent as agent_crud
+from src.agent.crud import update_auto_data_in_background
+from src.core.response_cache import response_cache
+from src.database.pagination import Page
 from src.schema import DeleteResponse, IDRequest
 from src.user.models import User
 
@@ -28,6 +30,7 @@ async def delete_ability(
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     delete_data: IDRequest,
+    background_tasks: BackgroundTasks,
 ) -> DeleteResponse:
     """
     ! Delete Ability
@@ -40,6 +43,8 @@ async def delete_ability(
         Requester user object
     delete_data
         Ability id
+    background_tasks
+        Tasks run after response
 
     Returns
     -------
@@ -54,8 +59,9 @@ async def delete_ability(
     await ability_crud.verify_existence(db=db, ability_id=delete_data.id)
     # * Delete Ability
     await ability_crud.delete(db=db, item_id=delete_data.id)
-    # ? Update All Agent interest_rates and is_main field
-    await agent_crud.update_auto_data(db=db)
+    response_cache.invalidate("ability")
+    # ? Update All Agent interest_rates and is_main field after response
+    background_tasks.add_task(update_auto_data_in_background)
 
     return DeleteResponse(result="Ability Deleted Successfully")
 
@@ -67,6 +73,7 @@ async def create_ability(
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     create_data: AbilityCreate,
+    background_tasks: BackgroundTasks,
 ) -> AbilityRead:
     """
     ! Create New Ability
@@ -79,6 +86,8 @@ async def create_ability(
         Requester user object
     create_data
         Necessary data for create ability
+    background_tasks
+        Tasks run after response
 
     Returns
     -------
@@ -93,8 +102,9 @@ async def create_ability(
     await ability_crud.verify_duplicate_name(db=db, name=create_data.name)
     # * Create Ability
     ability = await ability_crud.create(db=db, obj_in=create_data)
-    # ? Update All Agent interest_rates and is_main field
-    await agent_crud.update_auto_data(db=db)
+    response_cache.invalidate("ability")
+    # ? Update All Agent interest_rates and is_main field after response
+    background_tasks.add_task(update_auto_data_in_background)
 
     return ability
 
@@ -146,6 +156,7 @@ async def update_ability(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    response_cache.invalidate("ability")
 
     return ability
 
@@ -189,12 +200,14 @@ async def find_ability(
 @router.get(path="/list", response_model=List[AbilityRead])
 async def get_ability_list(
     *,
+    request: Request,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     filter_data: AbilityFilter,
     skip: int = 0,
     limit: int = 20,
-) -> List[AbilityRead]:
+    cursor: str | None = None,
+) -> Response:
     """
     ! Find All Ability
 
@@ -208,6 +221,8 @@ async def get_ability_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -217,28 +232,42 @@ async def get_ability_list(
         List of ability
 
     """
-    # * Prepare filter fields
-    filter_data.name = (
-        Ability.name.contains(filter_data.name) if filter_data.name else False
-    )
-    # * Add filter fields
-    query = select(Ability).filter(
-        or_(
-            filter_data.return_all,
-            filter_data.name,
-        ),
+
+    async def load_page() -> Page:
+        # * Prepare filter fields
+        filter_data.name = (
+            Ability.name.contains(filter_data.name) if filter_data.name else False
+        )
+        # * Add filter fields
+        query = select(Ability).filter(
+            or_(
+                filter_data.return_all,
+                filter_data.name,
+            ),
+        )
+        # * Prepare order fields
+        if filter_data.order_by:
+            for field in filter_data.order_by.desc:
+                # * Add filter fields
+                if field == AbilityFilterOrderFild.name:
+                    query = query.order_by(Ability.name.desc())
+            for field in filter_data.order_by.asc:
+                # * Add filter fields
+                if field == AbilityFilterOrderFild.name:
+                    query = query.order_by(Ability.name.asc())
+        # * Find All ability with filters
+        return await ability_crud.get_multi_with_total(
+            db=db,
+            skip=skip,
+            limit=limit,
+            query=query,
+            cursor=cursor,
+        )
+
+    return await response_cache.respond(
+        request=request,
+        namespace="ability",
+        schema=AbilityRead,
+        load=load_page,
+        params=filter_data,
     )
-    # * Prepare order fields
-    if filter_data.order_by:
-        for field in filter_data.order_by.desc:
-            # * Add filter fields
-            if field == AbilityFilterOrderFild.name:
-                query = query.order_by(Ability.name.desc())
-        for field in filter_data.order_by.asc:
-            # * Add filter fields
-            if field == AbilityFilterOrderFild.name:
-                query = query.order_by(Ability.name.asc())
-    # * Find All ability with filters
-    obj_list = await ability_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
-
-    return obj_list
@@ -1,53 +1,18 @@
 from typing import Type
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Float, and_, cast, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.ability.models import Ability
 from src.agent.exception import AgentNotFoundException
-from src.agent.models import Agent
+from src.agent.models import Agent, AgentAbility
 from src.agent.schema import AgentUpdate
 from src.database.base_crud import BaseCRUD
+from src.database.session import SessionLocal
 
 
 # ---------------------------------------------------------------------------
-async def update_interest_rates(*, target_agent: Agent, db: AsyncSession) -> Agent:
-    """
-    ! Update Agent Interest rates
-
-    Parameters
-    ----------
-    target_agent
-        Target Agent
-    db
-        Target database connection
-
-    Returns
-    -------
-    target_agent
-        Updated agent
-
-    """
-    # * Find All Agent Ability
-    response = await db.execute(select(Ability))
-    all_agent_ability_count = len(response.scalars().all())
-    # * Calculate interest rates
-    new_interest_rates = (len(target_agent.abilities) * 100) / all_agent_ability_count
-    target_agent.interest_rates = new_interest_rates
-    # * Check agent main field
-    if new_interest_rates == 100:
-        target_agent.is_main = True
-    else:
-        target_agent.is_main = False
-
-    # ? Update
-    db.add(target_agent)
-    await db.commit()
-
-    return target_agent
-
-
 class AgentCRUD(BaseCRUD[Agent, None, AgentUpdate]):
     async def verify_existence(
         self,
@@ -111,51 +76,71 @@ class AgentCRUD(BaseCRUD[Agent, None, AgentUpdate]):
 
         return obj
 
-    async def update_auto_data(self, *, db: AsyncSession) -> bool:
+    async def update_auto_data(
+        self,
+        *,
+        db: AsyncSession,
+        agent_ids: list[UUID] | None = None,
+    ) -> bool:
         """
-        ! Update All Agent interest_rates And calculate is_main
+        ! Update agents interest_rates And calculate is_main
+
+        Rates are computed and written by one statement, only agents whose
+        values change are written.
 
         Parameters
         ----------
         db
             Target database connection
+        agent_ids
+            Target agents, all agents when None
 
         Returns
         -------
         res
             Result of operation
         """
-        # * Find All Ability
-        response = await db.execute(select(Ability))
-        all_agent_ability_count = len(response.scalars().all())
-        # * Find All Agent
-        response = await db.execute(select(self.model))
-        all_agents = response.scalars().all()
-
-        mappings = []
-        for agen in all_agents:
-            # * Calculate interest rates
-            agent_ability_count = len(agen.abilities)
-            if agent_ability_count:
-                new_interest_rates = (
-                    agent_ability_count * 100
-                ) / all_agent_ability_count
-            else:
-                new_interest_rates = 0
-            # * Update Agent Is_Main field
-            if new_interest_rates == 100:
-                agen.is_main = True
-            else:
-                agen.is_main = False
-
-            agen.interest_rates = new_interest_rates
-            mappings.append(agent.__dict__)
-
-        await db.run_sync(
-            lambda session: session.bulk_update_mappings(
-                mapper=self.model,
-                mappings=mappings,
-            ),
+        ability_count = select(func.count(Ability.id)).scalar_subquery()
+        agent_ability_count = func.count(func.distinct(Ability.id))
+        new_data = (
+            select(
+                self.model.id.label("agent_id"),
+                cast(
+                    func.coalesce(
+                        agent_ability_count * 100.0 / func.nullif(ability_count, 0),
+                        0,
+                    ),
+                    Float,
+                ).label("interest_rates"),
+                and_(
+                    ability_count > 0,
+                    agent_ability_count == ability_count,
+                ).label("is_main"),
+            )
+            .outerjoin(AgentAbility, AgentAbility.agent_id == self.model.id)
+            .outerjoin(Ability, Ability.id == AgentAbility.ability_id)
+            .group_by(self.model.id)
+        )
+        if agent_ids is not None:
+            new_data = new_data.where(self.model.id.in_(agent_ids))
+        new_data = new_data.subquery("new_data")
+
+        await db.execute(
+            update(self.model)
+            .where(
+                self.model.id == new_data.c.agent_id,
+                or_(
+                    self.model.interest_rates.is_distinct_from(
+                        new_data.c.interest_rates,
+                    ),
+                    self.model.is_main.is_distinct_from(new_data.c.is_main),
+                ),
+            )
+            .values(
+                interest_rates=new_data.c.interest_rates,
+                is_main=new_data.c.is_main,
+            )
+            .execution_options(synchronize_session=False),
         )
         await db.commit()
 
@@ -164,3 +149,20 @@ class AgentCRUD(BaseCRUD[Agent, None, AgentUpdate]):
 
 # ---------------------------------------------------------------------------
 agent = AgentCRUD(Agent)
+
+
+# ---------------------------------------------------------------------------
+async def update_auto_data_in_background(agent_ids: list[UUID] | None = None) -> None:
+    """
+    ! Update agents auto data after response is sent
+
+    Runs as a background task with its own session, the session of the
+    request is closed by then.
+
+    Parameters
+    ----------
+    agent_ids
+        Target agents, all agents when None
+    """
+    async with SessionLocal() as db:
+        await agent.update_auto_data(db=db, agent_ids=agent_ids)
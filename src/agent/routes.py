@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import or_, select
 
 from src import deps
@@ -13,6 +13,8 @@ from src.agent.schema import (
     AgentRead,
     AgentUpdate,
 )
+from src.database.pagination import set_page_headers
+from src.location.crud import location as location_crud
 from src.schema import IDRequest
 from src.user.models import User
 
@@ -58,7 +60,7 @@ async def update_agent(
     #  * Verify agent existence
     obj_current = await agent_crud.verify_existence(
         db=db,
-        user_crypto_id=update_data.where.id,
+        agent_id=update_data.where.id,
     )
     # * Update agent
     obj_current.abilities = ability_list
@@ -66,12 +68,10 @@ async def update_agent(
     await db.commit()
 
     # ? update agent interest and main filed
-    agent = await agent_crud.update_agents_interest_rates(
-        db=db,
-        target_agent=obj_current,
-    )
+    await agent_crud.update_auto_data(db=db, agent_ids=[obj_current.id])
+    await db.refresh(obj_current)
 
-    return agent
+    return obj_current
 
 
 # ---------------------------------------------------------------------------
@@ -113,11 +113,13 @@ async def find_agent(
 @router.get(path="/list", response_model=List[AgentRead])
 async def get_agent_list(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     filter_data: AgentFilter,
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[AgentRead]:
     """
     ! Get All Agent
@@ -132,6 +134,8 @@ async def get_agent_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -139,16 +143,31 @@ async def get_agent_list(
     -------
     agent_list
         List of ability
+
+    Raises
+    ------
+    LocationNotFoundException
     """
     # * Prepare filter fields
     filter_data.is_main = (
         (Agent.is_main == filter_data.name) if filter_data.is_main else False
     )
+    filter_data.location_id = (
+        Agent.locations.any(
+            await location_crud.subtree_condition(
+                db=db,
+                location_id=filter_data.location_id,
+            ),
+        )
+        if filter_data.location_id
+        else False
+    )
     # * Add filter fields
     query = select(Agent).filter(
         or_(
             filter_data.return_all,
             filter_data.is_main,
+            filter_data.location_id,
         ),
     )
     # * Prepare order fields
@@ -166,6 +185,13 @@ async def get_agent_list(
             elif field == AgentFilterOrderFild.interest_rates:
                 query = query.order_by(Agent.interest_rates.asc())
     # * Find All agent with filters
-    agent_list = await agent_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
+    page = await agent_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        query=query,
+        cursor=cursor,
+    )
+    agent_list = set_page_headers(response=response, page=page)
 
     return agent_list
@@ -52,4 +52,6 @@ class AgentFilterOrderBy(BaseModel):
 class AgentFilter(BaseModel):
     return_all: bool | None = None
     is_main: None | bool = None
+    # ? Agents of location or any of its sub locations
+    location_id: UUID | bool | None = None
     order_by: AgentFilterOrderBy | None = None
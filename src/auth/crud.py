@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.security import verify_password
+from src.core.secret_store import SecretPurpose, secret_store
+from src.core.security import password_hasher
 from src.database.base_crud import BaseCRUD
 from src.user.crud import user as user_crud
 from src.user.models import User
@@ -30,12 +31,26 @@ class AuthCRUD(BaseCRUD[User, None, None]):
         -------
         user
             Found user or None
+
+        Raises
+        ------
+        ServerIsBusyException
         """
         user = await user_crud.find_by_username(db=db, username=username)
         if not user:
             return None
-        if not verify_password(password, user.password):
+        verify, new_hash = await password_hasher.verify_and_update(
+            password,
+            user.password,
+        )
+        if not verify:
             return None
+        # ? Hash of password is outdated (e.g. cost factor is changed)
+        if new_hash:
+            user.password = new_hash
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
         return user
 
     async def authenticate_v2(
@@ -64,7 +79,12 @@ class AuthCRUD(BaseCRUD[User, None, None]):
         user: User | None = await user_crud.get_by_username(db=db, username=username)
         if not user:
             return None
-        if not user.one_time_password == password:
+        verify = await secret_store.verify(
+            purpose=SecretPurpose.ONE_TIME_PASSWORD,
+            subject=user.username,
+            secret=password,
+        )
+        if not verify:
             return None
         return user
 
@@ -78,3 +78,18 @@ class UserNotAuthenticatedException(HTTPException):
             "persian_message": "ابتدا وارد شوید!",
         }
         self.headers = None
+
+
+class TokenIsOutdatedException(HTTPException):
+    """
+    ? Token permissions are changed after it was issued
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 207,
+            "english_message": "Token Is Outdated, Please Login Again!",
+            "persian_message": "توکن منقضی شده است، لطفا دوباره وارد شوید!",
+        }
+        self.headers = None
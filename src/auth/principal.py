@@ -0,0 +1,188 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.role.crud import role as role_crud
+from src.schema import PrincipalRole, PrincipalWallet, UserPrincipal
+from src.user.crud import auth_load_profile
+from src.user.crud import user as user_crud
+from src.user.exception import UserNotFoundException
+from src.user.models import User
+
+
+# ---------------------------------------------------------------------------
+class PrincipalCache:
+    """
+    ! Cache of authenticated users keyed by token subject (username)
+
+    Every entry is a compact snapshot of the user with its permission codes,
+    so warm requests pass auth dependencies without any query.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self._cache: TTLCache[str, UserPrincipal] = TTLCache(
+            ttl_seconds=ttl_seconds,
+            max_size=max_size,
+        )
+
+    @staticmethod
+    def build(user: User) -> UserPrincipal:
+        """
+        ! Build principal snapshot from user object
+
+        Parameters
+        ----------
+        user
+            Loaded user object
+
+        Returns
+        -------
+        principal
+            Snapshot of user
+        """
+        role = user.role
+        return UserPrincipal(
+            id=user.id,
+            username=user.username,
+            is_active=user.is_active,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            subscribe_newsletter=user.subscribe_newsletter,
+            role_id=user.role_id,
+            role=PrincipalRole(id=role.id, name=role.name) if role else None,
+            wallet=PrincipalWallet(id=user.wallet.id) if user.wallet else None,
+            permissions=(
+                frozenset(permission.code for permission in role.permissions)
+                if role
+                else frozenset()
+            ),
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    async def get(self, *, db: AsyncSession, username: str) -> UserPrincipal:
+        """
+        ! Get principal from cache or load it from database
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        username
+            Token subject
+
+        Returns
+        -------
+        principal
+            Found principal
+
+        Raises
+        ------
+        UserNotFoundException
+        """
+        principal = self._cache.get(username)
+        if principal is not None:
+            return principal
+
+        user = await user_crud.find_by_username(
+            db=db,
+            username=username,
+            options=auth_load_profile(),
+        )
+        if not user:
+            raise UserNotFoundException()
+
+        principal = self.build(user)
+        self._cache.set(username, principal)
+        return principal
+
+    def invalidate_user(self, username: str) -> None:
+        """
+        ! Drop cached principal of one user
+
+        Parameters
+        ----------
+        username
+            Target user's username
+        """
+        self._cache.pop(username)
+
+    def invalidate_role(self, role_id: UUID) -> None:
+        """
+        ! Drop cached principals of every user with this role
+
+        Parameters
+        ----------
+        role_id
+            Target role's id
+        """
+        self._cache.pop_where(lambda _, principal: principal.role_id == role_id)
+
+    def clear(self) -> None:
+        """
+        ! Drop all cached principals
+        """
+        self._cache.clear()
+
+
+# ---------------------------------------------------------------------------
+class RoleVersionTable:
+    """
+    ! Current permission version of every role
+
+    Versions are refreshed from database after ttl, so a bump on one worker
+    reaches the others within ttl seconds.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self._cache: TTLCache[UUID, int] = TTLCache(ttl_seconds=ttl_seconds)
+
+    async def get(self, *, db: AsyncSession, role_id: UUID) -> int | None:
+        """
+        ! Get current version of role
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        role_id
+            Target role's id
+
+        Returns
+        -------
+        version
+            Current version or None if role does not exist
+        """
+        version = self._cache.get(role_id)
+        if version is None:
+            version = await role_crud.get_version(db=db, role_id=role_id)
+            if version is not None:
+                self._cache.set(role_id, version)
+
+        return version
+
+    def set(self, *, role_id: UUID, version: int | None) -> None:
+        """
+        ! Store new version of role
+
+        Parameters
+        ----------
+        role_id
+            Target role's id
+        version
+            New version, the role is dropped if None
+        """
+        if version is None:
+            self._cache.pop(role_id)
+        else:
+            self._cache.set(role_id, version)
+
+
+# ---------------------------------------------------------------------------
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+)
+role_versions = RoleVersionTable(ttl_seconds=settings.ROLE_VERSION_TTL_SECONDS)
@@ -1,5 +1,4 @@
-from datetime import datetime, timedelta, timezone
-from random import randint
+from datetime import timedelta
 
 from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
@@ -19,13 +18,17 @@ from src.auth.schema import (
     VerifyUsernameAndNationalCode,
 )
 from src.core.config import settings
-from src.core.security import generate_access_token, hash_password
+from src.core.secret_store import SecretPurpose, secret_store
+from src.core.security import (
+    encode_permission_bitmap,
+    generate_access_token,
+    password_hasher,
+)
 from src.credit.models import Credit
 from src.role.crud import role as role_crud
 from src.schema import ResultResponse
 from src.user.crud import user as user_crud
 from src.user.models import User
-from src.verify_phone.crud import verify_phone as verify_phone_crud
 
 # ---------------------------------------------------------------------------
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -59,6 +62,8 @@ async def login(
         Username Or Password Is Incorrect
     InactiveUserException
         User Is Inactive
+    ServerIsBusyException
+        Too many passwords are being verified
 
     """
     user = await auth_crud.authenticate(
@@ -72,10 +77,18 @@ async def login(
         raise InactiveUserException()
 
     access_token_expire_time = timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
-    role = await role_crud.get(db=db, item_id=user.role.id)
+    role = await role_crud.get(db=db, item_id=user.role_id)
 
     token = generate_access_token(
-        data={"username": user.username, "role": role.name},
+        data={
+            "username": user.username,
+            "role": role.name,
+            "role_id": str(role.id),
+            "role_version": role.version,
+            "permissions": encode_permission_bitmap(
+                permission.code for permission in role.permissions
+            ),
+        },
         expire_delta=access_token_expire_time,
     )
     access_token: AccessToken = AccessToken(access_token=token, token_type="bearer")
@@ -122,10 +135,18 @@ async def login_for_access_token(
         raise InactiveUserException()
 
     access_token_expire_time = timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
-    role = await role_crud.get(db=db, id=user.role_id)
+    role = await role_crud.get(db=db, item_id=user.role_id)
 
     token = generate_access_token(
-        data={"user_name": user.user_name, "role": role.name},
+        data={
+            "username": user.username,
+            "role": role.name,
+            "role_id": str(role.id),
+            "role_version": role.version,
+            "permissions": encode_permission_bitmap(
+                permission.code for permission in role.permissions
+            ),
+        },
         expire_delta=access_token_expire_time,
     )
     access_token: AccessToken = AccessToken(access_token=token, token_type="bearer")
@@ -164,19 +185,16 @@ async def current_user(
     """
     username = request_data.username
 
-    # ? Generate dynamic password
-    one_time_password = randint(100000, 999999)
     # ? Find user
     user = await user_crud.verify_existence_by_username(db=db, username=username)
-    # ? Update user data
-    user.one_time_password = one_time_password
-    user.expiration_password_at = datetime.now() + timedelta(
-        minutes=settings.DYNAMIC_PASSWORD_EXPIRE_MINUTES,
+    # ? Generate dynamic password, previous password of user is replaced
+    await secret_store.issue(
+        purpose=SecretPurpose.ONE_TIME_PASSWORD,
+        subject=user.username,
+        ttl_seconds=settings.DYNAMIC_PASSWORD_EXPIRE_MINUTES * 60,
     )
-    db.add(user)
-    await db.commit()
     # ? Send SMS to user's phone
-    # send_one_time_password_sms(phone_number=user.phone_number, code=one_time_password)
+    # send_one_time_password_sms(phone_number=user.phone_number, code=...)
 
     return ResultResponse(result="Code sent successfully")
 
@@ -248,24 +266,23 @@ async def register_user(
         It does not normally happen
     IncorrectVerifyCodeException
     UsernameIsDuplicatedException
+    ServerIsBusyException
     """
     phone_number = register_data.phone_number
     verify_code = register_data.phone_verify_code
-    current_time = datetime.now(tz=timezone.utc)
     role = await role_crud.verify_existence_by_name(db=db, name="کاربر ساده")
 
     # todo: verify phone number and national code with web server
 
     # ? Verify Phone Number
-    verify_code_number = await verify_phone_crud.find_by_phone_number(
-        db=db,
-        phone_number=phone_number,
+    # ? Code is kept until user is created
+    verify = await secret_store.verify(
+        purpose=SecretPurpose.VERIFY_PHONE,
+        subject=phone_number,
+        secret=verify_code,
+        consume=False,
     )
-    if (
-        not verify_code_number
-        or verify_code_number.verify_code != verify_code
-        or verify_code_number.expiration_code_at < current_time
-    ):
+    if not verify:
         raise IncorrectVerifyCodeException()
     # ? Verify duplicate username
     await user_crud.verify_duplicate_username(db=db, username=phone_number)
@@ -278,7 +295,7 @@ async def register_user(
     # ? Create User
     created_user = User()
     created_user.username = phone_number
-    created_user.password = hash_password(register_data.password)
+    created_user.password = await password_hasher.hash(register_data.password)
     created_user.role_id = role.id
     created_user.first_name = register_data.first_name
     created_user.last_name = register_data.last_name
@@ -296,5 +313,9 @@ async def register_user(
     db.add(credit)
     await db.commit()
     await db.refresh(created_user)
+    await secret_store.discard(
+        purpose=SecretPurpose.VERIFY_PHONE,
+        subject=phone_number,
+    )
 
     return ResultResponse(result="User Created Successfully")
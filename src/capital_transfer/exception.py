@@ -18,3 +18,18 @@ class CapitalTransferNotFoundException(HTTPException):
             "english_message": "CapitalTransfer Not Found!",
         }
         self.headers = None
+
+
+class CapitalTransferIsFinishedException(HTTPException):
+    """
+    ? Exception When CapitalTransfer is already approved
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 501,
+            "persian_message": "انقال مورد نظر قبلا تایید شده است!",
+            "english_message": "CapitalTransfer Is Already Finished!",
+        }
+        self.headers = None
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import UUID, Boolean, Column, Enum, Float, ForeignKey, String
+from sqlalchemy import UUID, Boolean, Column, Enum, Float, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -16,6 +16,15 @@ class CapitalTransferEnum(enum.Enum):
 # ---------------------------------------------------------------------------
 class CapitalTransfer(Base, BaseMixin):
     __tablename__ = "capital_transfer"
+    __table_args__ = (
+        Index("ix_capital_transfer_created_at_id", "created_at", "id"),
+        Index(
+            "ix_capital_transfer_receiver_id_created_at",
+            "receiver_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     value = Column(Float, nullable=False)
     transfer_type = Column(Enum(CapitalTransferEnum))
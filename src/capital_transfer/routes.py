@@ -1,18 +1,31 @@
 from typing import List
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
 
 from src import deps
+from src.auth.exception import AccessDeniedException
 from src.capital_transfer.crud import capital_transfer as capital_transfer_crud
+from src.capital_transfer.exception import CapitalTransferIsFinishedException
 from src.capital_transfer.models import CapitalTransfer, CapitalTransferEnum
 from src.capital_transfer.schema import (
     CapitalTransferCreate,
     CapitalTransferInDB,
     CapitalTransferRead,
 )
-from src.schema import IDRequest
+from src.core.config import settings
+from src.database.export import ExportFormat, export_response
+from src.database.loading import COLUMNS_ONLY
+from src.database.pagination import set_page_headers
+from src.permission import permission_codes as permission
+from src.schema import IDRequest, UploadedFileRead
+from src.transaction.ledger import Posting, ledger
+from src.transaction.models import TransactionValueType
 from src.user.models import User
+from src.utils.minio_client import minio_client
+from src.utils.upload import store_upload
 from src.wallet.crud import wallet as wallet_crud
 
 # ---------------------------------------------------------------------------
@@ -60,10 +73,12 @@ async def find_capital_transfer(
 @router.get(path="/list", response_model=List[CapitalTransferRead])
 async def get_capital_transfer(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[CapitalTransferRead]:
     """
     ! Get All CapitalTransfer
@@ -78,6 +93,8 @@ async def get_capital_transfer(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
@@ -85,18 +102,63 @@ async def get_capital_transfer(
         List of capital transfer
 
     """
-    obj_list = await capital_transfer_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await capital_transfer_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        options=COLUMNS_ONLY,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
+# ---------------------------------------------------------------------------
+@router.get(path="/export", response_class=StreamingResponse)
+async def export_capital_transfer(
+    *,
+    current_user: User = Depends(
+        deps.get_current_user_with_permissions([permission.VIEW_CAPITAL_TRANSFER]),
+    ),
+    export_format: ExportFormat = ExportFormat.CSV,
+) -> StreamingResponse:
+    """
+    ! Export All CapitalTransfer
+
+    Parameters
+    ----------
+    current_user
+        Requester User
+    export_format
+        Format of file
+
+    Returns
+    -------
+    response
+        Streamed file of capital transfers
+
+    Raises
+    ------
+    ServerIsBusyException
+    """
+    return export_response(
+        crud=capital_transfer_crud,
+        schema=CapitalTransferRead,
+        filename="capital_transfers",
+        export_format=export_format,
+    )
+
+
 # ---------------------------------------------------------------------------
 @router.get(path="/my", response_model=List[CapitalTransferRead])
 async def get_capital_transfer_list_my(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[CapitalTransferRead]:
     """
     ! Get All My CapitalTransfer
@@ -111,6 +173,8 @@ async def get_capital_transfer_list_my(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
@@ -118,17 +182,20 @@ async def get_capital_transfer_list_my(
         List of my capital transfer
 
     """
-    wallet = await wallet_crud.get_main_wallet_with_user_id(
+    wallet = await wallet_crud.verify_by_user_id(
         db=db,
         user_id=current_user.id,
     )
     query = select(CapitalTransfer).where(CapitalTransfer.receiver_id == wallet.id)
-    obj_list = await capital_transfer_crud.get_multi(
+    page = await capital_transfer_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        options=COLUMNS_ONLY,
+        cursor=cursor,
     )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
@@ -163,7 +230,7 @@ async def create_capital_transfer(
     WalletNotFoundException
         It does not happen normally
     """
-    wallet = await wallet_crud.get_main_wallet_with_user_id(
+    wallet = await wallet_crud.verify_by_user_id(
         db=db,
         user_id=current_user.id,
     )
@@ -173,6 +240,84 @@ async def create_capital_transfer(
     return capital_transfer
 
 
+# ---------------------------------------------------------------------------
+@router.put(path="/upload_receipt", response_model=UploadedFileRead)
+async def upload_capital_transfer_receipt(
+    *,
+    request: Request,
+    db=Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user()),
+    capital_transfer_id: UUID,
+) -> UploadedFileRead:
+    """
+    ! Upload Receipt Of My CapitalTransfer
+
+    Request body is the raw file (pdf, png, jpeg or tiff), receipt can be
+    replaced until the transfer is approved.
+
+    Parameters
+    ----------
+    request
+        Request with file as body
+    db
+        Target database connection
+    current_user
+        Requester User
+    capital_transfer_id
+        Target CapitalTransfer's ID
+
+    Returns
+    -------
+    stored
+        Stored file
+
+    Raises
+    ------
+    CapitalTransferNotFoundException
+    CapitalTransferIsFinishedException
+    WalletNotFoundException
+    AccessDeniedException
+    FileIsTooLargeException
+    FileTypeIsNotAllowedException
+    """
+    obj_current = await capital_transfer_crud.verify_existence(
+        db=db,
+        capital_transfer_id=capital_transfer_id,
+    )
+    if obj_current.finish:
+        raise CapitalTransferIsFinishedException()
+    wallet = await wallet_crud.verify_by_user_id(
+        db=db,
+        user_id=current_user.id,
+    )
+    if obj_current.receiver_id != wallet.id:
+        raise AccessDeniedException()
+    # ? Connection is not held while file is uploaded
+    await db.close()
+
+    stored = await store_upload(
+        request=request,
+        store=minio_client,
+        bucket_name=settings.MINIO_DEFAULT_BUCKET,
+        file_name=f"capital_transfer/{obj_current.id}",
+        max_bytes=settings.UPLOAD_MAX_BYTES,
+    )
+    response = await db.execute(
+        update(CapitalTransfer)
+        .where(
+            CapitalTransfer.id == obj_current.id,
+            CapitalTransfer.finish.is_not(True),
+        )
+        .values(file_name=stored.file_name, file_version_id=stored.version_id)
+        .returning(CapitalTransfer.id),
+    )
+    if not response.scalar_one_or_none():
+        raise CapitalTransferIsFinishedException()
+    await db.commit()
+
+    return UploadedFileRead(**stored._asdict())
+
+
 # ---------------------------------------------------------------------------
 @router.put(path="/approve", response_model=CapitalTransferRead)
 async def update_position_request(
@@ -201,6 +346,7 @@ async def update_position_request(
     Raises
     ------
     CapitalTransferNotFoundException
+    CapitalTransferIsFinishedException
     """
     # ? Verify capital_transfer existence
     obj_current = await capital_transfer_crud.verify_existence(
@@ -208,15 +354,37 @@ async def update_position_request(
         capital_transfer_id=obj_data.id,
     )
 
-    obj_current.finish = True
-    wallet = await wallet_crud.get(db=db, item_id=obj_current.receiver_id)
-    # Todo: Create Transaction
-    if obj_current.transfer_type == CapitalTransferEnum.Credit:
-        wallet.credit_balance += obj_current.value
-    elif obj_current.transfer_type == CapitalTransferEnum.Cash:
-        wallet.cash_balance += obj_current.value
+    # ? Only one request can finish the transfer
+    response = await db.execute(
+        update(CapitalTransfer)
+        .where(
+            CapitalTransfer.id == obj_current.id,
+            CapitalTransfer.finish.is_not(True),
+        )
+        .values(finish=True)
+        .returning(CapitalTransfer.id),
+    )
+    if not response.scalar_one_or_none():
+        raise CapitalTransferIsFinishedException()
+
+    value_type = (
+        TransactionValueType.CREDIT
+        if obj_current.transfer_type == CapitalTransferEnum.Credit
+        else TransactionValueType.CASH
+    )
+    await ledger.post(
+        db=db,
+        postings=[
+            Posting(
+                transferor_id=await ledger.system_wallet_id(db=db),
+                receiver_id=obj_current.receiver_id,
+                value=obj_current.value,
+                value_type=value_type,
+                text="انتقال سرمایه",
+            ),
+        ],
+    )
 
-    db.add(obj_current)
     await db.commit()
     await db.refresh(obj_current)
     return obj_current
@@ -19,5 +19,112 @@
 #       * Capital Transfer Not Found Exception
 #       * User not authentication
 #       * Verify Permission
+#   ? Upload Receipt Api
+#       * Successfully
+#       * Not receiver of capital transfer
 
 # ! Tot Time = 90m
+#
+# ? Runs against a migrated local postgres, set DATABASE_URL to enable it
+import asyncio
+import os
+from uuid import uuid4
+
+import pytest
+
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from fastapi import Request
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.auth.exception import AccessDeniedException
+from src.capital_transfer import routes
+from src.capital_transfer.models import CapitalTransfer
+from src.database.base import Base  # noqa: F401, all models are mapped
+from src.user.models import User
+from src.utils.minio_client import MemoryObjectStore
+from src.wallet.models import Wallet
+
+# ---------------------------------------------------------------------------
+RECEIPT = b"\x89PNG\r\n\x1a\n" + bytes(200)
+
+
+def _receipt_request() -> Request:
+    chunks = [{"type": "http.request", "body": RECEIPT, "more_body": False}]
+
+    async def receive() -> dict:
+        return chunks.pop(0) if chunks else {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "method": "PUT",
+        "path": "/capital_transfer/upload_receipt",
+        "headers": [
+            (b"content-type", b"image/png"),
+            (b"content-length", str(len(RECEIPT)).encode()),
+        ],
+    }
+    return Request(scope, receive)
+
+
+async def _upload_receipt(*, as_receiver: bool) -> CapitalTransfer:
+    # ? Every test runs its own event loop, so connections are not pooled
+    engine = create_async_engine(os.environ["DATABASE_URL"], poolclass=NullPool)
+    users = [User(id=uuid4(), username=str(uuid4()), password="-") for _ in "ab"]
+    wallets = [Wallet(id=uuid4(), user_id=user.id) for user in users]
+    capital_transfer = CapitalTransfer(
+        id=uuid4(),
+        value=10,
+        finish=False,
+        receiver_id=wallets[0].id,
+    )
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            db.add_all(users)
+            await db.flush()
+            db.add_all(wallets)
+            await db.flush()
+            db.add(capital_transfer)
+            await db.commit()
+
+            await routes.upload_capital_transfer_receipt(
+                request=_receipt_request(),
+                db=db,
+                current_user=users[0] if as_receiver else users[1],
+                capital_transfer_id=capital_transfer.id,
+            )
+            return await db.get(
+                CapitalTransfer,
+                capital_transfer.id,
+                populate_existing=True,
+            )
+    finally:
+        async with AsyncSession(engine) as db:
+            await db.execute(
+                delete(CapitalTransfer).where(
+                    CapitalTransfer.id == capital_transfer.id,
+                ),
+            )
+            await db.execute(
+                delete(Wallet).where(Wallet.user_id.in_([u.id for u in users])),
+            )
+            await db.execute(delete(User).where(User.id.in_([u.id for u in users])))
+            await db.commit()
+        await engine.dispose()
+
+
+# ---------------------------------------------------------------------------
+def test_upload_receipt(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(routes, "minio_client", MemoryObjectStore())
+    capital_transfer = asyncio.run(_upload_receipt(as_receiver=True))
+    assert capital_transfer.file_name == f"capital_transfer/{capital_transfer.id}"
+    assert capital_transfer.file_version_id
+
+
+def test_upload_receipt_of_other_wallet(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(routes, "minio_client", MemoryObjectStore())
+    with pytest.raises(AccessDeniedException):
+        asyncio.run(_upload_receipt(as_receiver=False))
@@ -18,3 +18,33 @@ class CardNotFoundException(HTTPException):
             "english_message": "Card Not Found!",
         }
         self.headers = None
+
+
+class CardIsExpiredException(HTTPException):
+    """
+    ? Exception when card is expired
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 3201,
+            "persian_message": "کارت مورد نظر منقضی شده است!",
+            "english_message": "Card Is Expired!",
+        }
+        self.headers = None
+
+
+class WrongCardInformationException(HTTPException):
+    """
+    ? Exception when cvv2 or dynamic password of card is wrong
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 3202,
+            "persian_message": "اطلاعات کارت اشتباه است!",
+            "english_message": "Wrong Card Information!",
+        }
+        self.headers = None
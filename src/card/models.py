@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -25,13 +26,15 @@ class CardEnum(enum.Enum):
 # ---------------------------------------------------------------------------
 class Card(Base, BaseMixin):
     __tablename__ = "card"
+    __table_args__ = (
+        Index("ix_card_created_at_id", "created_at", "id"),
+        Index("ix_card_wallet_id_created_at", "wallet_id", "created_at", "id"),
+    )
 
     number = Column(String, unique=True, index=True)
     cvv2 = Column(Integer, nullable=False)
     expiration_at = Column(DateTime(timezone=True), nullable=False)
     password = Column(String, nullable=False)
-    dynamic_password = Column(Integer, nullable=True)
-    dynamic_password_exp = Column(DateTime(timezone=True), nullable=True)
     type = Column(Enum(CardEnum), nullable=False)
 
     # ! Relations
@@ -1,7 +1,4 @@
-from datetime import datetime, timedelta
-from random import randint
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,7 +11,10 @@ from src.card.schema import (
     CardUpdatePassword,
 )
 from src.core.config import settings
-from src.core.security import hash_password, pwd_context
+from src.core.secret_store import SecretPurpose, secret_store
+from src.core.security import password_hasher
+from src.database.loading import COLUMNS_ONLY
+from src.database.pagination import set_page_headers
 from src.exception import InCorrectDataException
 from src.permission import permission_codes as permission
 from src.schema import IDRequest, ResultResponse
@@ -55,18 +55,24 @@ async def update_card(
     ------
     InCorrectDataException
     CardNotFoundException
+    ServerIsBusyException
     """
     # * Verify card existence
     obj_current = await card_crud.verify_existence(db=db, card_id=update_data.where.id)
     # * Verify old password
-    verify = pwd_context.verify(update_data.data.password, obj_current.password)
+    verify = await password_hasher.verify(
+        update_data.data.password,
+        obj_current.password,
+    )
     if not verify:
         raise InCorrectDataException()
     # * verify new password
     if update_data.data.new_password != update_data.data.re_password:
         raise InCorrectDataException()
     # * Update card
-    update_data.data.password = hash_password(update_data.data.new_password)
+    update_data.data.password = await password_hasher.hash(
+        update_data.data.new_password,
+    )
     card = await card_crud.update(
         db=db,
         obj_current=obj_current,
@@ -80,12 +86,14 @@ async def update_card(
 @router.get("/list", response_model=list[CardRead])
 async def read_card_list(
     *,
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_CARD]),
     ),
     skip: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
 ) -> list[CardRead]:
     """
     ! Read Card
@@ -100,13 +108,22 @@ async def read_card_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     card_list
         List of card
     """
-    card_list = await card_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await card_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        options=COLUMNS_ONLY,
+        cursor=cursor,
+    )
+    card_list = set_page_headers(response=response, page=page)
     return card_list
 
 
@@ -176,7 +193,7 @@ async def find_my_card(
     wallet = await wallet_crud.find_by_user_id(db=db, user_id=current_user.id)
     # * Find All My Cards
     query = select(Card).where(Card.wallet_id == wallet.id)
-    card_list = await card_crud.get_multi(db=db, query=query)
+    card_list = await card_crud.get_multi(db=db, query=query, options=COLUMNS_ONLY)
     return card_list
 
 
@@ -205,23 +222,19 @@ async def get_dynamic_password(
     """
     # * Find Card
     card = await card_crud.verify_by_number(db=db, number=input_data.number)
-    # ? Generate dynamic password
-    dynamic_password = randint(100000, 999999)
-    # ? Update wallet dynamic password
-    card.dynamic_password = dynamic_password
-    card.dynamic_password_exp = datetime.now() + timedelta(
-        minutes=settings.DYNAMIC_PASSWORD_EXPIRE_MINUTES,
+    # ? Generate dynamic password, previous password of card is replaced
+    issued = await secret_store.issue(
+        purpose=SecretPurpose.CARD_DYNAMIC_PASSWORD,
+        subject=card.number,
+        ttl_seconds=settings.DYNAMIC_PASSWORD_EXPIRE_MINUTES * 60,
     )
-    # ? Send SMS message
-    # todo:
+
+    # ? Send SMS message in background
     send_dynamic_password_sms(
-        dynamic_password=dynamic_password,
+        dynamic_password=issued.code,
         phone_number=card.wallet.user.phone_number,
-        exp_time=card.dynamic_password_exp,
+        exp_time=issued.expire_at,
     )
-
-    db.add(card)
-    await db.commit()
     return ResultResponse(result="Success")
 
 
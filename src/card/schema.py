@@ -11,9 +11,7 @@ from src.schema import IDRequest
 class CardBase(BaseModel):
     number: str
     cvv2: int
-    dynamic_password: int | None
     expiration_at: datetime
-    dynamic_password_exp: datetime | None
     type: CardEnum
 
     model_config = ConfigDict(extra="forbid")
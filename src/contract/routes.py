@@ -1,14 +1,20 @@
 from typing import List
+from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select, update
 
 from src import deps
 from src.contract.crud import contract as contract_crud
 from src.contract.models import Contract
 from src.contract.schema import ContractRead
-from src.schema import IDRequest
+from src.core.config import settings
+from src.database.pagination import set_page_headers
+from src.permission import permission_codes as permission
+from src.schema import IDRequest, UploadedFileRead
 from src.user.models import User
+from src.utils.minio_client import minio_client
+from src.utils.upload import store_upload
 
 # ---------------------------------------------------------------------------
 router = APIRouter(prefix="/contract", tags=["contract"])
@@ -53,10 +59,12 @@ async def find_contract(
 @router.get(path="/list", response_model=List[ContractRead])
 async def get_contract(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[ContractRead]:
     """
     ! Get All Contract
@@ -71,13 +79,21 @@ async def get_contract(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     obj_list
         List of ability
     """
-    obj_list = await contract_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await contract_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
@@ -85,10 +101,12 @@ async def get_contract(
 @router.get(path="/my", response_model=List[ContractRead])
 async def get_my_contract_list(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[ContractRead]:
     """
     ! Get All My Contract
@@ -103,6 +121,8 @@ async def get_my_contract_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
@@ -113,5 +133,74 @@ async def get_my_contract_list(
     query = select(Contract).where(
         Contract.position_request.requester_user_id == current_user.id,
     )
-    obj_list = await contract_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
+    page = await contract_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        query=query,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
+
+
+# ---------------------------------------------------------------------------
+@router.put(path="/upload_file", response_model=UploadedFileRead)
+async def upload_contract_file(
+    *,
+    request: Request,
+    db=Depends(deps.get_db),
+    current_user: User = Depends(
+        deps.get_current_user_with_permissions(
+            [permission.APPROVE_POSITION_REQUEST],
+        ),
+    ),
+    contract_id: UUID,
+) -> UploadedFileRead:
+    """
+    ! Upload Contract's File
+
+    Request body is the raw file (pdf, png, jpeg or tiff), every upload is
+    a new version of the contract's object.
+
+    Parameters
+    ----------
+    request
+        Request with file as body
+    db
+        Target database connection
+    current_user
+        Requester User
+    contract_id
+        Target Contract's ID
+
+    Returns
+    -------
+    stored
+        Stored file
+
+    Raises
+    ------
+    ContractNotFoundException
+    FileIsTooLargeException
+    FileTypeIsNotAllowedException
+    """
+    contract = await contract_crud.verify_existence(db=db, contract_id=contract_id)
+    # ? Connection is not held while file is uploaded
+    await db.close()
+
+    stored = await store_upload(
+        request=request,
+        store=minio_client,
+        bucket_name=settings.MINIO_DEFAULT_BUCKET,
+        file_name=f"contract/{contract.id}",
+        max_bytes=settings.UPLOAD_MAX_BYTES,
+    )
+    await db.execute(
+        update(Contract)
+        .where(Contract.id == contract.id)
+        .values(file_name=stored.file_name, file_version_id=stored.version_id),
+    )
+    await db.commit()
+
+    return UploadedFileRead(**stored._asdict())
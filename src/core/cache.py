@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterator, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+# ---------------------------------------------------------------------------
+class TTLCache(Generic[KeyType, ValueType]):
+    """
+    ! In-process cache with per entry expiration
+
+    Entries live in the memory of the current worker only, every gunicorn
+    worker keeps its own copy and the ttl bounds how long they can drift.
+
+    Parameters
+    ----------
+    ttl_seconds
+        Default life time of every entry
+    max_size
+        Maximum number of entries, the oldest entry is dropped first
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data: OrderedDict[KeyType, tuple[float, ValueType]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[KeyType]:
+        return iter(list(self._data.keys()))
+
+    def get(self, key: KeyType, default: ValueType | None = None) -> ValueType | None:
+        """
+        ! Get not expired value of key
+
+        Parameters
+        ----------
+        key
+            Target key
+        default
+            Returned value when key is missing or expired
+
+        Returns
+        -------
+        value
+            Found value or default
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expire_at, value = item
+        if expire_at <= time.monotonic():
+            self._data.pop(key, None)
+            return default
+
+        return value
+
+    def set(
+        self,
+        key: KeyType,
+        value: ValueType,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        """
+        ! Set value of key
+
+        Parameters
+        ----------
+        key
+            Target key
+        value
+            New value
+        ttl_seconds
+            Life time of this entry, default ttl is used if not passed
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + ttl, value)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: KeyType, default: ValueType | None = None) -> ValueType | None:
+        """
+        ! Remove key and return its value
+
+        Parameters
+        ----------
+        key
+            Target key
+        default
+            Returned value when key is missing
+
+        Returns
+        -------
+        value
+            Removed value or default
+        """
+        item = self._data.pop(key, None)
+        if item is None:
+            return default
+        return item[1]
+
+    def pop_where(self, condition: Callable[[KeyType, ValueType], bool]) -> int:
+        """
+        ! Remove every entry that matches condition
+
+        Parameters
+        ----------
+        condition
+            Called with key and value of every entry
+
+        Returns
+        -------
+        count
+            Number of removed entries
+        """
+        keys = [key for key, (_, value) in self._data.items() if condition(key, value)]
+        for key in keys:
+            self._data.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        ! Remove all entries
+        """
+        self._data.clear()
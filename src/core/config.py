@@ -27,7 +27,69 @@ class Setting(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_HOURS: int
     TERMINAL_EXPIRE_MINUTES: int
+    # ? Failed payments of a terminal, or of a card on all terminals, counted
+    # ? in secret store for TERMINAL_EXPIRE_MINUTES
+    TERMINAL_MAX_ATTEMPTS: int = 3
+    TERMINAL_STORE_MAX_SIZE: int = 100_000
     DYNAMIC_PASSWORD_EXPIRE_MINUTES: int
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    ROLE_VERSION_TTL_SECONDS: int = 30
+    NUMBER_PERMUTATION_KEY: str | None = None
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Secret store settings (dynamic passwords, OTP & verify codes)
+    # ? Required in production, without url codes are kept in memory of one
+    # ? worker (development only)
+    SECRET_STORE_URL: str | None = None
+    SECRET_STORE_MAX_ATTEMPTS: int = 5
+    SECRET_STORE_MAX_SIZE: int = 100_000
+
+    # Idempotency settings
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    # ? Limit of buffered request & stored response bodies of keyed requests
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1_048_576
+
+    # Transaction settings
+    ROLLUP_TIMEZONE: str = "Asia/Tehran"
+    FEE_SCHEDULE_TTL_SECONDS: int = 60
+
+    # Instrumentation settings
+    # ? Db time & query counts of every response, on in development only
+    SERVER_TIMING_ENABLED: bool = False
+    # ? Warn when one statement runs more than this in a request (N+1)
+    QUERY_REPEAT_WARNING_THRESHOLD: int = 10
+    # ? Off by default, /metrics then needs METRICS_TOKEN as bearer token
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str | None = None
+    # ? Snapshots of all gunicorn workers, tmpfs keeps flushes off the disk
+    METRICS_DIR: str = "/dev/shm/icart-metrics"
+    METRICS_FLUSH_SECONDS: float = 5.0
+
+    # Pagination settings
+    # ? Estimated counts below this are counted exactly
+    COUNT_ESTIMATE_THRESHOLD: int = 100_000
+
+    # Export settings
+    EXPORT_DB_POOL_SIZE: int = 2
+    EXPORT_DB_POOL_TIMEOUT: float = 30.0
+    EXPORT_BATCH_SIZE: int = 1_000
+
+    # Upload settings
+    UPLOAD_MAX_BYTES: int = 52_428_800
+    PROFILE_IMAGE_MAX_BYTES: int = 10_485_760
+    PROFILE_IMAGE_MAX_PIXELS: int = 40_000_000
+    PROFILE_IMAGE_WORKERS: int = 1
+    PROFILE_IMAGE_MAX_PENDING: int = 8
+
+    # Response cache settings
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_MAX_SIZE: int = 2_000
+    RESPONSE_CACHE_GZIP_MIN_BYTES: int = 1_024
 
     # Admin info
     ADMIN_USERNAME: str
@@ -41,9 +103,19 @@ class Setting(BaseSettings):
     MINIO_DEFAULT_BUCKET: str
     MINIO_SITE_MEDIA_BUCKET: str
     MINIO_PROFILE_IMAGE_BUCKET: str
+    MINIO_REGION: str | None = None
+    MINIO_WORKERS: int = 4
+    MINIO_PART_SIZE: int = 5_242_880
+    MINIO_PRESIGNED_EXPIRE_SECONDS: int = 604_800
+    MINIO_PRESIGNED_CACHE_SECONDS: int = 3_600
 
     # SMS settings
     KAVENEGAR_TOKEN: str
+    SMS_TRANSPORT: str = "kavenegar"
+    SMS_QUEUE_SIZE: int = 1000
+    SMS_CONCURRENCY: int = 4
+    SMS_MAX_RETRIES: int = 5
+    SMS_TIMEOUT_SECONDS: float = 5.0
 
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
@@ -62,6 +134,8 @@ class Setting(BaseSettings):
 
 # ---------------------------------------------------------------------------
 class DevSetting(Setting):
+    SERVER_TIMING_ENABLED: bool = True
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
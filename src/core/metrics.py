@@ -0,0 +1,556 @@
+import abc
+import asyncio
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, suppress
+from typing import Any, Callable, Iterator
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+
+# ---------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+# ? Text exposition format, charset is added by the response
+CONTENT_TYPE = "text/plain; version=0.0.4"
+# ? Seconds, from a cached lookup to a slow provider
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# ? Histograms of exited workers, merged by gunicorn master
+ARCHIVE_FILE = "archive.json"
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = tuple[str, ...]
+Samples = list[tuple[list[str], Any]]
+
+
+# ---------------------------------------------------------------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: list[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+# ---------------------------------------------------------------------------
+class Metric(abc.ABC):
+    """
+    ! Base of metrics, values are kept per label values
+
+    Parameters
+    ----------
+    name
+        Name of metric
+    documentation
+        Help text of metric
+    labelnames
+        Names of labels, every observation gives all of them
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> Samples:
+        ...
+
+    @abc.abstractmethod
+    def render(self, samples: Samples) -> list[str]:
+        ...
+
+
+# ---------------------------------------------------------------------------
+class Histogram(Metric):
+    """
+    ! Distribution of observed values in fixed buckets
+
+    Parameters
+    ----------
+    buckets
+        Upper bounds of buckets, +Inf is added
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ? Count of every bucket (not cumulative) & +Inf, then sum
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> Samples:
+        with self._lock:
+            return [(list(key), list(counts)) for key, counts in self._values.items()]
+
+    def render(self, samples: Samples) -> list[str]:
+        lines = []
+        bounds = [*self.buckets, math.inf]
+        for values, counts in samples:
+            if len(counts) != len(bounds) + 1:
+                continue
+            cumulative = 0.0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"),
+                    [*values, _format_value(bound)],
+                )
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+# ---------------------------------------------------------------------------
+class Gauge(Metric):
+    """
+    ! Current value, only live workers are summed
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._functions: dict[LabelValues, Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """
+        ! Read value from function whenever metric is collected
+        """
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def samples(self) -> Samples:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception:
+                logger.exception("Gauge %s is not collected", self.name)
+        return [(list(key), value) for key, value in values.items()]
+
+    def render(self, samples: Samples) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)}"
+            f" {_format_value(value)}"
+            for values, value in samples
+        ]
+
+
+# ---------------------------------------------------------------------------
+def _merge(metric: Metric, target: dict[tuple, Any], samples: Samples) -> None:
+    for values, value in samples:
+        key = tuple(values)
+        current = target.get(key)
+        if current is None:
+            target[key] = value
+        elif isinstance(metric, Histogram):
+            if len(current) == len(value):
+                target[key] = [a + b for a, b in zip(current, value)]
+        else:
+            target[key] = current + value
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshot(path: str) -> dict[str, Samples]:
+    try:
+        with open(path, "rb") as file:
+            return orjson.loads(file.read())
+    except FileNotFoundError:
+        return {}
+    except (OSError, orjson.JSONDecodeError):
+        logger.warning("Metrics snapshot %s is not readable", path)
+        return {}
+
+
+def _write_snapshot(path: str, snapshot: dict[str, Samples]) -> None:
+    # ? Readers see the old or the new file, never a partial one
+    temporary = os.path.join(
+        os.path.dirname(path),
+        f".{os.path.basename(path)}.{os.getpid()}.tmp",
+    )
+    with open(temporary, "wb") as file:
+        file.write(orjson.dumps(snapshot))
+    os.replace(temporary, path)
+
+
+# ---------------------------------------------------------------------------
+class MetricsRegistry:
+    """
+    ! Metrics of all gunicorn workers
+
+    Every worker observes in memory and writes a snapshot of its metrics
+    to directory every few seconds, so requests never wait for a file. The
+    worker that serves /metrics reads all snapshots: histograms are summed
+    over all workers (exited ones too), gauges only over live workers.
+
+    Parameters
+    ----------
+    directory
+        Shared directory of snapshots, one file per worker
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.metrics: dict[str, Metric] = {}
+        self._flusher: asyncio.Task | None = None
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def snapshot(self) -> dict[str, Samples]:
+        return {name: metric.samples() for name, metric in self.metrics.items()}
+
+    def flush(self) -> None:
+        """
+        ! Write snapshot of current worker
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        _write_snapshot(self._path(os.getpid()), self.snapshot())
+
+    async def _flush_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except OSError:
+                logger.exception("Metrics are not flushed to %s", self.directory)
+
+    def start(self, interval: float) -> None:
+        """
+        ! Flush snapshots periodically on running event loop
+
+        Parameters
+        ----------
+        interval
+            Seconds between flushes
+        """
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(
+                self._flush_forever(interval),
+                name="metrics-flusher",
+            )
+
+    async def stop(self) -> None:
+        """
+        ! Stop flushing and write last snapshot
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        try:
+            self.flush()
+        except OSError:
+            logger.exception("Metrics are not flushed to %s", self.directory)
+
+    def collect(self) -> str:
+        """
+        ! Metrics of all workers in text exposition format
+
+        Snapshots of other workers are at most one flush interval old. When
+        the directory is not writable or readable, only samples of current
+        worker are exposed.
+
+        Returns
+        -------
+        text
+            Exposition of all registered metrics
+        """
+        try:
+            self.flush()
+            with os.scandir(self.directory) as entries:
+                names = [
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith(".json") and not entry.name.startswith(".")
+                ]
+        except OSError:
+            logger.exception("Metrics of workers are not read from %s", self.directory)
+            names = None
+
+        # ? Live flag & samples of every worker, gauges of exited ones are dropped
+        snapshots: list[tuple[bool, dict[str, Samples]]] = []
+        if names is None:
+            snapshots.append((True, self.snapshot()))
+        else:
+            for file_name in names:
+                stem = file_name.removesuffix(".json")
+                snapshots.append(
+                    (
+                        stem.isdigit() and _is_alive(int(stem)),
+                        _read_snapshot(os.path.join(self.directory, file_name)),
+                    ),
+                )
+
+        merged: dict[str, dict[tuple, Any]] = {name: {} for name in self.metrics}
+        for live, snapshot in snapshots:
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None or (isinstance(metric, Gauge) and not live):
+                    continue
+                _merge(metric, merged[name], samples)
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(
+                metric.render(
+                    [(list(key), value) for key, value in merged[name].items()],
+                ),
+            )
+        return "\n".join(lines) + "\n"
+
+    def mark_process_dead(self, pid: int) -> None:
+        """
+        ! Move histograms of exited worker to archive
+
+        Called by gunicorn master (child_exit), gauges of worker are dropped.
+
+        Parameters
+        ----------
+        pid
+            Process id of exited worker
+        """
+        path = self._path(pid)
+        snapshot = _read_snapshot(path)
+        if not snapshot:
+            return
+        archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+        archive = _read_snapshot(archive_path)
+        for name, samples in snapshot.items():
+            metric = self.metrics.get(name)
+            if not isinstance(metric, Histogram):
+                continue
+            target = {tuple(values): value for values, value in archive.get(name, [])}
+            _merge(metric, target, samples)
+            archive[name] = [(list(key), value) for key, value in target.items()]
+        _write_snapshot(archive_path, archive)
+        os.remove(path)
+
+    def reset(self) -> None:
+        """
+        ! Remove snapshots of previous runs, called by gunicorn master on start
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith((".json", ".tmp")):
+                    with suppress(FileNotFoundError):
+                        os.remove(entry.path)
+
+
+# ---------------------------------------------------------------------------
+metrics_registry = MetricsRegistry(directory=settings.METRICS_DIR)
+
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time to handle request, until the whole response is sent",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight",
+    "Requests that are being handled",
+)
+DB_POOL_WAIT = metrics_registry.histogram(
+    "db_pool_wait_seconds",
+    "Time to check out a connection from pool",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_SIZE = metrics_registry.gauge(
+    "db_pool_size",
+    "Connections kept in pool",
+    ("pool",),
+)
+DB_POOL_CHECKED_OUT = metrics_registry.gauge(
+    "db_pool_checked_out",
+    "Connections that are in use",
+    ("pool",),
+)
+DB_POOL_OVERFLOW = metrics_registry.gauge(
+    "db_pool_overflow",
+    "Connections opened beyond pool size",
+    ("pool",),
+)
+OUTBOUND_REQUEST_DURATION = metrics_registry.histogram(
+    "outbound_request_duration_seconds",
+    "Time of calls to external services",
+    ("service", "operation", "outcome"),
+)
+
+
+# ---------------------------------------------------------------------------
+@contextmanager
+def track_outbound(service: str, operation: str) -> Iterator[None]:
+    """
+    ! Observe duration & outcome of wrapped external call
+
+    Parameters
+    ----------
+    service
+        External service, e.g. sms
+    operation
+        Called operation of service
+    """
+    started_at = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_REQUEST_DURATION.observe(
+            time.perf_counter() - started_at,
+            service=service,
+            operation=operation,
+            outcome=outcome,
+        )
+
+
+# ---------------------------------------------------------------------------
+class MetricsMiddleware:
+    """
+    ! Observe latency & status of every request per route
+
+    Routes are labeled with their path template, so path parameters never
+    grow the number of series. Requests that match no route share one label.
+
+    Parameters
+    ----------
+    app
+        Wrapped asgi application
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: dict[Callable, str] | None = None
+
+    def _route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if self._routes is None:
+            # ? First registered route of an endpoint wins, like routing
+            self._routes = {
+                route.endpoint: route.path
+                for route in reversed(scope["app"].routes)
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        # ? Unhandled errors are answered with 500 by outer middleware
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started_at,
+                method=scope["method"],
+                route=self._route(scope),
+                status=f"{status // 100}xx",
+            )
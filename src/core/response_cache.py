@@ -0,0 +1,229 @@
+import asyncio
+import gzip
+import hashlib
+from typing import Awaitable, Callable, NamedTuple, Type
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.database.pagination import Page, page_headers
+
+# ---------------------------------------------------------------------------
+CACHE_CONTROL = "private, no-cache"
+
+
+# ---------------------------------------------------------------------------
+class CachedResponse(NamedTuple):
+    body: bytes
+    gzip_body: bytes | None
+    etag: str
+    headers: dict[str, str]
+
+
+# ---------------------------------------------------------------------------
+class ResponseCache:
+    """
+    ! Serialized responses of read-mostly list endpoints
+
+    Responses are cached per namespace (usually a router) by route, query
+    string and filter body, as ORJSON bytes and, when big enough, gzipped
+    bytes. Clients revalidate with If-None-Match and get 304 while the data
+    is unchanged. Concurrent misses of the same key share one load, if the
+    loading request is cancelled a waiting one loads again.
+
+    Writes call invalidate on the worker that handled them, other workers
+    serve their copy until ttl passes. Permissions are checked by route
+    dependencies before the cache is read, so cached bodies must not depend
+    on the requester.
+
+    Parameters
+    ----------
+    ttl_seconds
+        Life time of cached responses
+    max_size
+        Maximum number of cached responses
+    gzip_min_bytes
+        Bodies smaller than this are not compressed
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_size: int, gzip_min_bytes: int):
+        self.gzip_min_bytes = gzip_min_bytes
+        self._responses: TTLCache[tuple, CachedResponse] = TTLCache(
+            ttl_seconds=ttl_seconds,
+            max_size=max_size,
+        )
+        self._loading: dict[tuple, asyncio.Future] = {}
+        self._generations: dict[str, int] = {}
+
+    def _key(
+        self,
+        namespace: str,
+        request: Request,
+        params: BaseModel | None,
+    ) -> tuple:
+        query = tuple(sorted(request.query_params.multi_items()))
+        body = (
+            orjson.dumps(params.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+            if params is not None
+            else b""
+        )
+        return (
+            namespace,
+            self._generations.get(namespace, 0),
+            request.url.path,
+            query,
+            body,
+        )
+
+    def _build(self, schema: Type[BaseModel], page: Page) -> CachedResponse:
+        body = orjson.dumps(
+            [
+                schema.model_validate(item, from_attributes=True).model_dump()
+                for item in page.items
+            ],
+        )
+        headers = page_headers(page)
+        # ? Page metadata is part of the representation
+        digest = hashlib.sha256(body)
+        digest.update(orjson.dumps(headers, option=orjson.OPT_SORT_KEYS))
+        return CachedResponse(
+            body=body,
+            gzip_body=(
+                gzip.compress(body, compresslevel=6)
+                if len(body) >= self.gzip_min_bytes
+                else None
+            ),
+            etag=f'"{digest.hexdigest()[:32]}"',
+            headers=headers,
+        )
+
+    async def _get_or_load(
+        self,
+        key: tuple,
+        schema: Type[BaseModel],
+        load: Callable[[], Awaitable[Page]],
+    ) -> CachedResponse:
+        while True:
+            cached = self._responses.get(key)
+            if cached is not None:
+                return cached
+
+            # ? Another request is loading the same key
+            future = self._loading.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # ? Loading request is cancelled (e.g. its client left), this
+                # ? one loads again unless it is cancelled itself
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            cached = self._build(schema, await load())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # ? Mark exception as retrieved when nobody is waiting
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+        self._responses.set(key, cached)
+        future.set_result(cached)
+        return cached
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+
+    async def respond(
+        self,
+        *,
+        request: Request,
+        namespace: str,
+        schema: Type[BaseModel],
+        load: Callable[[], Awaitable[Page]],
+        params: BaseModel | None = None,
+    ) -> Response:
+        """
+        ! Response of page from cache, loaded on miss
+
+        Parameters
+        ----------
+        request
+            Current request
+        namespace
+            Group of cached responses that are invalidated together
+        schema
+            Read schema of page items
+        load
+            Loads page on miss
+        params
+            Filter body of request, must be passed before it is changed
+
+        Returns
+        -------
+        response
+            Cached body, or 304 when client has the same ETag
+        """
+        key = self._key(namespace, request, params)
+        cached = await self._get_or_load(key, schema, load)
+
+        headers = {
+            **cached.headers,
+            "ETag": cached.etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if self._not_modified(request, cached.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = cached.body
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if cached.gzip_body is not None and "gzip" in accept_encoding:
+            body = cached.gzip_body
+            headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers=headers,
+        )
+
+    def invalidate(self, namespace: str) -> None:
+        """
+        ! Drop cached responses of namespace in current worker
+
+        Loads that are running keep their old generation, so their result
+        is never served after invalidation.
+
+        Parameters
+        ----------
+        namespace
+            Target namespace
+        """
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self._responses.pop_where(lambda key, _: key[0] == namespace)
+
+
+# ---------------------------------------------------------------------------
+response_cache = ResponseCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+    gzip_min_bytes=settings.RESPONSE_CACHE_GZIP_MIN_BYTES,
+)
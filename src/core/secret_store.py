@@ -0,0 +1,432 @@
+import abc
+import enum
+import hashlib
+import hmac
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from pydantic import BaseModel
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+
+
+# ---------------------------------------------------------------------------
+class SecretPurpose(enum.Enum):
+    CARD_DYNAMIC_PASSWORD = "card_dynamic_password"
+    ONE_TIME_PASSWORD = "one_time_password"
+    VERIFY_PHONE = "verify_phone"
+
+
+# ---------------------------------------------------------------------------
+class SecretCheck(enum.Enum):
+    VALID = "VALID"
+    INVALID = "INVALID"
+    # ? Expired, never issued or locked by too many attempts
+    MISSING = "MISSING"
+
+
+# ---------------------------------------------------------------------------
+class IssuedSecret(NamedTuple):
+    code: int
+    expire_at: datetime
+
+
+# ---------------------------------------------------------------------------
+class SecretEntry(BaseModel):
+    digest: str
+    attempts: int = 0
+
+
+# ---------------------------------------------------------------------------
+class SecretBackend(abc.ABC):
+    """
+    ! Storage of hashed short-lived secrets
+
+    Backends only keep digests, comparing and counting attempts of a key
+    must be atomic. They also keep counters that expire ttl_seconds after
+    their first increment.
+    """
+
+    @abc.abstractmethod
+    async def set(self, key: str, digest: str, ttl_seconds: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def check(
+        self,
+        key: str,
+        digest: str,
+        max_attempts: int,
+        consume: bool,
+    ) -> SecretCheck:
+        ...
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def increment(self, key: str, ttl_seconds: float) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def count(self, key: str) -> int:
+        ...
+
+    async def close(self) -> None:
+        return None
+
+
+# ---------------------------------------------------------------------------
+class MemorySecretBackend(SecretBackend):
+    """
+    ! Secrets in memory of current worker
+
+    Every worker has its own secrets, so a code issued by one worker is
+    unknown to the others. Use it with a single worker (development) only.
+
+    Parameters
+    ----------
+    max_size
+        Maximum number of kept secrets
+    """
+
+    def __init__(self, max_size: int):
+        self._entries: TTLCache[str, SecretEntry] = TTLCache(
+            ttl_seconds=0,
+            max_size=max_size,
+        )
+        # ? Counts are changed in place, so they keep their first expiration
+        self._counters: TTLCache[str, list[int]] = TTLCache(
+            ttl_seconds=0,
+            max_size=max_size,
+        )
+
+    async def set(self, key: str, digest: str, ttl_seconds: float) -> None:
+        self._entries.set(key, SecretEntry(digest=digest), ttl_seconds)
+
+    async def check(
+        self,
+        key: str,
+        digest: str,
+        max_attempts: int,
+        consume: bool,
+    ) -> SecretCheck:
+        # ? Nothing awaits between get & set, so check is atomic in the loop
+        entry = self._entries.get(key)
+        if entry is None:
+            return SecretCheck.MISSING
+
+        if hmac.compare_digest(entry.digest, digest):
+            if consume:
+                self._entries.pop(key)
+            return SecretCheck.VALID
+
+        entry.attempts += 1
+        if entry.attempts >= max_attempts:
+            self._entries.pop(key)
+        return SecretCheck.INVALID
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key)
+
+    async def increment(self, key: str, ttl_seconds: float) -> int:
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [0]
+            self._counters.set(key, counter, ttl_seconds)
+        counter[0] += 1
+        return counter[0]
+
+    async def count(self, key: str) -> int:
+        counter = self._counters.get(key)
+        return 0 if counter is None else counter[0]
+
+
+# ---------------------------------------------------------------------------
+class RedisSecretBackend(SecretBackend):
+    """
+    ! Secrets in a redis compatible server shared by all workers
+
+    Every secret is a hash with digest & attempts fields that expires with
+    the secret, checks run as one lua script.
+
+    Parameters
+    ----------
+    url
+        Redis url, e.g. redis://localhost:6379/0
+    """
+
+    CHECK_SCRIPT = """
+    local digest = redis.call('HGET', KEYS[1], 'digest')
+    if not digest then
+        return -1
+    end
+    if digest == ARGV[1] then
+        if ARGV[3] == '1' then
+            redis.call('DEL', KEYS[1])
+        end
+        return 1
+    end
+    local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+    if attempts >= tonumber(ARGV[2]) then
+        redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    INCREMENT_SCRIPT = """
+    local count = redis.call('INCR', KEYS[1])
+    if count == 1 then
+        redis.call('PEXPIRE', KEYS[1], ARGV[1])
+    end
+    return count
+    """
+
+    def __init__(self, url: str):
+        # ? redis is only needed when this backend is used
+        try:
+            from redis import asyncio as redis
+        except ImportError as error:
+            raise RuntimeError(
+                "SECRET_STORE_URL is set but the redis package is not installed",
+            ) from error
+
+        self._client = redis.from_url(url)
+        self._check = self._client.register_script(self.CHECK_SCRIPT)
+        self._increment = self._client.register_script(self.INCREMENT_SCRIPT)
+
+    async def set(self, key: str, digest: str, ttl_seconds: float) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={"digest": digest, "attempts": 0})
+            pipe.pexpire(key, int(ttl_seconds * 1000))
+            await pipe.execute()
+
+    async def check(
+        self,
+        key: str,
+        digest: str,
+        max_attempts: int,
+        consume: bool,
+    ) -> SecretCheck:
+        result = await self._check(
+            keys=[key],
+            args=[digest, max_attempts, "1" if consume else "0"],
+        )
+        if result == -1:
+            return SecretCheck.MISSING
+        return SecretCheck.VALID if result == 1 else SecretCheck.INVALID
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def increment(self, key: str, ttl_seconds: float) -> int:
+        return int(
+            await self._increment(keys=[key], args=[int(ttl_seconds * 1000)]),
+        )
+
+    async def count(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+# ---------------------------------------------------------------------------
+class SecretStore:
+    """
+    ! Short-lived numeric secrets (dynamic passwords, OTP & verify codes)
+
+    Secrets are kept as HMAC digests keyed with SECRET_KEY, expire after
+    their ttl and are dropped after max_attempts wrong guesses, so the
+    database is not written on every code request.
+
+    Parameters
+    ----------
+    backend
+        Storage of digests
+    max_attempts
+        Wrong guesses before secret is dropped
+    digits
+        Length of generated codes
+    """
+
+    def __init__(self, backend: SecretBackend, max_attempts: int, digits: int = 6):
+        self.backend = backend
+        self.max_attempts = max_attempts
+        self.digits = digits
+
+    @staticmethod
+    def _key(purpose: SecretPurpose, subject: str) -> str:
+        return f"secret:{purpose.value}:{subject}"
+
+    @staticmethod
+    def _digest(key: str, secret: int | str) -> str:
+        return hmac.new(
+            settings.SECRET_KEY.encode(),
+            f"{key}:{secret}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+
+    async def issue(
+        self,
+        *,
+        purpose: SecretPurpose,
+        subject: str,
+        ttl_seconds: float,
+    ) -> IssuedSecret:
+        """
+        ! Generate new code of subject, previous code is replaced
+
+        Parameters
+        ----------
+        purpose
+            Usage of code
+        subject
+            Owner of code (e.g. card number or username)
+        ttl_seconds
+            Life time of code
+
+        Returns
+        -------
+        issued
+            Generated code and its expiration time
+        """
+        low = 10 ** (self.digits - 1)
+        code = low + secrets.randbelow(9 * low)
+        key = self._key(purpose, subject)
+        await self.backend.set(key, self._digest(key, code), ttl_seconds)
+        return IssuedSecret(
+            code=code,
+            expire_at=datetime.now(tz=timezone.utc) + timedelta(seconds=ttl_seconds),
+        )
+
+    async def verify(
+        self,
+        *,
+        purpose: SecretPurpose,
+        subject: str,
+        secret: int | str | None,
+        consume: bool = True,
+    ) -> bool:
+        """
+        ! Verify code of subject
+
+        Parameters
+        ----------
+        purpose
+            Usage of code
+        subject
+            Owner of code
+        secret
+            Received code
+        consume
+            Drop code when it is valid, pass False and call discard when the
+            code must survive a failed operation
+
+        Returns
+        -------
+        res
+            Code is valid
+        """
+        if secret is None or secret == "":
+            return False
+
+        key = self._key(purpose, subject)
+        result = await self.backend.check(
+            key,
+            self._digest(key, secret),
+            self.max_attempts,
+            consume,
+        )
+        return result == SecretCheck.VALID
+
+    async def discard(self, *, purpose: SecretPurpose, subject: str) -> None:
+        """
+        ! Drop code of subject
+
+        Parameters
+        ----------
+        purpose
+            Usage of code
+        subject
+            Owner of code
+        """
+        await self.backend.delete(self._key(purpose, subject))
+
+    async def add_failure(
+        self,
+        *,
+        counter: str,
+        subject: str,
+        ttl_seconds: float,
+    ) -> int:
+        """
+        ! Count failed operation of subject in state shared by all workers
+
+        Parameters
+        ----------
+        counter
+            Name of counted operation (e.g. terminal)
+        subject
+            Owner of counter
+        ttl_seconds
+            Life time of counter, counted from its first failure
+
+        Returns
+        -------
+        failures
+            Failures of subject in current window
+        """
+        return await self.backend.increment(
+            f"failures:{counter}:{subject}",
+            ttl_seconds,
+        )
+
+    async def count_failures(self, *, counter: str, subject: str) -> int:
+        """
+        ! Get failed operations of subject
+
+        Parameters
+        ----------
+        counter
+            Name of counted operation
+        subject
+            Owner of counter
+
+        Returns
+        -------
+        failures
+            Failures of subject in current window
+        """
+        return await self.backend.count(f"failures:{counter}:{subject}")
+
+    async def close(self) -> None:
+        """
+        ! Close connection of backend
+        """
+        await self.backend.close()
+
+
+# ---------------------------------------------------------------------------
+def _secret_backend() -> SecretBackend:
+    if settings.SECRET_STORE_URL:
+        return RedisSecretBackend(url=settings.SECRET_STORE_URL)
+    # ? Production runs several gunicorn workers, a code issued by one worker
+    # ? must be verifiable by every other worker
+    if os.environ.get("APP_ENV") == "Production":
+        raise RuntimeError(
+            "SECRET_STORE_URL is required in production, "
+            "in memory codes are not shared between workers",
+        )
+    return MemorySecretBackend(max_size=settings.SECRET_STORE_MAX_SIZE)
+
+
+secret_store = SecretStore(
+    backend=_secret_backend(),
+    max_attempts=settings.SECRET_STORE_MAX_ATTEMPTS,
+)
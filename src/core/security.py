@@ -1,13 +1,25 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, Iterable, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from src.core.config import settings
+from src.exception import ServerIsBusyException
+
+ResultType = TypeVar("ResultType")
 
 # ---------------------------------------------------------------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# ? Hashes with another cost factor are rehashed on next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -50,6 +62,136 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return result
 
 
+# ---------------------------------------------------------------------------
+class PasswordHasher:
+    """
+    ! Bcrypt hashing off the event loop
+
+    Hashes run on a small thread pool (bcrypt releases the GIL), so the
+    loop keeps serving other requests while a login is verified. At most
+    max_pending calls are accepted at once, the others fail fast with
+    ServerIsBusyException instead of queueing without bound.
+
+    Parameters
+    ----------
+    workers
+        Number of hashing threads
+    max_pending
+        Maximum number of running & waiting calls
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def _run(self, function: Callable[..., ResultType], *args) -> ResultType:
+        if self.pending >= self.max_pending:
+            raise ServerIsBusyException()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash",
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, function, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        ! Hash password
+
+        Parameters
+        ----------
+        password
+            Target password
+
+        Returns
+        -------
+        hash_password
+            hashed password
+
+        Raises
+        ------
+        ServerIsBusyException
+        """
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        ! Verify password with hash password
+
+        Parameters
+        ----------
+        plain_password
+            The password to be confirmed
+        hashed_password
+            The hashed password
+
+        Returns
+        -------
+        res
+            Result of operation
+
+        Raises
+        ------
+        ServerIsBusyException
+        """
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, str | None]:
+        """
+        ! Verify password and rehash it if its hash is outdated
+
+        Parameters
+        ----------
+        plain_password
+            The password to be confirmed
+        hashed_password
+            The hashed password
+
+        Returns
+        -------
+        res
+            Result of operation
+        new_hash
+            New hash when the password is correct and its hash is outdated
+
+        Raises
+        ------
+        ServerIsBusyException
+        """
+        return await self._run(
+            pwd_context.verify_and_update,
+            plain_password,
+            hashed_password,
+        )
+
+    def shutdown(self) -> None:
+        """
+        ! Stop hashing threads
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# ---------------------------------------------------------------------------
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 # ---------------------------------------------------------------------------
 def generate_access_token(
     data: dict[str, Any],
@@ -83,3 +225,62 @@ def generate_access_token(
         algorithm=settings.ALGORITHM,
     )
     return encoded_data
+
+
+# ---------------------------------------------------------------------------
+def encode_permission_bitmap(permission_codes: Iterable[int]) -> str:
+    """
+    ! Encode permission codes as hex bitmap (bit n is set for code n)
+
+    Parameters
+    ----------
+    permission_codes
+        Target permission codes
+
+    Returns
+    -------
+    bitmap
+        Hex encoded bitmap
+    """
+    bitmap = 0
+    for code in permission_codes:
+        bitmap |= 1 << code
+    return format(bitmap, "x")
+
+
+# ---------------------------------------------------------------------------
+def decode_permission_bitmap(bitmap: str) -> int:
+    """
+    ! Decode hex bitmap of permission codes
+
+    Parameters
+    ----------
+    bitmap
+        Hex encoded bitmap
+
+    Returns
+    -------
+    bitmap
+        Bitmap as integer
+    """
+    return int(bitmap, 16) if bitmap else 0
+
+
+# ---------------------------------------------------------------------------
+def has_permissions(bitmap: int, required_mask: int) -> bool:
+    """
+    ! Verify bitmap contains every required permission
+
+    Parameters
+    ----------
+    bitmap
+        Permission bitmap of token
+    required_mask
+        Bitmap of required permission codes
+
+    Returns
+    -------
+    result
+        Result of operation
+    """
+    return bitmap & required_mask == required_mask
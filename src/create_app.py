@@ -9,9 +9,20 @@ from src.capital_transfer.routes import router as capital_transfer_router
 from src.card.routes import router as card_router
 from src.contract.routes import router as contract_router
 from src.core.config import settings
+from src.core.metrics import MetricsMiddleware
 from src.credit.routes import router as credit_router
 from src.crypto.routes import router as crypto_router
+from src.database.instrumentation import QueryStatsMiddleware
+from src.database.pagination import (
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_ESTIMATED_HEADER,
+    TOTAL_COUNT_HEADER,
+)
 from src.fee.routes import router as fee_router
+from src.idempotency.middleware import (
+    IDEMPOTENCY_REPLAYED_HEADER,
+    IdempotencyMiddleware,
+)
 from src.important_data.routes import router as important_data_router
 from src.invoice.routes import router as invoice_router
 from src.location.routes import router as location_router
@@ -21,6 +32,7 @@ from src.organization.routes import router as organization_router
 from src.permission.routes import router as permission_router
 from src.pos.routes import router as pos_router
 from src.role.routes import router as role_router
+from src.terminal.routes import router as terminal_router
 from src.ticket.routes import router as ticket_router
 from src.ticket_message.routes import router as ticket_message_router
 from src.transaction.routes import router as transaction_router
@@ -64,11 +76,35 @@ def create_fastapi_app():
     app.include_router(user_crypto_router)
     app.include_router(crypto_router)
     app.include_router(wallet_router)
+    app.include_router(terminal_router)
+    # ? Inside CORS, so replayed responses get fresh CORS headers
+    app.add_middleware(
+        middleware_class=IdempotencyMiddleware,
+        # ? Raw body uploads are streamed & size checked by their routes
+        exempt_paths=(
+            "/contract/upload_file",
+            "/capital_transfer/upload_receipt",
+            "/user/profile_image",
+        ),
+    )
     app.add_middleware(
         middleware_class=CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            NEXT_CURSOR_HEADER,
+            TOTAL_COUNT_HEADER,
+            TOTAL_COUNT_ESTIMATED_HEADER,
+            IDEMPOTENCY_REPLAYED_HEADER,
+            "ETag",
+            "Server-Timing",
+        ],
     )
+    # ? Outside the others, so queries of all middlewares are counted
+    app.add_middleware(middleware_class=QueryStatsMiddleware)
+    # ? Outermost, so latency covers every middleware
+    if settings.METRICS_ENABLED:
+        app.add_middleware(middleware_class=MetricsMiddleware)
     return app
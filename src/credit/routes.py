@@ -1,12 +1,16 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.sql.expression import Select
 
 from src import deps
 from src.credit.crud import credit as credit_crud
 from src.credit.models import Credit
 from src.credit.schema import CreditFilter, CreditFilterOrderFild, CreditRead
+from src.database.export import ExportFormat, export_response
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.schema import IDRequest
 from src.user.models import User
@@ -15,6 +19,52 @@ from src.user.models import User
 router = APIRouter(prefix="/credit", tags=["credit"])
 
 
+# ---------------------------------------------------------------------------
+def _filter_query(filter_data: CreditFilter) -> Select:
+    """
+    ! Credits query of filter
+
+    Parameters
+    ----------
+    filter_data
+        Filter data
+
+    Returns
+    -------
+    query
+        Ordered query
+    """
+    query = select(Credit)
+    # * Prepare order fields
+    if filter_data.order_by:
+        for field in filter_data.order_by.desc:
+            # * Add filter fields
+            if field == CreditFilterOrderFild.received:
+                query = query.order_by(Credit.received.desc())
+            elif field == CreditFilterOrderFild.consumed:
+                query = query.order_by(Credit.consumed.desc())
+            elif field == CreditFilterOrderFild.remaining:
+                query = query.order_by(Credit.remaining.desc())
+            elif field == CreditFilterOrderFild.transferred:
+                query = query.order_by(Credit.transferred.desc())
+            elif field == CreditFilterOrderFild.debt:
+                query = query.order_by(Credit.debt.desc())
+        for field in filter_data.order_by.asc:
+            # * Add filter fields
+            if field == CreditFilterOrderFild.received:
+                query = query.order_by(Credit.received.asc())
+            elif field == CreditFilterOrderFild.consumed:
+                query = query.order_by(Credit.consumed.asc())
+            elif field == CreditFilterOrderFild.remaining:
+                query = query.order_by(Credit.remaining.asc())
+            elif field == CreditFilterOrderFild.transferred:
+                query = query.order_by(Credit.transferred.asc())
+            elif field == CreditFilterOrderFild.debt:
+                query = query.order_by(Credit.debt.asc())
+
+    return query
+
+
 # ---------------------------------------------------------------------------
 @router.post(path="/find", response_model=CreditRead)
 async def get_credit(
@@ -86,6 +136,7 @@ async def get_credit_my(
 @router.get(path="/list", response_model=List[CreditRead])
 async def get_list_credit(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_WALLET]),
@@ -93,6 +144,7 @@ async def get_list_credit(
     filter_data: CreditFilter,
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[CreditRead]:
     """
     ! Get All Credit
@@ -107,6 +159,8 @@ async def get_list_credit(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -115,38 +169,54 @@ async def get_list_credit(
     obj_list
         List of ability
     """
-    # * Prepare filter fields
-    filter_data.name = (
-        Credit.name.contains(filter_data.name) if filter_data.name else False
-    )
-    # * Add filter fields
-    query = select(Credit).filter()
-    # * Prepare order fields
-    if filter_data.order_by:
-        for field in filter_data.order_by.received:
-            # * Add filter fields
-            if field == CreditFilterOrderFild.received:
-                query = query.order_by(Credit.received.desc())
-            elif field == CreditFilterOrderFild.consumed:
-                query = query.order_by(Credit.consumed.desc())
-            elif field == CreditFilterOrderFild.remaining:
-                query = query.order_by(Credit.remaining.desc())
-            elif field == CreditFilterOrderFild.transferred:
-                query = query.order_by(Credit.transferred.desc())
-            elif field == CreditFilterOrderFild.debt:
-                query = query.order_by(Credit.debt.desc())
-        for field in filter_data.order_by.asc:
-            # * Add filter fields
-            if field == CreditFilterOrderFild.received:
-                query = query.order_by(Credit.received.asc())
-            elif field == CreditFilterOrderFild.consumed:
-                query = query.order_by(Credit.consumed.asc())
-            elif field == CreditFilterOrderFild.remaining:
-                query = query.order_by(Credit.remaining.asc())
-            elif field == CreditFilterOrderFild.transferred:
-                query = query.order_by(Credit.transferred.asc())
-            elif field == CreditFilterOrderFild.debt:
-                query = query.order_by(Credit.debt.asc())
+    query = _filter_query(filter_data)
     # * Find All ability with filters
-    obj_list = await credit_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await credit_crud.get_multi_with_total(
+        db=db,
+        query=query,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
+
+
+# ---------------------------------------------------------------------------
+@router.post(path="/export", response_class=StreamingResponse)
+async def export_credit_list(
+    *,
+    current_user: User = Depends(
+        deps.get_current_user_with_permissions([permission.VIEW_WALLET]),
+    ),
+    filter_data: CreditFilter,
+    export_format: ExportFormat = ExportFormat.CSV,
+) -> StreamingResponse:
+    """
+    ! Export All Credit
+
+    Parameters
+    ----------
+    current_user
+        Requester User
+    filter_data
+        Filter data
+    export_format
+        Format of file
+
+    Returns
+    -------
+    response
+        Streamed file of credits
+
+    Raises
+    ------
+    ServerIsBusyException
+    """
+    return export_response(
+        crud=credit_crud,
+        schema=CreditRead,
+        filename="credits",
+        export_format=export_format,
+        query=_filter_query(filter_data),
+    )
@@ -1,10 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from src import deps
+from src.core.response_cache import response_cache
 from src.crypto.crud import crypto as crypto_crud
 from src.crypto.schema import CryptoCreate, CryptoRead, CryptoUpdate
+from src.database.pagination import Page
 from src.permission import permission_codes as permission
 from src.schema import DeleteResponse, IDRequest
 from src.user.models import User
@@ -48,6 +50,7 @@ async def delete_crypto(
     await crypto_crud.verify_existence(db=db, crypto_id=delete_data.id)
     # * Delete crypto
     await crypto_crud.delete(db=db, item_id=delete_data.id)
+    response_cache.invalidate("crypto")
     return DeleteResponse(result="Crypto Deleted Successfully")
 
 
@@ -86,6 +89,7 @@ async def create_crypto(
     await crypto_crud.verify_duplicate_name(db=db, name=create_data.name)
     # * Create crypto
     obj = await crypto_crud.create(db=db, obj_in=create_data)
+    response_cache.invalidate("crypto")
     return obj
 
 
@@ -137,6 +141,7 @@ async def update_crypto(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    response_cache.invalidate("crypto")
     return obj
 
 
@@ -180,13 +185,15 @@ async def get_crypto(
 @router.get(path="/list", response_model=List[CryptoRead])
 async def get_crypto_list(
     *,
+    request: Request,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_CRYPTO]),
     ),
     skip: int = 0,
     limit: int = 20,
-) -> List[CryptoRead]:
+    cursor: str | None = None,
+) -> Response:
     """
     ! Get All Crypto
 
@@ -200,11 +207,26 @@ async def get_crypto_list(
         Pagination skip
     limit
         agination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     obj_list
         list of crypto
     """
-    obj_list = await crypto_crud.get_multi(db=db, skip=skip, limit=limit)
-    return obj_list
+
+    async def load_page() -> Page:
+        return await crypto_crud.get_multi_with_total(
+            db=db,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    return await response_cache.respond(
+        request=request,
+        namespace="crypto",
+        schema=CryptoRead,
+        load=load_page,
+    )
@@ -1,7 +1,6 @@
 # ? All models that should be considered in db with alembic migrations
 from src.database.base_class import Base
 from src.user.models import User
-from src.verify_phone.models import VerifyPhone
 from src.permission.models import Permission
 from src.role.models import Role, RolePermission
 from src.agent.models import Agent, AgentAbility, AgentLocation
@@ -18,7 +17,7 @@ from src.credit.models import Credit
 from src.merchant.models import Merchant
 from src.important_data.models import ImportantData
 from src.fee.models import Fee
-from src.transaction.models import Transaction
+from src.transaction.models import Transaction, TransactionRollup
 from src.invoice.models import Invoice
 from src.ticket.models import Ticket
 from src.ticket_message.models import TicketMessage
@@ -26,3 +25,4 @@ from src.pos.models import Pos
 from src.card.models import Card
 from src.user_crypto.models import UserCrypto
 from src.crypto.models import Crypto
+from src.idempotency.models import IdempotencyKey
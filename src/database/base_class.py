@@ -1,8 +1,9 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import Column, DateTime, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import declared_attr
 
 
 # ---------------------------------------------------------------------------
@@ -10,13 +11,16 @@ class BaseMixin:
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
-        index=True,
-        unique=True,
         default=uuid.uuid4,
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    @declared_attr
+    def __table_args__(cls):
+        # ? Backs keyset pagination ordered by (created_at, id)
+        return (Index(f"ix_{cls.__tablename__}_created_at_id", "created_at", "id"),)
+
 
 # ---------------------------------------------------------------------------
 Base = declarative_base()
@@ -1,13 +1,18 @@
 import uuid
-from typing import Any, Generic, Sequence, Type, TypeVar
+from typing import Any, AsyncIterator, Generic, Sequence, Type, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import Select
 
+from src.core.config import settings
 from src.database.base_class import Base
+from src.database.explain import estimate_rows
+from src.database.loading import LoadProfile
+from src.database.pagination import Page, decode_cursor, encode_cursor
+from src.exception import InvalidCursorException
 
 # ---------------------------------------------------------------------------
 ModelType = TypeVar("ModelType", bound=Base)
@@ -21,10 +26,19 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ? Base ORM Utils that use in all models
     """
 
+    # ? Count huge tables from planner statistics, see count
+    estimate_count: bool = False
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
-    async def get(self, *, db: AsyncSession, item_id: uuid.UUID) -> ModelType:
+    async def get(
+        self,
+        *,
+        db: AsyncSession,
+        item_id: uuid.UUID,
+        options: LoadProfile | None = None,
+    ) -> ModelType:
         """
         ? Get Item With ID
 
@@ -34,13 +48,18 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             Target database connection
         item_id
             Target Item ID
+        options
+            Loading profile of relations
 
         Returns
         -------
         obj
             Found item
         """
-        response = await db.execute(select(self.model).where(self.model.id == item_id))
+        query = select(self.model).where(self.model.id == item_id)
+        if options:
+            query = query.options(*options)
+        response = await db.execute(query)
         return response.scalar_one_or_none()
 
     async def get_by_ids(
@@ -48,6 +67,7 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         db: AsyncSession,
         list_ids: list[uuid.UUID],
+        options: LoadProfile | None = None,
     ) -> Sequence[ModelType] | None:
         """
         ? Get Multiple Item With ID List
@@ -58,26 +78,175 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             Target database connection
         list_ids
             Target id list
+        options
+            Loading profile of relations
 
         Returns
         -------
         obj_list
             Found items
         """
-        response = await db.execute(
-            select(self.model).where(self.model.id.in_(list_ids)),
-        )
+        query = select(self.model).where(self.model.id.in_(list_ids))
+        if options:
+            query = query.options(*options)
+        response = await db.execute(query)
         obj_list = response.scalars().all()
 
         return obj_list
 
+    def _keyset_order(self, query: Select) -> Select:
+        """
+        ? Order query by (created_at, id), newest first
+
+        Parameters
+        ----------
+        query
+            Target query
+
+        Returns
+        -------
+        query
+            Ordered query
+        """
+        return query.order_by(self.model.created_at.desc(), self.model.id.desc())
+
+    def _paginate_query(
+        self,
+        *,
+        query: Select | None,
+        skip: int,
+        limit: int,
+        cursor: str | None,
+    ) -> tuple[Select, bool]:
+        """
+        ? Apply offset or keyset pagination to query
+
+        Queries without their own ordering are ordered by (created_at, id),
+        which is backed by the created_at/id index of every table.
+
+        Parameters
+        ----------
+        query
+            Customize query for filter
+        skip
+            Skip some item from list, ignored when cursor is passed
+        limit
+            Limit of item's count
+        cursor
+            Cursor of previous page
+
+        Returns
+        -------
+        query
+            Paginated query
+        is_keyset
+            Query is ordered by (created_at, id)
+
+        Raises
+        ------
+        InvalidCursorException
+            Cursor is invalid or query has its own ordering
+        """
+        if query is None:
+            query = select(self.model)
+
+        # * Custom ordering can only be paged with offset
+        is_keyset = not query._order_by_clauses
+        if cursor and not is_keyset:
+            raise InvalidCursorException()
+
+        if is_keyset:
+            query = self._keyset_order(query)
+        if cursor:
+            created_at, item_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(self.model.created_at, self.model.id)
+                < tuple_(created_at, item_id),
+            )
+        else:
+            query = query.offset(skip)
+
+        return query.limit(limit), is_keyset
+
+    def _filter_query(self, query: Select | None) -> Select:
+        """
+        ? Query without ordering & pagination, for counting
+        """
+        if query is None:
+            query = select(self.model)
+        return query.order_by(None).limit(None).offset(None)
+
+    async def count(
+        self,
+        *,
+        db: AsyncSession,
+        query: Select | None = None,
+        estimate: bool | None = None,
+    ) -> tuple[int, bool]:
+        """
+        ? Count Items With Filter
+
+        Estimated counts come from the planner, counts below
+        COUNT_ESTIMATE_THRESHOLD are counted exactly anyway.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        query
+            Customize query for filter
+        estimate
+            Estimate count, defaults to estimate_count of model
+
+        Returns
+        -------
+        count
+            Items count
+        is_estimated
+            Count is estimated
+        """
+        query = self._filter_query(query)
+        if estimate is None:
+            estimate = self.estimate_count
+
+        if estimate:
+            estimated = await estimate_rows(db=db, query=query)
+            if estimated >= settings.COUNT_ESTIMATE_THRESHOLD:
+                return estimated, True
+
+        response = await db.execute(
+            select(func.count()).select_from(query.subquery()),
+        )
+        return response.scalar_one(), False
+
+    async def exists(self, *, db: AsyncSession, query: Select | None = None) -> bool:
+        """
+        ? Any Item Exists With Filter
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        query
+            Customize query for filter
+
+        Returns
+        -------
+        res
+            At least one item is found
+        """
+        response = await db.execute(select(self._filter_query(query).exists()))
+        return response.scalar_one()
+
     async def get_multi(
         self,
         *,
         db: AsyncSession,
         query: Select | None = None,
         skip: int = 0,
-        limit: int = 20,
+        limit: int | None = None,
+        cursor: str | None = None,
+        options: LoadProfile | None = None,
     ) -> Sequence[ModelType] | None:
         """
         ? Get Multiple Item With Filter
@@ -91,19 +260,144 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         skip
             Skip some item from list
         limit
-            Limit of item's count
+            Limit of item's count, 20 by default. Custom queries without
+            skip, limit & cursor return all of their rows
+        cursor
+            Cursor of previous page, used instead of skip
+        options
+            Loading profile of relations
 
         Returns
         -------
         obj_list
             Found items
+
+        Raises
+        ------
+        InvalidCursorException
         """
-        if query is None:
-            query = select(self.model).offset(skip).limit(limit)
+        if query is not None and limit is None and not skip and not cursor:
+            if options:
+                query = query.options(*options)
+            response = await db.execute(query)
+            return response.scalars().all()
+
+        page = await self.get_page(
+            db=db,
+            query=query,
+            skip=skip,
+            limit=20 if limit is None else limit,
+            cursor=cursor,
+            options=options,
+        )
+        return page.items
+
+    async def get_page(
+        self,
+        *,
+        db: AsyncSession,
+        query: Select | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        options: LoadProfile | None = None,
+    ) -> Page:
+        """
+        ? Get One Page Of Items With Filter
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        query
+            Customize query for filter
+        skip
+            Skip some item from list
+        limit
+            Limit of item's count
+        cursor
+            Cursor of previous page, used instead of skip
+        options
+            Loading profile of relations
+
+        Returns
+        -------
+        page
+            Found items & cursor of next page
+
+        Raises
+        ------
+        InvalidCursorException
+        """
+        query, is_keyset = self._paginate_query(
+            query=query,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+        if options:
+            query = query.options(*options)
         response = await db.execute(query)
         obj_list = response.scalars().all()
 
-        return obj_list
+        next_cursor = None
+        if is_keyset and obj_list and len(obj_list) == limit:
+            last = obj_list[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        return Page(items=obj_list, next_cursor=next_cursor)
+
+    async def get_multi_with_total(
+        self,
+        *,
+        db: AsyncSession,
+        query: Select | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        options: LoadProfile | None = None,
+    ) -> Page:
+        """
+        ? Get One Page Of Items With Count Of All Filtered Items
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        query
+            Customize query for filter
+        skip
+            Skip some item from list
+        limit
+            Limit of item's count
+        cursor
+            Cursor of previous page, used instead of skip
+        options
+            Loading profile of relations
+
+        Returns
+        -------
+        page
+            Found items, cursor of next page & total count
+
+        Raises
+        ------
+        InvalidCursorException
+        """
+        page = await self.get_page(
+            db=db,
+            query=query,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            options=options,
+        )
+        # ? First page that is not full has all items
+        if not cursor and not skip and len(page.items) < limit:
+            return page._replace(total=len(page.items))
+
+        total, is_estimated = await self.count(db=db, query=query)
+        return page._replace(total=total, total_is_estimated=is_estimated)
 
     async def create(self, *, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
         """
@@ -214,3 +508,50 @@ class BaseCRUD(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             await db.delete(obj)
             await db.commit()
         return True
+
+    async def stream(
+        self,
+        *,
+        db: AsyncSession,
+        query: Select | None = None,
+        batch_size: int = 1_000,
+        options: LoadProfile | None = None,
+    ) -> AsyncIterator[Sequence[ModelType]]:
+        """
+        ? Stream All Items With Filter In Batches
+
+        Rows are read from a server side cursor, batch by batch, so memory
+        does not grow with the number of rows. Queries without their own
+        ordering are ordered by (created_at, id).
+
+        Parameters
+        ----------
+        db
+            Target database connection, kept busy until stream is closed
+        query
+            Customize query for filter
+        batch_size
+            Rows fetched from cursor at once
+        options
+            Loading profile of relations
+
+        Returns
+        -------
+        batches
+            Found items, at most batch_size per batch
+        """
+        if query is None:
+            query = select(self.model)
+        if not query._order_by_clauses:
+            query = self._keyset_order(query)
+        if options:
+            query = query.options(*options)
+
+        response = await db.stream_scalars(
+            query.execution_options(yield_per=batch_size),
+        )
+        try:
+            async for batch in response.partitions():
+                yield batch
+        finally:
+            await response.close()
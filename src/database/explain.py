@@ -0,0 +1,56 @@
+from typing import Any
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable, Select
+
+
+# ---------------------------------------------------------------------------
+class Explain(Executable, ClauseElement):
+    """
+    ! EXPLAIN (FORMAT JSON) of statement, without running it
+
+    Parameters
+    ----------
+    statement
+        Target statement
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+# ---------------------------------------------------------------------------
+async def estimate_rows(*, db: AsyncSession, query: Select) -> int:
+    """
+    ! Row count of query estimated by the planner
+
+    The estimate comes from table statistics (updated by ANALYZE &
+    autovacuum), so it costs one planning step on any table size but may
+    be far from the real count for selective or correlated filters.
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    query
+        Target query, without order & limit
+
+    Returns
+    -------
+    rows
+        Estimated row count
+    """
+    response = await db.execute(Explain(query))
+    plan = response.scalar_one()
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,167 @@
+import csv
+import enum
+import io
+import threading
+from typing import Any, AsyncIterator, Type
+
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.sql.expression import Select
+from starlette.types import Receive, Scope, Send
+
+from src.core.config import settings
+from src.database.base_crud import BaseCRUD
+from src.database.loading import COLUMNS_ONLY
+from src.database.session import ExportSessionLocal
+from src.exception import ServerIsBusyException
+
+# ---------------------------------------------------------------------------
+# ? Concurrent exports of current worker, one connection of export pool each,
+# ? taken without waiting so a busy worker answers before streaming starts
+export_slots = threading.BoundedSemaphore(settings.EXPORT_DB_POOL_SIZE)
+# ? Spreadsheet apps run cells that start with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+# ---------------------------------------------------------------------------
+class ExportFormat(enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+# ---------------------------------------------------------------------------
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _encode(
+    rows: list[dict[str, Any]],
+    export_format: ExportFormat,
+    fields: list[str],
+) -> bytes:
+    if export_format == ExportFormat.NDJSON:
+        return b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(row[field]) for field in fields] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def _export_rows(
+    *,
+    crud: BaseCRUD,
+    query: Select | None,
+    schema: Type[BaseModel],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    fields = list(schema.model_fields)
+    if export_format == ExportFormat.CSV:
+        # ? BOM lets spreadsheet apps read persian text as utf-8
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(fields)
+        yield b"\xef\xbb\xbf" + buffer.getvalue().encode()
+
+    async with ExportSessionLocal() as db:
+        async for batch in crud.stream(
+            db=db,
+            query=query,
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            options=COLUMNS_ONLY,
+        ):
+            rows = [
+                schema.model_validate(obj, from_attributes=True).model_dump(
+                    mode="json",
+                )
+                for obj in batch
+            ]
+            # ? Drop exported rows from identity map, memory stays flat
+            db.expunge_all()
+            yield _encode(rows, export_format, fields)
+
+
+# ---------------------------------------------------------------------------
+class ExportResponse(StreamingResponse):
+    """
+    ! Streamed export that gives its export slot back when it ends
+
+    The slot is taken by export_response, it is released after the rows
+    are closed, whether the file was sent, the client left or it failed.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                # ? Also closes the session of a cancelled or never started export
+                await self.body_iterator.aclose()
+            finally:
+                export_slots.release()
+
+
+# ---------------------------------------------------------------------------
+def export_response(
+    *,
+    crud: BaseCRUD,
+    schema: Type[BaseModel],
+    filename: str,
+    export_format: ExportFormat = ExportFormat.CSV,
+    query: Select | None = None,
+) -> StreamingResponse:
+    """
+    ! Stream all rows of query as a CSV or NDJSON file
+
+    Rows are read with a server side cursor on the export pool while the
+    response is sent, so neither worker memory nor api connections grow
+    with the size of the export.
+
+    Parameters
+    ----------
+    crud
+        Crud of exported model
+    schema
+        Read schema of rows, its fields are the columns of file
+    filename
+        Name of downloaded file, without extension
+    export_format
+        Format of file
+    query
+        Customize query for filter
+
+    Returns
+    -------
+    response
+        Streamed file
+
+    Raises
+    ------
+    ServerIsBusyException
+        All export connections of this worker are busy
+    """
+    if not export_slots.acquire(blocking=False):
+        raise ServerIsBusyException()
+
+    return ExportResponse(
+        _export_rows(
+            crud=crud,
+            query=query,
+            schema=schema,
+            export_format=export_format,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            ),
+        },
+    )
@@ -1,19 +1,25 @@
+from typing import Any, Type
+from uuid import uuid4
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.schema import UserInDB
 from src.core.config import settings
 from src.core.security import hash_password
+from src.database.base_class import Base
 from src.database.utils.locations import location_in
 from src.database.utils.permissions import permissions_in
-from src.important_data.crud import important_data as important_data_crud
+from src.important_data.models import ImportantData
 from src.important_data.schema import ImportantDataCreate
-from src.location.crud import location as location_crud
-from src.location.schema import LocationCreate
-from src.permission.crud import permission as permission_crud
-from src.role.crud import role as role_crud
-from src.role.crud import role_permission as role_permission_crud
-from src.role.schema import RoleCreate, RolePermissionCreate
-from src.user.crud import user as user_crud
+from src.location.models import Location
+from src.location.tree import build_path
+from src.permission.models import Permission
+from src.role.models import Role, RolePermission
+from src.role.schema import RoleCreate
+from src.transaction.ledger import SYSTEM_WALLET_NUMBER
+from src.user.models import User
+from src.wallet.models import Wallet
 
 # ---------------------------------------------------------------------------
 admin_role = RoleCreate(name="ادمین")
@@ -28,11 +34,37 @@ roles_in: list[RoleCreate] = [
     RoleCreate(name="کاربر ساده"),
 ]
 
+# ? Only one worker seeds the database, the others skip it
+INIT_DB_LOCK_KEY = 4_218_067_301
+
 
 # ---------------------------------------------------------------------------
-async def init_db(db: AsyncSession) -> None:
+async def insert_missing(
+    *,
+    db: AsyncSession,
+    model: Type[Base],
+    rows: list[dict[str, Any]],
+) -> None:
     """
-    * Initial default data in database
+    * Insert rows in one statement, rows that conflict are skipped
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    model
+        Target model
+    rows
+        New rows
+    """
+    if rows:
+        await db.execute(insert(model).values(rows).on_conflict_do_nothing())
+
+
+# ---------------------------------------------------------------------------
+async def seed_roles(db: AsyncSession) -> dict[str, Any]:
+    """
+    * Create missing roles
 
     Parameters
     ----------
@@ -41,74 +73,226 @@ async def init_db(db: AsyncSession) -> None:
 
     Returns
     -------
-    response
-        result of operation
+    role_ids
+        ID of every role by name
     """
-    # ! Generate all project roles
-    for role in roles_in:
-        # Check roles except admin exists or not
-        role_exist = await role_crud.find_by_name(db=db, name=role.name)
-        if not role_exist:
-            await role_crud.create(db=db, obj_in=role)
+    response = await db.execute(select(Role.name, Role.id))
+    role_ids = dict(response.all())
+    await insert_missing(
+        db=db,
+        model=Role,
+        rows=[{"name": role.name} for role in roles_in if role.name not in role_ids],
+    )
+    response = await db.execute(select(Role.name, Role.id))
+    return dict(response.all())
 
-    # ! Generate Admin user
-    admin_user = await user_crud.find_by_username(
+
+# ---------------------------------------------------------------------------
+async def seed_admin(db: AsyncSession, role_id: Any) -> None:
+    """
+    * Create admin user if not exists
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    role_id
+        Admin role's id
+    """
+    response = await db.execute(
+        select(User.id).where(User.username == settings.ADMIN_USERNAME),
+    )
+    if response.scalar_one_or_none():
+        return
+
+    await insert_missing(
+        db=db,
+        model=User,
+        rows=[
+            {
+                "username": settings.ADMIN_USERNAME,
+                "password": hash_password(settings.ADMIN_PASSWORD),
+                "national_code": settings.ADMIN_NATIONAL_CODE,
+                "role_id": role_id,
+            },
+        ],
+    )
+    # todo: Generate Wallet
+    # todo: Generate Credit
+
+
+# ---------------------------------------------------------------------------
+async def seed_permissions(db: AsyncSession, role_id: Any) -> None:
+    """
+    * Create missing permissions and give all of them to admin role
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    role_id
+        Admin role's id
+    """
+    response = await db.execute(select(Permission.code))
+    existing_codes = set(response.scalars().all())
+    await insert_missing(
         db=db,
-        username=settings.ADMIN_USERNAME,
+        model=Permission,
+        rows=[
+            perm.model_dump()
+            for perm in permissions_in
+            if perm.code not in existing_codes
+        ],
+    )
+
+    response = await db.execute(
+        select(Permission.id).where(
+            Permission.id.not_in(
+                select(RolePermission.permission_id).where(
+                    RolePermission.role_id == role_id,
+                ),
+            ),
+        ),
     )
-    role_admin = await role_crud.find_by_name(db=db, name=admin_role.name)
-    if not admin_user:
-        admin_in_db = UserInDB(
-            username=settings.ADMIN_USERNAME,
-            password=hash_password(settings.ADMIN_PASSWORD),
-            national_code=settings.ADMIN_NATIONAL_CODE,
-            role_id=role_admin.id,
+    rows = [
+        {"role_id": role_id, "permission_id": permission_id}
+        for permission_id in response.scalars().all()
+    ]
+    await insert_missing(db=db, model=RolePermission, rows=rows)
+    if rows:
+        # ? Tokens of admin role do not have new permissions
+        await db.execute(
+            update(Role).where(Role.id == role_id).values(version=Role.version + 1),
         )
-        await user_crud.create(db=db, obj_in=admin_in_db)
-        # todo: Generate Wallet
-        # todo: Generate Credit
-
-    # ! Generate all project permissions
-    for perm in permissions_in:
-        # Check if permission exists or not
-        permission_exist = await permission_crud.find_by_code(db=db, code=perm.code)
-        if not permission_exist:
-            # Create permission
-            permission_created = await permission_crud.create(db=db, obj_in=perm)
-            # Add permission for admin role
-            role_permission_in = RolePermissionCreate(
-                role_id=role_admin.id,
-                permission_id=permission_created.id,
-            )
-            await role_permission_crud.create(db=db, obj_in=role_permission_in)
 
-    # ! Generate all project permissions
+
+# ---------------------------------------------------------------------------
+async def seed_locations(db: AsyncSession) -> None:
+    """
+    * Create missing locations and their paths in one statement
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    """
+    # ? Parent name of every location, missing parents are created as root.
+    # ? Names are unique, first entry of a repeated name wins (e.g. the city
+    # ? of a province with the same name)
+    parent_names: dict[str, str | None] = {}
     for location in location_in:
-        # Check if location exists or not
-        location_exist = await location_crud.find_by_name(db=db, name=location.name)
-        if not location_exist:
-            parent_id = None
-            if location.parent_name:
-                parent_location_exist = await location_crud.find_by_name(
-                    db=db,
-                    name=location.parent_name,
-                )
-                if not parent_location_exist:
-                    parent_created = await location_crud.create(
-                        db=db,
-                        obj_in={"name": location.parent_name},
-                    )
-                    parent_id = parent_created.id
-                else:
-                    parent_id = parent_location_exist.id
-            print(parent_id)
-            create_location_data: LocationCreate = LocationCreate(
-                name=location.name,
-                parent_id=parent_id,
+        parent_names.setdefault(location.name, location.parent_name)
+    for parent_name in set(parent_names.values()) - {None}:
+        parent_names.setdefault(parent_name, None)
+
+    response = await db.execute(select(Location.name, Location.id, Location.path))
+    existing = {name: (location_id, path) for name, location_id, path in response}
+
+    # ? Ids are generated here, so paths of all levels are known before insert
+    rows: list[dict[str, Any]] = []
+
+    def resolve(name: str) -> tuple[Any, str]:
+        if name not in existing:
+            parent_name = parent_names[name]
+            parent_id, parent_path = (
+                resolve(parent_name) if parent_name else (None, None)
+            )
+            location_id = uuid4()
+            path = build_path(location_id, parent_path)
+            existing[name] = (location_id, path)
+            rows.append(
+                {
+                    "id": location_id,
+                    "name": name,
+                    "parent_id": parent_id,
+                    "path": path,
+                },
             )
-            await location_crud.create(db=db, obj_in=create_location_data)
+        return existing[name]
+
+    for name in parent_names:
+        resolve(name)
+    await insert_missing(db=db, model=Location, rows=rows)
+
+
+# ---------------------------------------------------------------------------
+async def seed_important_data(db: AsyncSession) -> None:
+    """
+    * Create important data if not exists
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    """
+    response = await db.execute(select(ImportantData.id).limit(1))
+    if not response.scalar_one_or_none():
+        await insert_missing(
+            db=db,
+            model=ImportantData,
+            rows=[important_data_in.model_dump()],
+        )
+
+
+# ---------------------------------------------------------------------------
+async def seed_system_wallet(db: AsyncSession) -> None:
+    """
+    * Create system wallet of ledger if not exists
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    """
+    await insert_missing(
+        db=db,
+        model=Wallet,
+        rows=[{"number": SYSTEM_WALLET_NUMBER, "cash_balance": 0, "credit_balance": 0}],
+    )
+
+
+# ---------------------------------------------------------------------------
+async def init_db(db: AsyncSession) -> None:
+    """
+    * Initial default data in database
+
+    Desired and existing data are compared with one query per table and
+    missing rows are inserted in bulk, all in one transaction that holds an
+    advisory lock.
+
+    Parameters
+    ----------
+    db
+        Target database connection
+
+    Returns
+    -------
+    response
+        result of operation
+    """
+    async with db.begin():
+        # ! Another worker is seeding
+        response = await db.execute(
+            select(func.pg_try_advisory_xact_lock(INIT_DB_LOCK_KEY)),
+        )
+        if not response.scalar_one():
+            return
+
+        # ! Generate all project roles
+        role_ids = await seed_roles(db=db)
+        role_admin_id = role_ids[admin_role.name]
+
+        # ! Generate Admin user
+        await seed_admin(db=db, role_id=role_admin_id)
+
+        # ! Generate all project permissions
+        await seed_permissions(db=db, role_id=role_admin_id)
+
+        # ! Generate all project locations
+        await seed_locations(db=db)
+
+        # ! Generate Important data
+        await seed_important_data(db=db)
 
-    # ! Generate Important data
-    find_important_data = await important_data_crud.get_important_data_count(db=db)
-    if not find_important_data:
-        await important_data_crud.create(db=db, obj_in=important_data_in)
+        # ! Generate System wallet
+        await seed_system_wallet(db=db)
@@ -0,0 +1,254 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_WAIT,
+)
+
+# ---------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+# ? Bind parameters, lists of them (IN clauses) are one parameter
+PARAMETERS = re.compile(r"\$\d+(?:\s*,\s*\$\d+)*")
+
+
+# ---------------------------------------------------------------------------
+class QueryStats:
+    """
+    ! Queries executed in one scope (usually one request)
+
+    Parameters
+    ----------
+    parent
+        Outer scope, every query is counted in it too
+    repeat_threshold
+        Statement shapes executed more than this are reported once
+    """
+
+    def __init__(self, parent: "QueryStats | None" = None, repeat_threshold: int = 0):
+        self.parent = parent
+        self.repeat_threshold = repeat_threshold
+        self.queries = 0
+        self.rows = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def add(self, statement: str, rows: int, duration: float) -> None:
+        """
+        ! Count one executed statement in this scope and its parents
+        """
+        shape = PARAMETERS.sub("?", statement)
+        stats = self
+        while stats is not None:
+            stats.queries += 1
+            stats.rows += rows
+            stats.duration += duration
+            stats.shapes[shape] += 1
+            if stats.repeat_threshold and (
+                stats.shapes[shape] == stats.repeat_threshold + 1
+            ):
+                logger.warning(
+                    "Statement is executed more than %s times in one request "
+                    "(N+1 queries?): %s",
+                    stats.repeat_threshold,
+                    shape[:500],
+                )
+            stats = stats.parent
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+
+# ---------------------------------------------------------------------------
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats",
+    default=None,
+)
+
+
+# ---------------------------------------------------------------------------
+def _before_cursor_execute(
+    conn,
+    cursor,
+    statement,
+    parameters,
+    context,
+    executemany,
+) -> None:
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn,
+    cursor,
+    statement,
+    parameters,
+    context,
+    executemany,
+) -> None:
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+    duration = time.perf_counter() - context._query_started_at
+    stats.add(statement, max(cursor.rowcount or 0, 0), duration)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    ! Async queue pool that reports time to check out a connection
+    """
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(
+                time.perf_counter() - started_at,
+                pool=self.metrics_name,
+            )
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    ! Count queries of engine in current query stats & report its pool
+
+    Parameters
+    ----------
+    engine
+        Target engine, sync_engine of async engines
+    name
+        Label of engine pool in metrics
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    engine.pool.metrics_name = name
+    # ? Read through engine, pool is replaced when engine is disposed
+    DB_POOL_SIZE.set_function(lambda: engine.pool.size(), pool=name)
+    DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout(), pool=name)
+    # ? Overflow counts up from -size, negative means unused pool slots
+    DB_POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0), pool=name)
+
+
+# ---------------------------------------------------------------------------
+class QueryStatsMiddleware:
+    """
+    ! Collect query stats of every request & report them as Server-Timing
+
+    Queries that run after the response is started (streamed bodies,
+    background tasks) are not part of the header.
+
+    Parameters
+    ----------
+    app
+        Wrapped asgi application
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        stats = QueryStats(
+            parent=current_query_stats.get(),
+            repeat_threshold=settings.QUERY_REPEAT_WARNING_THRESHOLD,
+        )
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = (time.perf_counter() - started_at) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.queries} '
+                    f'queries, {stats.rows} rows", app;dur={total:.1f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(
+                scope,
+                receive,
+                send_with_timing if settings.SERVER_TIMING_ENABLED else send,
+            )
+        finally:
+            current_query_stats.reset(token)
+
+
+# ---------------------------------------------------------------------------
+@contextmanager
+def assert_query_budget(
+    max_queries: int,
+    max_repeats: int | None = None,
+) -> Iterator[QueryStats]:
+    """
+    ! Fail when the wrapped code runs more queries than budget
+
+    Call the app in the same task (e.g. httpx.AsyncClient with
+    ASGITransport), queries of every request are counted in this scope.
+
+    Example
+    -------
+    with assert_query_budget(max_queries=3, max_repeats=1):
+        await client.get("/user/me", headers=headers)
+
+    Parameters
+    ----------
+    max_queries
+        Maximum number of queries
+    max_repeats
+        Maximum executions of one statement shape
+
+    Returns
+    -------
+    stats
+        Collected stats of the scope
+
+    Raises
+    ------
+    AssertionError
+        Budget is exceeded
+    """
+    stats = QueryStats(parent=current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+    message: list[str] = []
+    if stats.queries > max_queries:
+        message.append(f"{stats.queries} queries (budget {max_queries})")
+    if max_repeats is not None and stats.max_repeats > max_repeats:
+        shape, count = stats.shapes.most_common(1)[0]
+        message.append(f"{count} executions (budget {max_repeats}) of: {shape}")
+    if message:
+        raise AssertionError("Query budget exceeded: " + "; ".join(message))
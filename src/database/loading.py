@@ -0,0 +1,18 @@
+"""
+? Loading profiles
+
+Relationships of big collections are not loaded by default, every path
+chooses the relations it needs and passes them as ``options`` to crud
+methods. Profiles of one model live next to its crud.
+"""
+
+from typing import Sequence
+
+from sqlalchemy.orm import raiseload
+from sqlalchemy.sql.base import ExecutableOption
+
+# ---------------------------------------------------------------------------
+LoadProfile = Sequence[ExecutableOption]
+
+# ? Rows are serialized from their own columns, touching a relation raises
+COLUMNS_ONLY: LoadProfile = (raiseload("*"),)
@@ -0,0 +1,118 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from typing import Any, NamedTuple, Sequence
+
+import orjson
+from fastapi import Response
+
+from src.exception import InvalidCursorException
+
+# ---------------------------------------------------------------------------
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+
+# ---------------------------------------------------------------------------
+class Page(NamedTuple):
+    items: Sequence[Any]
+    next_cursor: str | None = None
+    # ? Count of all filtered items, None when it is not counted
+    total: int | None = None
+    total_is_estimated: bool = False
+
+
+# ---------------------------------------------------------------------------
+def encode_cursor(created_at: datetime, item_id: uuid.UUID) -> str:
+    """
+    ! Encode keyset position as opaque cursor
+
+    Parameters
+    ----------
+    created_at
+        Created time of last item
+    item_id
+        ID of last item
+
+    Returns
+    -------
+    cursor
+        Url safe cursor
+    """
+    raw = orjson.dumps([created_at.isoformat(), item_id.hex])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# ---------------------------------------------------------------------------
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    ! Decode opaque cursor to keyset position
+
+    Parameters
+    ----------
+    cursor
+        Cursor of previous page
+
+    Returns
+    -------
+    position
+        Created time & ID of last item of previous page
+
+    Raises
+    ------
+    InvalidCursorException
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = orjson.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(hex=item_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise InvalidCursorException()
+
+
+# ---------------------------------------------------------------------------
+def page_headers(page: Page) -> dict[str, str]:
+    """
+    ! Response headers of page metadata
+
+    Parameters
+    ----------
+    page
+        Found page
+
+    Returns
+    -------
+    headers
+        Next cursor & total count of page
+    """
+    headers = {}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(page.total)
+        if page.total_is_estimated:
+            headers[TOTAL_COUNT_ESTIMATED_HEADER] = "true"
+    return headers
+
+
+# ---------------------------------------------------------------------------
+def set_page_headers(*, response: Response, page: Page) -> Sequence[Any]:
+    """
+    ! Expose page metadata as response headers
+
+    Parameters
+    ----------
+    response
+        Target response
+    page
+        Found page
+
+    Returns
+    -------
+    obj_list
+        Items of page
+    """
+    response.headers.update(page_headers(page))
+    return page.items
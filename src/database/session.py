@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from src.core.config import settings
+from src.database.instrumentation import InstrumentedQueuePool, instrument_engine
 
 # ---------------------------------------------------------------------------
 DB_POOL_SIZE = 50
@@ -15,7 +16,9 @@ engine = create_async_engine(
     future=True,
     pool_size=POOL_SIZE,
     max_overflow=64,
+    poolclass=InstrumentedQueuePool,
 )
+instrument_engine(engine.sync_engine, name="api")
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -24,3 +27,25 @@ SessionLocal = sessionmaker(
     autoflush=False,
     expire_on_commit=False,
 )
+
+# ---------------------------------------------------------------------------
+# ? Long exports use their own small pool, so they never wait for or hold
+# ? connections of api requests. Every export reads one snapshot.
+export_engine = create_async_engine(
+    str(settings.DATABASE_URL),
+    future=True,
+    pool_size=settings.EXPORT_DB_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=settings.EXPORT_DB_POOL_TIMEOUT,
+    isolation_level="REPEATABLE READ",
+    poolclass=InstrumentedQueuePool,
+)
+instrument_engine(export_engine.sync_engine, name="export")
+
+ExportSessionLocal = sessionmaker(
+    bind=export_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
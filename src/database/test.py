@@ -0,0 +1,251 @@
+# ! Database Test Case
+#   ? Lookup indexes
+#       * Every list route query shape is planned with its index
+#   ? Query budget
+#       * Queries are counted in every enclosing scope
+#       * Bind parameters & IN lists share one statement shape
+#       * Repeated statement is reported once
+#       * Exceeded budget fails with counts & repeated statement
+#
+# ? Index tests run against a migrated local postgres, set DATABASE_URL
+import asyncio
+import logging
+import os
+from uuid import uuid4
+
+import orjson
+import pytest
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.capital_transfer.crud import capital_transfer as capital_transfer_crud
+from src.capital_transfer.models import CapitalTransfer
+from src.card.crud import card as card_crud
+from src.card.models import Card
+from src.database.base import Base  # noqa: F401, all models are mapped
+from src.database.base_crud import BaseCRUD
+from src.database.explain import Explain
+from src.database.instrumentation import (
+    QueryStats,
+    assert_query_budget,
+    current_query_stats,
+)
+from src.position_request.crud import position_request as position_request_crud
+from src.position_request.models import PositionRequest, PositionRequestStatusType
+from src.ticket.crud import ticket as ticket_crud
+from src.ticket.models import Ticket
+from src.transaction.crud import transaction as transaction_crud
+from src.transaction.models import Transaction
+from src.user_message.crud import user_message as user_message_crud
+from src.user_message.models import UserMessage
+from src.wallet.models import Wallet
+
+# ---------------------------------------------------------------------------
+requires_database = pytest.mark.skipif(
+    not os.environ.get("DATABASE_URL"),
+    reason="DATABASE_URL is not set",
+)
+OWNER_ID = uuid4()
+
+# ? name, crud, filter of list route, indexes the plan must use
+LIST_QUERIES = (
+    (
+        "transaction of wallet",
+        transaction_crud,
+        select(Transaction).where(
+            or_(
+                Transaction.receiver_id == OWNER_ID,
+                Transaction.transferor_id == OWNER_ID,
+            ),
+        ),
+        {
+            "ix_transaction_receiver_id_created_at",
+            "ix_transaction_transferor_id_created_at",
+        },
+    ),
+    (
+        "received transaction",
+        transaction_crud,
+        select(Transaction).where(Transaction.receiver_id == OWNER_ID),
+        {"ix_transaction_receiver_id_created_at"},
+    ),
+    (
+        "card of wallet",
+        card_crud,
+        select(Card).where(Card.wallet_id == OWNER_ID),
+        {"ix_card_wallet_id_created_at"},
+    ),
+    (
+        "capital transfer of wallet",
+        capital_transfer_crud,
+        select(CapitalTransfer).where(CapitalTransfer.receiver_id == OWNER_ID),
+        {"ix_capital_transfer_receiver_id_created_at"},
+    ),
+    (
+        "ticket of user",
+        ticket_crud,
+        select(Ticket).where(Ticket.creator_id == OWNER_ID),
+        {"ix_ticket_creator_id_created_at"},
+    ),
+    (
+        "message of user",
+        user_message_crud,
+        select(UserMessage).where(UserMessage.user_id == OWNER_ID),
+        {"ix_user_message_user_id_created_at"},
+    ),
+    (
+        "unread message of user",
+        user_message_crud,
+        select(UserMessage).where(
+            UserMessage.user_id == OWNER_ID,
+            UserMessage.status.is_not(True),
+        ),
+        {"ix_user_message_user_id_unread"},
+    ),
+    (
+        "position request to approve",
+        position_request_crud,
+        select(PositionRequest).where(
+            PositionRequest.next_approve_user_id == OWNER_ID,
+        ),
+        {"ix_position_request_next_approve_user_id_created_at"},
+    ),
+    (
+        "position request admin queue",
+        position_request_crud,
+        select(PositionRequest).where(
+            PositionRequest.next_approve_user_id.is_(None),
+            PositionRequest.status == PositionRequestStatusType.OPEN,
+        ),
+        {"ix_position_request_admin_queue"},
+    ),
+)
+
+
+# ---------------------------------------------------------------------------
+def _index_names(plan: dict) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+async def _plan_indexes(query) -> set[str]:
+    # ? Every test runs its own event loop, so connections are not pooled
+    engine = create_async_engine(os.environ["DATABASE_URL"], poolclass=NullPool)
+    try:
+        async with engine.connect() as connection:
+            # ? Tables of a test database are tiny, make indexes the only choice
+            await connection.execute(text("SET LOCAL enable_seqscan = off"))
+            response = await connection.execute(Explain(query))
+            plan = response.scalar_one()
+    finally:
+        await engine.dispose()
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    return _index_names(plan[0]["Plan"])
+
+
+# ---------------------------------------------------------------------------
+@requires_database
+@pytest.mark.parametrize(
+    ("crud", "query", "indexes"),
+    [(crud, query, indexes) for _, crud, query, indexes in LIST_QUERIES],
+    ids=[name for name, *_ in LIST_QUERIES],
+)
+def test_list_query_uses_index(crud: BaseCRUD, query, indexes: set[str]):
+    query, _ = crud._paginate_query(query=query, skip=0, limit=20, cursor=None)
+    used = asyncio.run(_plan_indexes(query))
+    assert indexes <= used, f"plan uses {sorted(used)}, expected {sorted(indexes)}"
+
+
+@requires_database
+def test_wallet_of_user_uses_index():
+    query = select(Wallet).where(Wallet.user_id == OWNER_ID)
+    assert "ix_wallet_user_id" in asyncio.run(_plan_indexes(query))
+
+
+# ---------------------------------------------------------------------------
+def _execute(statement: str, rows: int = 1) -> None:
+    # ? Same call as the cursor hook of instrumented engines
+    current_query_stats.get().add(statement, rows, 0.001)
+
+
+def test_query_stats_counts_in_parents():
+    outer = QueryStats()
+    inner = QueryStats(parent=outer)
+    inner.add("SELECT * FROM card WHERE id = $1", 3, 0.5)
+    outer.add("SELECT * FROM wallet WHERE id = $1", 1, 0.25)
+
+    assert (inner.queries, inner.rows, inner.duration) == (1, 3, 0.5)
+    assert (outer.queries, outer.rows, outer.duration) == (2, 4, 0.75)
+
+
+def test_query_stats_shapes():
+    stats = QueryStats()
+    stats.add("SELECT * FROM card WHERE id = $1", 1, 0)
+    stats.add("SELECT * FROM card WHERE id = $2", 1, 0)
+    stats.add("SELECT * FROM card WHERE id IN ($1, $2,$3)", 3, 0)
+
+    assert stats.shapes == {
+        "SELECT * FROM card WHERE id = ?": 2,
+        "SELECT * FROM card WHERE id IN (?)": 1,
+    }
+    assert stats.max_repeats == 2
+
+
+def test_query_stats_reports_repeat_once(caplog: pytest.LogCaptureFixture):
+    stats = QueryStats(repeat_threshold=2)
+    with caplog.at_level(logging.WARNING):
+        for number in range(5):
+            stats.add(f"SELECT * FROM card WHERE id = ${number}", 1, 0)
+
+    assert len(caplog.records) == 1
+    assert "more than 2 times" in caplog.records[0].getMessage()
+
+
+def test_query_budget_nesting():
+    with assert_query_budget(max_queries=3) as outer:
+        _execute("SELECT 1")
+        with assert_query_budget(max_queries=2) as inner:
+            assert current_query_stats.get() is inner
+            _execute("SELECT 2")
+            _execute("SELECT 3")
+        assert current_query_stats.get() is outer
+
+    assert current_query_stats.get() is None
+    assert (outer.queries, inner.queries) == (3, 2)
+
+
+def test_query_budget_exceeded():
+    with pytest.raises(
+        AssertionError,
+        match=r"^Query budget exceeded: 3 queries \(budget 2\)$",
+    ):
+        with assert_query_budget(max_queries=2):
+            for _ in range(3):
+                _execute("SELECT 1")
+
+
+def test_query_budget_repeats_exceeded():
+    with pytest.raises(AssertionError) as error:
+        with assert_query_budget(max_queries=10, max_repeats=1):
+            _execute("SELECT * FROM wallet WHERE id = $1")
+            _execute("SELECT * FROM card WHERE wallet_id = $1")
+            _execute("SELECT * FROM card WHERE wallet_id = $1")
+
+    assert str(error.value) == (
+        "Query budget exceeded: 2 executions (budget 1) of: "
+        "SELECT * FROM card WHERE wallet_id = ?"
+    )
+
+
+def test_query_budget_counts_into_outer_failure():
+    # ? Inner budget failure is raised through the outer scope unchanged
+    with pytest.raises(AssertionError, match="2 queries"):
+        with assert_query_budget(max_queries=10) as outer:
+            with assert_query_budget(max_queries=1):
+                _execute("SELECT 1")
+                _execute("SELECT 2")
+    assert outer.queries == 2
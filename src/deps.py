@@ -1,4 +1,6 @@
+import hmac
 from typing import AsyncGenerator, Type
+from uuid import UUID
 
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -9,15 +11,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.exception import (
     AccessDeniedException,
     InactiveUserException,
+    TokenIsOutdatedException,
     UserNotAuthenticatedException,
 )
+from src.auth.principal import principal_cache, role_versions
 from src.core.config import settings
+from src.core.security import (
+    decode_permission_bitmap,
+    encode_permission_bitmap,
+    has_permissions,
+)
 from src.database.session import SessionLocal
-from src.role.crud import role as role_crud
-from src.schema import VerifyUserDep
-from src.user.crud import user as user_crud
-from src.user.models import User
-from src.utils.minio_client import MinioClient
+from src.schema import UserPrincipal, VerifyUserDep
+from src.utils.minio_client import ObjectStore, minio_client
 
 # ---------------------------------------------------------------------------
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
@@ -27,6 +33,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 class TokenData(BaseModel):
     username: str
     role: str
+    role_id: UUID | None = None
+    role_version: int | None = None
+    permissions: str | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -39,7 +48,90 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 # ---------------------------------------------------------------------------
-def get_current_user() -> Type[User]:
+def decode_token(token: str | None) -> TokenData:
+    """
+    ! Verify Token
+
+    Parameters
+    ----------
+    token
+        Bearer token of request
+
+    Returns
+    -------
+    token_data
+        Decoded token data
+
+    Raises
+    ------
+    UserNotAuthenticatedException
+    """
+    if not token:
+        raise UserNotAuthenticatedException()
+
+    payload = jwt.decode(
+        token=token,
+        key=settings.SECRET_KEY,
+        algorithms=[settings.ALGORITHM],
+    )
+    # ? Terminal tokens are signed with the same key but are not user tokens
+    if payload.get("type"):
+        raise UserNotAuthenticatedException()
+
+    return TokenData(**payload)
+
+
+# ---------------------------------------------------------------------------
+async def verify_token_permissions(
+    *,
+    db: AsyncSession,
+    token_data: TokenData,
+    user: UserPrincipal,
+    required_mask: int,
+) -> bool:
+    """
+    ! Verify Permissions with token bitmap
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    token_data
+        Decoded token data
+    user
+        Token's user principal
+    required_mask
+        Bitmap of required permission codes
+
+    Returns
+    -------
+    result
+        Result of operation
+
+    Raises
+    ------
+    TokenIsOutdatedException
+        Role of user or permissions of role are changed after login
+    """
+    # ? Tokens issued before bitmaps, check with user permissions
+    if token_data.permissions is None:
+        user_mask = decode_permission_bitmap(encode_permission_bitmap(user.permissions))
+        return has_permissions(user_mask, required_mask)
+
+    if token_data.role_id != user.role_id:
+        raise TokenIsOutdatedException()
+    version = await role_versions.get(db=db, role_id=token_data.role_id)
+    if version != token_data.role_version:
+        raise TokenIsOutdatedException()
+
+    return has_permissions(
+        decode_permission_bitmap(token_data.permissions),
+        required_mask,
+    )
+
+
+# ---------------------------------------------------------------------------
+def get_current_user() -> Type[UserPrincipal]:
     """
     ! Verify Token
     ! Find User
@@ -54,19 +146,11 @@ def get_current_user() -> Type[User]:
     async def current_user(
         db: AsyncSession = Depends(get_db),
         token: str = Depends(oauth2_scheme),
-    ) -> Type[User]:
-        if not token:
-            raise UserNotAuthenticatedException()
-
+    ) -> UserPrincipal:
         # ? Verify Token
-        payload = jwt.decode(
-            token=token,
-            key=settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        token_data = TokenData(username=payload["username"], role=payload["role"])
+        token_data = decode_token(token)
         # ? Verify User
-        user = await user_crud.find_by_username(db=db, username=token_data.username)
+        user = await principal_cache.get(db=db, username=token_data.username)
         # ? Verify user activity
         if not user.is_active:
             raise InactiveUserException()
@@ -78,33 +162,28 @@ def get_current_user() -> Type[User]:
 # ---------------------------------------------------------------------------
 def get_current_user_with_permissions(
     required_permissions: list[int] | None = None,
-) -> Type[User]:
+) -> Type[UserPrincipal]:
+    required_mask = decode_permission_bitmap(
+        encode_permission_bitmap(required_permissions or []),
+    )
+
     async def current_user_with_permissions(
         db: AsyncSession = Depends(get_db),
         token: str = Depends(oauth2_scheme),
-    ) -> Type[User]:
-        if not token:
-            raise UserNotAuthenticatedException()
-
+    ) -> UserPrincipal:
         # ? Verify Token
-        payload = jwt.decode(
-            token=token,
-            key=settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        token_data = TokenData(username=payload["username"], role=payload["role"])
+        token_data = decode_token(token)
 
         # ? Verify User
-        user = await user_crud.find_by_username(db=db, username=token_data.username)
+        user = await principal_cache.get(db=db, username=token_data.username)
 
         # ? Verify Permissions
-        role = await role_crud.verify_existence(db=db, role_id=user.role.id)
-
-        user_permission_set = {permission.code for permission in role.permissions}
-        is_valid = False
-        required_permission_set = set(required_permissions)
-        if required_permission_set.issubset(user_permission_set):
-            is_valid = True
+        is_valid = await verify_token_permissions(
+            db=db,
+            token_data=token_data,
+            user=user,
+            required_mask=required_mask,
+        )
         if not is_valid:
             raise AccessDeniedException()
 
@@ -115,52 +194,52 @@ def get_current_user_with_permissions(
 
 # ---------------------------------------------------------------------------
 def is_user_have_permission(required_permissions: list[int]) -> VerifyUserDep | None:
+    required_mask = decode_permission_bitmap(
+        encode_permission_bitmap(required_permissions),
+    )
+
     async def is_user_have_permission(
         db: AsyncSession = Depends(get_db),
         token: str = Depends(oauth2_scheme),
     ) -> VerifyUserDep:
-        if not token:
-            raise UserNotAuthenticatedException()
-        result = VerifyUserDep()
-
         # ? Verify Token
-        payload = jwt.decode(
-            token=token,
-            key=settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        token_data = TokenData(username=payload["username"], role=payload["role"])
+        token_data = decode_token(token)
+        result = VerifyUserDep()
 
         # ? Verify User
-        user = await user_crud.verify_existence_by_username(
-            db=db,
-            username=token_data.username,
-        )
+        user = await principal_cache.get(db=db, username=token_data.username)
         result.user = user
 
         # ? Verify Permissions
-        role = await role_crud.verify_existence(db=db, role_id=user.role.id)
-
-        user_permission_set = {permission.code for permission in role.permissions}
-        required_permission_set = set(required_permissions)
-        if not required_permission_set.issubset(user_permission_set):
-            result.is_valid = False
-            return result
-
-        result.is_valid = True
+        result.is_valid = await verify_token_permissions(
+            db=db,
+            token_data=token_data,
+            user=user,
+            required_mask=required_mask,
+        )
         return result
 
     return is_user_have_permission
 
 
 # ---------------------------------------------------------------------------
-def minio_auth() -> MinioClient:
-    minio_client = MinioClient(
-        url=settings.MINIO_URL,
-        access_key=settings.MINIO_ROOT_USER,
-        secret_key=settings.MINIO_ROOT_PASSWORD,
-        default_bucket=settings.MINIO_DEFAULT_BUCKET,
-        site_media_bucket=settings.MINIO_SITE_MEDIA_BUCKET,
-        profile_image_bucket=settings.MINIO_PROFILE_IMAGE_BUCKET,
-    )
+def verify_metrics_token(token: str | None = Depends(oauth2_scheme)) -> None:
+    """
+    ! Verify bearer token of metrics scraper
+
+    Raises
+    ------
+    UserNotAuthenticatedException
+    """
+    if not (
+        token
+        and settings.METRICS_TOKEN
+        and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    ):
+        raise UserNotAuthenticatedException()
+
+
+# ---------------------------------------------------------------------------
+def minio_auth() -> ObjectStore:
+    # ? Shared client, buckets are prepared on startup
     return minio_client
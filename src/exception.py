@@ -14,3 +14,78 @@ class InCorrectDataException(HTTPException):
             "english_message": "Input data is incorrect!",
         }
         self.headers = None
+
+
+class InvalidCursorException(HTTPException):
+    """
+    ? Exception When Pagination cursor is invalid
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 2,
+            "persian_message": "نشانگر صفحه بندی نامعتبر است!",
+            "english_message": "Pagination cursor is invalid!",
+        }
+        self.headers = None
+
+
+class NumberSpaceIsFullException(HTTPException):
+    """
+    ? Exception When All numbers of an allocator are used
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 3,
+            "persian_message": "ظرفیت شماره های قابل تخصیص تکمیل شده است!",
+            "english_message": "No number is left to allocate!",
+        }
+        self.headers = None
+
+
+class ServerIsBusyException(HTTPException):
+    """
+    ? Exception When Server can not accept more work right now
+    """
+
+    def __init__(self):
+        self.status_code = 503
+        self.detail = {
+            "code": 4,
+            "persian_message": "سرور مشغول است، لطفا دوباره تلاش کنید!",
+            "english_message": "Server is busy, please try again!",
+        }
+        self.headers = {"Retry-After": "1"}
+
+
+class FileIsTooLargeException(HTTPException):
+    """
+    ? Exception When Uploaded file is larger than allowed size
+    """
+
+    def __init__(self):
+        self.status_code = 413
+        self.detail = {
+            "code": 5,
+            "persian_message": "حجم فایل بیش از حد مجاز است!",
+            "english_message": "File is too large!",
+        }
+        self.headers = None
+
+
+class FileTypeIsNotAllowedException(HTTPException):
+    """
+    ? Exception When Uploaded file's content is not an allowed type
+    """
+
+    def __init__(self):
+        self.status_code = 415
+        self.detail = {
+            "code": 6,
+            "persian_message": "نوع فایل مجاز نیست!",
+            "english_message": "File type is not allowed!",
+        }
+        self.headers = None
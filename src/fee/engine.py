@@ -0,0 +1,215 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.fee.models import Fee, FeeTypeEnum
+
+
+# ---------------------------------------------------------------------------
+class FeeTier(NamedTuple):
+    limit: int
+    percentage: int | None
+    value: int | None
+    value_limit: int
+
+    def calculate(self, amount: int) -> int:
+        """
+        ! Fee of amount in this tier
+
+        Parameters
+        ----------
+        amount
+            Target amount
+
+        Returns
+        -------
+        fee
+            Fixed value of tier, or percentage of amount capped by value limit
+        """
+        if self.value is not None:
+            return self.value
+        fee = amount * (self.percentage or 0) // 100
+        if self.value_limit:
+            fee = min(fee, self.value_limit)
+        return fee
+
+
+# ---------------------------------------------------------------------------
+class FeeSchedule:
+    """
+    ! Sorted fee tiers of one fee type
+
+    A tier covers amounts up to its limit, amounts above the biggest limit
+    use the last tier.
+
+    Parameters
+    ----------
+    tiers
+        Tiers of fee type
+    """
+
+    def __init__(self, tiers: Iterable[FeeTier]):
+        # ? Only limit is compared, tiers with the same limit keep their order
+        self.tiers = sorted(tiers, key=lambda tier: tier.limit)
+        self.limits = [tier.limit for tier in self.tiers]
+
+    def calculate(self, amount: int) -> int:
+        """
+        ! Fee of amount
+
+        Parameters
+        ----------
+        amount
+            Target amount
+
+        Returns
+        -------
+        fee
+            Fee of amount, zero if there is no tier
+        """
+        if not self.tiers:
+            return 0
+        index = min(bisect_left(self.limits, amount), len(self.tiers) - 1)
+        return self.tiers[index].calculate(amount)
+
+
+# ---------------------------------------------------------------------------
+class FeeEngine:
+    """
+    ! In-memory fee calculator
+
+    The whole fee table is loaded with one query into a schedule per fee
+    type, so a fee is resolved by bisect without any query. Fee routes
+    invalidate the schedules of their worker, other workers reload them
+    after ttl.
+
+    Parameters
+    ----------
+    ttl_seconds
+        Life time of loaded schedules
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._schedules: dict[FeeTypeEnum, FeeSchedule] | None = None
+        self._expire_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def _load(self, db: AsyncSession) -> dict[FeeTypeEnum, FeeSchedule]:
+        response = await db.execute(
+            select(Fee.type, Fee.limit, Fee.percentage, Fee.value, Fee.value_limit),
+        )
+        tiers: dict[FeeTypeEnum, list[FeeTier]] = {
+            fee_type: [] for fee_type in FeeTypeEnum
+        }
+        for fee_type, *tier in response.all():
+            tiers[fee_type].append(FeeTier(*tier))
+        return {
+            fee_type: FeeSchedule(fee_tiers) for fee_type, fee_tiers in tiers.items()
+        }
+
+    async def get_schedule(
+        self,
+        *,
+        db: AsyncSession,
+        fee_type: FeeTypeEnum,
+    ) -> FeeSchedule:
+        """
+        ! Get schedule of fee type, loaded once per ttl
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        fee_type
+            Target fee type
+
+        Returns
+        -------
+        schedule
+            Fee schedule
+        """
+        schedules = self._schedules
+        if schedules is None or self._expire_at <= time.monotonic():
+            async with self._lock:
+                schedules = self._schedules
+                if schedules is None or self._expire_at <= time.monotonic():
+                    generation = self._generation
+                    schedules = await self._load(db=db)
+                    # ? Invalidated while loading, loaded again on next call
+                    if generation == self._generation:
+                        self._schedules = schedules
+                        self._expire_at = time.monotonic() + self.ttl_seconds
+
+        return schedules[fee_type]
+
+    async def calculate(
+        self,
+        *,
+        db: AsyncSession,
+        fee_type: FeeTypeEnum,
+        amount: int,
+    ) -> int:
+        """
+        ! Calculate fee of amount
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        fee_type
+            Target fee type
+        amount
+            Target amount
+
+        Returns
+        -------
+        fee
+            Fee of amount
+        """
+        schedule = await self.get_schedule(db=db, fee_type=fee_type)
+        return schedule.calculate(amount)
+
+    async def calculate_many(
+        self,
+        *,
+        db: AsyncSession,
+        fee_type: FeeTypeEnum,
+        amounts: list[int],
+    ) -> list[int]:
+        """
+        ! Calculate fees of amounts
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        fee_type
+            Target fee type
+        amounts
+            Target amounts
+
+        Returns
+        -------
+        fees
+            Fee of every amount, in the same order
+        """
+        schedule = await self.get_schedule(db=db, fee_type=fee_type)
+        return [schedule.calculate(amount) for amount in amounts]
+
+    def invalidate(self) -> None:
+        """
+        ! Drop loaded schedules
+        """
+        self._generation += 1
+        self._schedules = None
+
+
+# ---------------------------------------------------------------------------
+fee_engine = FeeEngine(ttl_seconds=settings.FEE_SCHEDULE_TTL_SECONDS)
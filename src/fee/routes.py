@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import deps
+from src.core.response_cache import response_cache
+from src.database.pagination import Page
 from src.exception import InCorrectDataException
 from src.fee.crud import fee as fee_crud
-from src.fee.schema import FeeBase, FeeCreate, FeeRead, FeeUpdate
+from src.fee.engine import fee_engine
+from src.fee.schema import (
+    FeeBase,
+    FeeCalculateInput,
+    FeeCalculateOutput,
+    FeeCreate,
+    FeeRead,
+    FeeUpdate,
+)
 from src.permission import permission_codes as permission
 from src.schema import DeleteResponse, IDRequest
 from src.user.models import User
@@ -45,9 +55,11 @@ async def delete_fee(
     FeeNotFoundException
     """
     # * Verify fee existence
-    await fee_crud.verify_existence(db=db, user_crypto_id=delete_data.id)
+    await fee_crud.verify_existence(db=db, fee_id=delete_data.id)
     # * Delete Fee
-    await fee_crud.delete(db=db, id=delete_data.id)
+    await fee_crud.delete(db=db, item_id=delete_data.id)
+    fee_engine.invalidate()
+    response_cache.invalidate("fee")
 
     return DeleteResponse(result="Fee Deleted Successfully")
 
@@ -92,6 +104,8 @@ async def create_fee(
     await fee_crud.verify_duplicate_limit(db=db, limit=create_data.limit)
     # * Create Fee
     fee = await fee_crud.create(db=db, obj_in=create_data)
+    fee_engine.invalidate()
+    response_cache.invalidate("fee")
 
     return fee
 
@@ -129,10 +143,7 @@ async def update_fee(
     FeeLimitIsDuplicatedException
     """
     # * Verify fee existence
-    obj_current = await fee_crud.verify_existence(
-        db=db,
-        user_crypto_id=update_data.where.id,
-    )
+    obj_current = await fee_crud.verify_existence(db=db, fee_id=update_data.where.id)
     # * Verify fee's limit duplicate
     await fee_crud.verify_duplicate_limit(
         db=db,
@@ -145,6 +156,8 @@ async def update_fee(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    fee_engine.invalidate()
+    response_cache.invalidate("fee")
 
     return fee
 
@@ -153,13 +166,15 @@ async def update_fee(
 @router.get("/list", response_model=list[FeeRead])
 async def read_fee_list(
     *,
+    request: Request,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_FEE]),
     ),
     skip: int = 0,
     limit: int = 10,
-) -> list[FeeRead]:
+    cursor: str | None = None,
+) -> Response:
     """
     ! Read Fee
 
@@ -173,14 +188,29 @@ async def read_fee_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     fee_list
         List of fee
     """
-    fee_list = await fee_crud.get_multi(db=db, skip=skip, limit=limit)
-    return fee_list
+
+    async def load_page() -> Page:
+        return await fee_crud.get_multi_with_total(
+            db=db,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    return await response_cache.respond(
+        request=request,
+        namespace="fee",
+        schema=FeeRead,
+        load=load_page,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -215,5 +245,38 @@ async def find_fee(
     FeeNotFoundException
     """
     # * Verify fee existence
-    fee = await fee_crud.verify_existence(db=db, user_crypto_id=read_data.id)
+    fee = await fee_crud.verify_existence(db=db, fee_id=read_data.id)
     return fee
+
+
+# ---------------------------------------------------------------------------
+@router.post("/calculate", response_model=FeeCalculateOutput)
+async def calculate_fee(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user()),
+    input_data: FeeCalculateInput,
+) -> FeeCalculateOutput:
+    """
+    ! Calculate fees of amounts
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    current_user
+        Requester User
+    input_data
+        Fee type and amounts
+
+    Returns
+    -------
+    response
+        Fee of every amount, in the same order
+    """
+    fees = await fee_engine.calculate_many(
+        db=db,
+        fee_type=input_data.type,
+        amounts=input_data.amounts,
+    )
+    return FeeCalculateOutput(type=input_data.type, fees=fees)
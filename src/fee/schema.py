@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, conint
+from pydantic import BaseModel, ConfigDict, Field, conint
 
 from src.fee.models import FeeTypeEnum
 from src.schema import IDRequest
@@ -35,3 +35,15 @@ class FeeRead(FeeBase):
 
     created_at: datetime
     updated_at: datetime | None
+
+
+# ---------------------------------------------------------------------------
+class FeeCalculateInput(BaseModel):
+    type: FeeTypeEnum
+    amounts: list[conint(ge=0)] = Field(max_length=1000)
+
+
+# ---------------------------------------------------------------------------
+class FeeCalculateOutput(BaseModel):
+    type: FeeTypeEnum
+    fees: list[int]
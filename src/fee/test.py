@@ -24,4 +24,70 @@
 #       * Fee Not Found
 #       * User not authentication
 #       * Verify Permission
+#   ? Fee Schedule
+#       * Amount up to limit uses that tier, above it the next one
+#       * Amount above every limit uses last tier
+#       * Fixed value, percentage & value limit of tier
+#       * Tiers with the same limit are sorted without comparing values
+#       * No tier is zero fee
 # ! Tot Time = 90m
+import pytest
+
+from src.fee.engine import FeeSchedule, FeeTier
+
+# ---------------------------------------------------------------------------
+SCHEDULE = FeeSchedule(
+    [
+        FeeTier(limit=10_000_000, percentage=1, value=None, value_limit=50_000),
+        FeeTier(limit=1_000_000, percentage=None, value=5_000, value_limit=0),
+        FeeTier(limit=100_000, percentage=None, value=1_000, value_limit=0),
+    ],
+)
+
+
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize(
+    ("amount", "fee"),
+    [
+        (0, 1_000),
+        (100_000, 1_000),
+        (100_001, 5_000),
+        (1_000_000, 5_000),
+        (1_000_001, 10_000),
+        (4_000_000, 40_000),
+        (10_000_000, 50_000),
+        (20_000_000, 50_000),
+    ],
+)
+def test_fee_schedule_tier_of_amount(amount: int, fee: int):
+    assert SCHEDULE.calculate(amount) == fee
+
+
+def test_fee_schedule_sorts_tiers_by_limit():
+    assert SCHEDULE.limits == [100_000, 1_000_000, 10_000_000]
+
+
+def test_fee_tier_percentage_without_value_limit():
+    tier = FeeTier(limit=100, percentage=3, value=None, value_limit=0)
+    assert tier.calculate(1_000) == 30
+
+
+def test_fee_tier_without_percentage_or_value():
+    tier = FeeTier(limit=100, percentage=None, value=None, value_limit=10)
+    assert tier.calculate(1_000) == 0
+
+
+def test_fee_schedule_same_limit():
+    schedule = FeeSchedule(
+        [
+            FeeTier(limit=100, percentage=3, value=None, value_limit=10),
+            FeeTier(limit=100, percentage=3, value=5, value_limit=10),
+            FeeTier(limit=50, percentage=None, value=1, value_limit=0),
+        ],
+    )
+    assert schedule.limits == [50, 100, 100]
+    assert schedule.calculate(100) == 3
+
+
+def test_fee_schedule_without_tier():
+    assert FeeSchedule([]).calculate(1_000) == 0
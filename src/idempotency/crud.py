@@ -0,0 +1,203 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.base_crud import BaseCRUD
+from src.idempotency.models import IdempotencyKey, IdempotencyStatus
+
+
+# ---------------------------------------------------------------------------
+class IdempotencyKeyCRUD(BaseCRUD[IdempotencyKey, None, None]):
+    async def claim(
+        self,
+        *,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        lock_seconds: float,
+        ttl_seconds: float,
+    ) -> tuple[bool, IdempotencyKey | None]:
+        """
+        ! Claim idempotency key for a new request
+
+        The key is inserted, or taken over if it is expired or its lock is
+        stale, with one statement and committed right away.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        scope
+            Requester's scope
+        key
+            Idempotency key of request
+        fingerprint
+            Fingerprint of request
+        lock_seconds
+            Life time of processing lock
+        ttl_seconds
+            Life time of stored response
+
+        Returns
+        -------
+        claimed
+            Request must be processed
+        record
+            Existing record when not claimed
+        """
+        query = insert(self.model).values(
+            id=uuid4(),
+            scope=scope,
+            key=key,
+            fingerprint=fingerprint,
+            status=IdempotencyStatus.PROCESSING,
+            locked_until=func.now() + timedelta(seconds=lock_seconds),
+            expires_at=func.now() + timedelta(seconds=ttl_seconds),
+        )
+        query = query.on_conflict_do_update(
+            constraint="uq_idempotency_key_scope_key",
+            set_={
+                "fingerprint": query.excluded.fingerprint,
+                "status": query.excluded.status,
+                "locked_until": query.excluded.locked_until,
+                "expires_at": query.excluded.expires_at,
+                "response_status": None,
+                "response_headers": None,
+                "response_body": None,
+            },
+            where=or_(
+                self.model.expires_at < func.now(),
+                and_(
+                    self.model.status == IdempotencyStatus.PROCESSING,
+                    self.model.locked_until < func.now(),
+                ),
+            ),
+        ).returning(self.model.id)
+        response = await db.execute(query)
+        claimed = response.scalar_one_or_none() is not None
+        record = None
+        if not claimed:
+            response = await db.execute(
+                select(self.model).where(
+                    self.model.scope == scope,
+                    self.model.key == key,
+                ),
+            )
+            record = response.scalar_one_or_none()
+        await db.commit()
+
+        return claimed, record
+
+    async def find(
+        self,
+        *,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+    ) -> IdempotencyKey | None:
+        """
+        ! Find idempotency key
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        scope
+            Requester's scope
+        key
+            Idempotency key of request
+
+        Returns
+        -------
+        record
+            Found Item or None
+        """
+        response = await db.execute(
+            select(self.model).where(
+                self.model.scope == scope,
+                self.model.key == key,
+            ),
+        )
+        return response.scalar_one_or_none()
+
+    async def complete(
+        self,
+        *,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+        status_code: int,
+        headers: list[list[str]],
+        body: bytes,
+    ) -> None:
+        """
+        ! Store response of claimed key
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        scope
+            Requester's scope
+        key
+            Idempotency key of request
+        status_code
+            Response status code
+        headers
+            Response headers
+        body
+            Response body
+        """
+        await db.execute(
+            update(self.model)
+            .where(self.model.scope == scope, self.model.key == key)
+            .values(
+                status=IdempotencyStatus.COMPLETED,
+                response_status=status_code,
+                response_headers=headers,
+                response_body=body,
+            ),
+        )
+        await db.commit()
+
+    async def release(self, *, db: AsyncSession, scope: str, key: str) -> None:
+        """
+        ! Drop claimed key so the request can be retried
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        scope
+            Requester's scope
+        key
+            Idempotency key of request
+        """
+        await db.execute(
+            delete(self.model).where(
+                self.model.scope == scope,
+                self.model.key == key,
+                self.model.status == IdempotencyStatus.PROCESSING,
+            ),
+        )
+        await db.commit()
+
+    async def purge_expired(self, *, db: AsyncSession) -> None:
+        """
+        ! Delete expired keys
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        """
+        await db.execute(delete(self.model).where(self.model.expires_at < func.now()))
+        await db.commit()
+
+
+# ---------------------------------------------------------------------------
+idempotency_key = IdempotencyKeyCRUD(IdempotencyKey)
@@ -0,0 +1,65 @@
+from fastapi import HTTPException
+
+# !!!!!!!!!!!!!
+# ! Code 36XX !
+# !!!!!!!!!!!!!
+
+
+class IdempotencyKeyIsReusedException(HTTPException):
+    """
+    ? Exception when idempotency key is sent again with another request
+    """
+
+    def __init__(self):
+        self.status_code = 422
+        self.detail = {
+            "code": 3600,
+            "persian_message": "کلید یکتایی برای درخواست دیگری استفاده شده است!",
+            "english_message": "Idempotency Key Is Used For Another Request!",
+        }
+        self.headers = None
+
+
+class IdempotencyKeyIsProcessingException(HTTPException):
+    """
+    ? Exception when first request of idempotency key is still running
+    """
+
+    def __init__(self):
+        self.status_code = 409
+        self.detail = {
+            "code": 3601,
+            "persian_message": "درخواست قبلی با این کلید در حال انجام است!",
+            "english_message": "Request With This Idempotency Key Is In Progress!",
+        }
+        self.headers = {"Retry-After": "1"}
+
+
+class IdempotencyKeyIsInvalidException(HTTPException):
+    """
+    ? Exception when idempotency key is too long
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 3602,
+            "persian_message": "کلید یکتایی نامعتبر است!",
+            "english_message": "Idempotency Key Is Invalid!",
+        }
+        self.headers = None
+
+
+class IdempotencyRequestIsTooLargeException(HTTPException):
+    """
+    ? Exception when body of request with idempotency key is too large
+    """
+
+    def __init__(self):
+        self.status_code = 413
+        self.detail = {
+            "code": 3603,
+            "persian_message": "حجم درخواست با کلید یکتایی بیش از حد مجاز است!",
+            "english_message": "Request With Idempotency Key Is Too Large!",
+        }
+        self.headers = None
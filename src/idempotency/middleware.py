@@ -0,0 +1,306 @@
+import asyncio
+import hashlib
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.database.session import SessionLocal
+from src.idempotency.crud import idempotency_key as idempotency_key_crud
+from src.idempotency.exception import (
+    IdempotencyKeyIsInvalidException,
+    IdempotencyKeyIsProcessingException,
+    IdempotencyKeyIsReusedException,
+    IdempotencyRequestIsTooLargeException,
+)
+from src.idempotency.models import IdempotencyKey, IdempotencyStatus
+
+# ---------------------------------------------------------------------------
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_REPLAYED_HEADER = "Idempotency-Replayed"
+# ? Stored response had a too large (or broken off) body, replays are empty
+IDEMPOTENCY_BODY_OMITTED_HEADER = "Idempotency-Body-Omitted"
+MAX_KEY_LENGTH = 255
+
+
+# ---------------------------------------------------------------------------
+class IdempotencyMiddleware:
+    """
+    ! Replay responses of repeated requests with the same Idempotency-Key
+
+    The first request claims the key in the idempotency_key table and its
+    response is stored when it finishes, repeats get the stored response.
+    Duplicates that arrive while the first request runs wait for its result
+    (on an event in the same worker, polling the table in other workers)
+    for a short time. Keys are scoped to the requester's credentials and
+    bound to the request fingerprint. Every answered request is stored, even
+    a failed one, since it may have moved money before failing; the key is
+    released only when the app raised before it started a response.
+    Bodies are buffered for the fingerprint, so they are limited to
+    IDEMPOTENCY_MAX_BODY_BYTES, streamed upload routes are never keyed.
+    Larger response bodies are not stored, their replay only has the status
+    and headers.
+
+    Parameters
+    ----------
+    app
+        Wrapped asgi application
+    methods
+        Methods that use idempotency keys
+    exempt_paths
+        Paths that are passed through without idempotency
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        methods: tuple[str, ...] = ("POST", "PUT", "PATCH", "DELETE"),
+        exempt_paths: tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.methods = methods
+        self.exempt_paths = frozenset(exempt_paths)
+        self._running: dict[tuple[str, str], asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or scope["path"].rstrip("/") in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._error(IdempotencyKeyIsInvalidException(), scope, receive, send)
+            return
+
+        body = await self._read_body(receive, headers)
+        if body is None:
+            await self._error(
+                IdempotencyRequestIsTooLargeException(),
+                scope,
+                receive,
+                send,
+            )
+            return
+        requester = hashlib.sha256(
+            headers.get("authorization", "").encode(),
+        ).hexdigest()
+        fingerprint = hashlib.sha256(
+            b"\0".join(
+                [
+                    scope["method"].encode(),
+                    scope["path"].encode(),
+                    scope.get("query_string", b""),
+                    body,
+                ],
+            ),
+        ).hexdigest()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            async with SessionLocal() as db:
+                claimed, record = await idempotency_key_crud.claim(
+                    db=db,
+                    scope=requester,
+                    key=key,
+                    fingerprint=fingerprint,
+                    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+                    ttl_seconds=settings.IDEMPOTENCY_TTL_HOURS * 3600,
+                )
+            if claimed:
+                await self._process(scope, receive, send, requester, key, body)
+                return
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    await self._error(
+                        IdempotencyKeyIsReusedException(),
+                        scope,
+                        receive,
+                        send,
+                    )
+                    return
+                if record.status == IdempotencyStatus.COMPLETED:
+                    await self._replay(record, send)
+                    return
+            # ? Still processing, or released between claim and read
+            if not await self._wait(requester, key, deadline):
+                await self._error(
+                    IdempotencyKeyIsProcessingException(),
+                    scope,
+                    receive,
+                    send,
+                )
+                return
+
+    @staticmethod
+    async def _read_body(receive: Receive, headers: Headers) -> bytes | None:
+        """
+        * Read whole body, None when it is larger than the limit
+        """
+        max_bytes = settings.IDEMPOTENCY_MAX_BODY_BYTES
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            return None
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_bytes:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    async def _process(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        requester: str,
+        key: str,
+        body: bytes,
+    ) -> None:
+        event = self._running.setdefault((requester, key), asyncio.Event())
+        body_sent = False
+        started = False
+        status_code = 500
+        response_headers: list[list[str]] = []
+        response_body: list[bytes] = []
+        size = 0
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture_send(message: Message) -> None:
+            nonlocal started, status_code, size
+            if message["type"] == "http.response.start":
+                started = True
+                status_code = message["status"]
+                response_headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    response_body.append(chunk)
+            await send(message)
+
+        finished = False
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            finished = True
+        finally:
+            try:
+                async with SessionLocal() as db:
+                    if not started:
+                        # ? Nothing is answered, the client must retry
+                        await idempotency_key_crud.release(
+                            db=db,
+                            scope=requester,
+                            key=key,
+                        )
+                    else:
+                        headers = response_headers
+                        stored_body = b"".join(response_body)
+                        if not finished or size > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                            # ? Body is too large or broken off, replay the rest
+                            headers = [
+                                [name, value]
+                                for name, value in response_headers
+                                if name.lower() != "content-length"
+                            ]
+                            headers.append(
+                                [IDEMPOTENCY_BODY_OMITTED_HEADER.lower(), "true"],
+                            )
+                            stored_body = b""
+                        await idempotency_key_crud.complete(
+                            db=db,
+                            scope=requester,
+                            key=key,
+                            status_code=status_code,
+                            headers=headers,
+                            body=stored_body,
+                        )
+            finally:
+                self._running.pop((requester, key), None)
+                event.set()
+
+    async def _wait(self, requester: str, key: str, deadline: float) -> bool:
+        """
+        * Wait until first request finishes, False when deadline is passed
+        """
+        loop = asyncio.get_running_loop()
+        delay = 0.05
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+
+            event = self._running.get((requester, key))
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return False
+                return True
+
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+            async with SessionLocal() as db:
+                record = await idempotency_key_crud.find(
+                    db=db,
+                    scope=requester,
+                    key=key,
+                )
+            if record is None or record.status != IdempotencyStatus.PROCESSING:
+                return True
+
+    @staticmethod
+    async def _replay(record: IdempotencyKey, send: Send) -> None:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in record.response_headers
+        ]
+        headers.append((IDEMPOTENCY_REPLAYED_HEADER.lower().encode(), b"true"))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": record.response_status,
+                "headers": headers,
+            },
+        )
+        await send({"type": "http.response.body", "body": record.response_body})
+
+    @staticmethod
+    async def _error(
+        exception: HTTPException,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        response = ORJSONResponse(
+            status_code=exception.status_code,
+            content={"detail": exception.detail},
+            headers=exception.headers,
+        )
+        await response(scope, receive, send)
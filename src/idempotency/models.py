@@ -0,0 +1,43 @@
+import enum
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.database.base_class import Base, BaseMixin
+
+
+# ---------------------------------------------------------------------------
+class IdempotencyStatus(enum.Enum):
+    PROCESSING = "PROCESSING"
+    COMPLETED = "COMPLETED"
+
+
+# ---------------------------------------------------------------------------
+class IdempotencyKey(Base, BaseMixin):
+    __tablename__ = "idempotency_key"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_key_scope_key"),
+        Index("ix_idempotency_key_created_at_id", "created_at", "id"),
+        Index("ix_idempotency_key_expires_at", "expires_at"),
+    )
+
+    # ? Hash of requester's credentials, keys of different clients never meet
+    scope = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    fingerprint = Column(String, nullable=False)
+    status = Column(Enum(IdempotencyStatus), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSONB, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
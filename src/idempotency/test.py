@@ -0,0 +1,12 @@
+#   ? Idempotency Middleware
+#       * Request without key is not stored
+#       * First request is stored & repeated request is replayed
+#       * Same key with another body
+#       * Concurrent duplicate waits for first result
+#       * Duplicate after lock wait timeout
+#       * Failed (5xx) response is stored & replayed
+#       * Request is released when app raises before response starts
+#       * Too large response is replayed without body
+#       * Released key is claimed again after backoff
+#       * Too large body is rejected before it is buffered
+#       * Upload routes are passed through unkeyed
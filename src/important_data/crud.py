@@ -1,7 +1,6 @@
 from typing import Type
 from uuid import UUID
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.base_crud import BaseCRUD
@@ -57,9 +56,7 @@ class ImportantDataCRUD(BaseCRUD[ImportantData, None, ImportantDataUpdate]):
             All system important data count
 
         """
-        response = await db.execute(select(self.model))
-        count = len(response.scalars().all())
-
+        count, _ = await self.count(db=db)
         return count
 
 
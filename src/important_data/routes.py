@@ -1,8 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from src import deps
+from src.core.response_cache import response_cache
+from src.database.pagination import Page
 from src.important_data.crud import important_data as important_data_crud
 from src.important_data.schema import ImportantDataRead, ImportantDataUpdate
 from src.permission import permission_codes as permission
@@ -54,6 +56,7 @@ async def update_important_data(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    response_cache.invalidate("important_data")
     return obj
 
 
@@ -61,13 +64,15 @@ async def update_important_data(
 @router.get(path="/list", response_model=List[ImportantDataRead])
 async def get_important_data_list(
     *,
+    request: Request,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_IMPORTANT_DATA]),
     ),
     skip: int = 0,
     limit: int = 20,
-) -> List[ImportantDataRead]:
+    cursor: str | None = None,
+) -> Response:
     """
     ! Get All Important Data
 
@@ -81,11 +86,26 @@ async def get_important_data_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     obj_list
         All Important Data
     """
-    obj_list = await important_data_crud.get_multi(db=db, skip=skip, limit=limit)
-    return obj_list
+
+    async def load_page() -> Page:
+        return await important_data_crud.get_multi_with_total(
+            db=db,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    return await response_cache.respond(
+        request=request,
+        namespace="important_data",
+        schema=ImportantDataRead,
+        load=load_page,
+    )
@@ -1,5 +1,3 @@
-from random import randint
-
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -7,6 +5,7 @@ from src import deps
 from src.invoice.crud import invoice as invoice_crud
 from src.invoice.schema import InvoiceCreate, InvoiceRead, InvoiceVerifyInput
 from src.merchant.crud import merchant as merchant_crud
+from src.utils.number_allocator import invoice_icart_number
 
 # ---------------------------------------------------------------------------
 router = APIRouter(prefix="/invoice", tags=["invoice"])
@@ -102,7 +101,7 @@ async def create_invoice(
             )
         )
 
-    icart_number = randint(1000, 9999)
+    icart_number = await invoice_icart_number.allocate(db=db)
 
     invoice = await invoice_crud.create(
         db=db,
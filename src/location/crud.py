@@ -1,17 +1,23 @@
 from typing import Type
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, select
+from sqlalchemy import ColumnElement, and_, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.base_crud import BaseCRUD
 from src.location.exception import (
     LocationNameIsDuplicatedException,
     LocationNotFoundException,
+    LocationParentIsDescendantException,
     LocationParentNotFoundException,
 )
 from src.location.models import Location
-from src.location.schema import LocationCreate, LocationUpdate
+from src.location.schema import LocationBase, LocationCreate, LocationUpdate
+from src.location.tree import build_path, subtree_of
+
+# ---------------------------------------------------------------------------
+# ? Creates & moves of locations are serialized, paths are read under it
+LOCATION_TREE_LOCK_KEY = 4_218_067_302
 
 
 # ---------------------------------------------------------------------------
@@ -116,6 +122,157 @@ class LocationCRUD(BaseCRUD[Location, LocationCreate, LocationUpdate]):
 
         return obj
 
+    async def _lock_tree_and_get_path(
+        self,
+        *,
+        db: AsyncSession,
+        parent_id: UUID | None,
+    ) -> str | None:
+        await db.execute(select(func.pg_advisory_xact_lock(LOCATION_TREE_LOCK_KEY)))
+        if not parent_id:
+            return None
+
+        response = await db.execute(
+            select(Location.path).where(Location.id == parent_id),
+        )
+        parent_path = response.scalar_one_or_none()
+        if parent_path is None:
+            raise LocationParentNotFoundException()
+        return parent_path
+
+    async def create(self, *, db: AsyncSession, obj_in: LocationCreate) -> Location:
+        """
+        ! Create location with its materialized path
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        obj_in
+            Target data for create
+
+        Returns
+        -------
+        new_obj
+            Created location
+
+        Raises
+        ------
+        LocationParentNotFoundException
+        """
+        parent_path = await self._lock_tree_and_get_path(
+            db=db,
+            parent_id=obj_in.parent_id,
+        )
+        location_id = uuid4()
+        new_obj = Location(
+            id=location_id,
+            name=obj_in.name,
+            parent_id=obj_in.parent_id,
+            path=build_path(location_id, parent_path),
+        )
+        db.add(new_obj)
+        await db.commit()
+        await db.refresh(new_obj)
+        return new_obj
+
+    async def update(
+        self,
+        *,
+        db: AsyncSession,
+        obj_current: Location,
+        obj_new: LocationBase,
+    ) -> Location:
+        """
+        ! Update location, its subtree is moved when parent is changed
+
+        Paths of the whole subtree are rewritten with one statement.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        obj_current
+            Current location
+        obj_new
+            New data
+
+        Returns
+        -------
+        updated_obj
+            Updated location
+
+        Raises
+        ------
+        LocationParentNotFoundException
+        LocationParentIsDescendantException
+        """
+        if obj_new.parent_id != obj_current.parent_id:
+            parent_path = await self._lock_tree_and_get_path(
+                db=db,
+                parent_id=obj_new.parent_id,
+            )
+            # ? Path may be changed by a move that finished before the lock
+            await db.refresh(obj_current, attribute_names=["path"])
+            old_path = obj_current.path
+            if parent_path and parent_path.startswith(old_path):
+                raise LocationParentIsDescendantException()
+
+            new_path = build_path(obj_current.id, parent_path)
+            await db.execute(
+                update(Location)
+                .where(subtree_of(old_path))
+                .values(
+                    path=func.concat(
+                        new_path,
+                        func.substr(Location.path, len(old_path) + 1),
+                    ),
+                )
+                .execution_options(synchronize_session=False),
+            )
+            obj_current.path = new_path
+
+        updated_obj = await super().update(
+            db=db,
+            obj_current=obj_current,
+            obj_new=obj_new,
+        )
+        return updated_obj
+
+    async def subtree_condition(
+        self,
+        *,
+        db: AsyncSession,
+        location_id: UUID,
+    ) -> ColumnElement[bool]:
+        """
+        ! Condition of locations in subtree of location
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        location_id
+            Root of subtree
+
+        Returns
+        -------
+        condition
+            Indexed path range condition on Location, root is included
+
+        Raises
+        ------
+        LocationNotFoundException
+        """
+        # ? Read from table, a create or move of another worker is seen at once
+        response = await db.execute(
+            select(Location.path).where(Location.id == location_id),
+        )
+        path = response.scalar_one_or_none()
+        if path is None:
+            raise LocationNotFoundException()
+        return subtree_of(path)
+
 
 # ---------------------------------------------------------------------------
 location = LocationCRUD(Location)
@@ -63,3 +63,18 @@ class LocationHaveChildException(HTTPException):
             "english_message": "Location Have Child!",
         }
         self.headers = None
+
+
+class LocationParentIsDescendantException(HTTPException):
+    """
+    ? Exception When Location Is Moved Under Itself Or Its Children
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 1103,
+            "persian_message": "منطقه والد نمی‌تواند زیر منطقه همین منطقه باشد!",
+            "english_message": "Location Parent Can Not Be Its Descendant!",
+        }
+        self.headers = None
@@ -1,4 +1,4 @@
-from sqlalchemy import UUID, Column, ForeignKey, String
+from sqlalchemy import UUID, Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -8,8 +8,15 @@ from src.position_request.models import PositionRequest
 # ---------------------------------------------------------------------------
 class Location(Base, BaseMixin):
     __tablename__ = "location"
+    __table_args__ = (
+        Index("ix_location_created_at_id", "created_at", "id"),
+        # ? Backs subtree lookups, see src.location.tree.subtree_of
+        Index("ix_location_path", "path"),
+    )
 
     name = Column(String, index=True, unique=True, nullable=False)
+    # ? Materialized path, see src.location.tree.build_path
+    path = Column(String(collation="C"), nullable=False)
 
     # ! Relations
     parent_id = Column(UUID(as_uuid=True), ForeignKey("location.id"), nullable=True)
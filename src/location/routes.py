@@ -1,9 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy import or_, select
 
 from src import deps
+from src.core.response_cache import response_cache
+from src.database.pagination import Page
 from src.location.crud import location as location_crud
 from src.location.models import Location
 from src.location.schema import (
@@ -102,6 +104,7 @@ async def create_location(
     await location_crud.verify_duplicate_name(db=db, name=create_data.name)
 
     obj = await location_crud.create(db=db, obj_in=create_data)
+    response_cache.invalidate("location")
     return obj
 
 
@@ -136,6 +139,7 @@ async def update_location(
     ------
     LocationNameIsDuplicatedException
     LocationParentNotFoundException
+    LocationParentIsDescendantException
     LocationNotFoundException
     """
     # * Verify location existence
@@ -162,6 +166,7 @@ async def update_location(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    response_cache.invalidate("location")
     return obj
 
 
@@ -204,12 +209,14 @@ async def find_location(
 @router.get(path="/list", response_model=List[LocationRead])
 async def get_location(
     *,
+    request: Request,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     filter_data: LocationFilter,
     skip: int = 0,
     limit: int = 20,
-) -> List[LocationRead]:
+    cursor: str | None = None,
+) -> Response:
     """
     ! Get All Location
 
@@ -223,6 +230,8 @@ async def get_location(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -231,18 +240,32 @@ async def get_location(
     obj_list
         List of ability
     """
-    # * Prepare filter fields
-    filter_data.is_main = (
-        (Location.parent_id.is_(None)) if filter_data.is_main else False
-    )
-    # * Add filter fields
-    query = select(Location).filter(
-        or_(
-            filter_data.return_all,
-            filter_data.is_main,
-        ),
-    )
-    # * Find All agent with filters
-    obj_list = await location_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
 
-    return obj_list
+    async def load_page() -> Page:
+        # * Prepare filter fields
+        filter_data.is_main = (
+            (Location.parent_id.is_(None)) if filter_data.is_main else False
+        )
+        # * Add filter fields
+        query = select(Location).filter(
+            or_(
+                filter_data.return_all,
+                filter_data.is_main,
+            ),
+        )
+        # * Find All agent with filters
+        return await location_crud.get_multi_with_total(
+            db=db,
+            skip=skip,
+            limit=limit,
+            query=query,
+            cursor=cursor,
+        )
+
+    return await response_cache.respond(
+        request=request,
+        namespace="location",
+        schema=LocationRead,
+        load=load_page,
+        params=filter_data,
+    )
@@ -10,6 +10,8 @@
 #       * Location Parent Not Found
 #       * Location Not Found
 #       * Location Name Is Duplicated
+#       * Location Parent Is Descendant
+#       * Paths of sub locations are moved with parent
 #       * User not authentication
 #       * Verify Permission
 #   ? Find Api
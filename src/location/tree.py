@@ -0,0 +1,52 @@
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, and_
+
+from src.location.models import Location
+
+# ---------------------------------------------------------------------------
+# ? Every level of path is id hex of one location followed by separator
+PATH_SEPARATOR = "."
+
+
+# ---------------------------------------------------------------------------
+def build_path(location_id: UUID, parent_path: str | None = None) -> str:
+    """
+    ! Materialized path of location
+
+    Parameters
+    ----------
+    location_id
+        Target location's id
+    parent_path
+        Path of parent, None for root locations
+
+    Returns
+    -------
+    path
+        Ids of ancestors and the location itself, root first
+    """
+    return f"{parent_path or ''}{location_id.hex}{PATH_SEPARATOR}"
+
+
+# ---------------------------------------------------------------------------
+def subtree_of(path: str) -> ColumnElement[bool]:
+    """
+    ! Condition of locations whose path starts with path
+
+    Paths are compared in "C" collation, so the prefix is a range of the
+    path index. Unlike LIKE 'prefix%', the range uses the index with bound
+    parameters of prepared statements too.
+
+    Parameters
+    ----------
+    path
+        Path of subtree root
+
+    Returns
+    -------
+    condition
+        Condition on Location.path, root is included
+    """
+    upper = path[: -len(PATH_SEPARATOR)] + chr(ord(PATH_SEPARATOR) + 1)
+    return and_(Location.path >= path, Location.path < upper)
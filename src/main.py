@@ -1,9 +1,21 @@
 import os
 import time
 
+from fastapi import Depends
+from fastapi.responses import PlainTextResponse
+
+from src import deps
+from src.core.config import settings
+from src.core.metrics import CONTENT_TYPE, metrics_registry
+from src.core.secret_store import secret_store
+from src.core.security import password_hasher
 from src.create_app import create_fastapi_app
 from src.database.init_db import init_db
 from src.database.session import SessionLocal
+from src.idempotency.crud import idempotency_key as idempotency_key_crud
+from src.user.image import profile_image_processor
+from src.utils.minio_client import minio_client
+from src.utils.sms import sms_dispatcher
 
 # ---------------------------------------------------------------------------
 app = create_fastapi_app()
@@ -27,7 +39,90 @@ async def initial_data():
         await init_db(db=session)
 
 
+# ---------------------------------------------------------------------------
+@app.on_event("startup")
+async def purge_idempotency_keys():
+    async with SessionLocal() as session:
+        await idempotency_key_crud.purge_expired(db=session)
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("startup")
+async def start_sms_dispatcher():
+    sms_dispatcher.start()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("startup")
+async def start_minio_client():
+    await minio_client.start()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("startup")
+async def start_metrics_registry():
+    if settings.METRICS_ENABLED:
+        metrics_registry.start(interval=settings.METRICS_FLUSH_SECONDS)
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def stop_metrics_registry():
+    if settings.METRICS_ENABLED:
+        await metrics_registry.stop()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def stop_minio_client():
+    minio_client.shutdown()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def stop_profile_image_processor():
+    profile_image_processor.shutdown()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def stop_sms_dispatcher():
+    await sms_dispatcher.stop()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def stop_password_hasher():
+    password_hasher.shutdown()
+
+
+# ---------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def close_secret_store():
+    await secret_store.close()
+
+
 # ---------------------------------------------------------------------------
 @app.get("/")
 def index():
     return {"Status": 200, "Message": "I'm still working!"}
+
+
+# ---------------------------------------------------------------------------
+if settings.METRICS_ENABLED:
+    # ? Route inventory, error rates & pool saturation are never public
+    if not settings.METRICS_TOKEN:
+        raise RuntimeError("METRICS_TOKEN is required when METRICS_ENABLED is set")
+
+    @app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(deps.verify_metrics_token)],
+    )
+    def read_metrics():
+        """
+        ! Metrics of all workers for prometheus
+
+        Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>".
+        """
+        return PlainTextResponse(metrics_registry.collect(), media_type=CONTENT_TYPE)
@@ -1,9 +1,10 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from src import deps
+from src.database.pagination import set_page_headers
 from src.merchant.crud import merchant as merchant_crud
 from src.merchant.schema import MerchantRead
 from src.user.models import User
@@ -51,10 +52,12 @@ async def get_merchant(
 @router.get(path="/list", response_model=List[MerchantRead])
 async def get_merchant_list(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[MerchantRead]:
     """
     ! Get All Merchant
@@ -69,13 +72,21 @@ async def get_merchant_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     obj_list
         List of merchants
     """
-    obj_list = await merchant_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await merchant_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
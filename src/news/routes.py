@@ -1,9 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy import or_, select
 
 from src import deps
+from src.core.response_cache import response_cache
+from src.database.pagination import Page
 from src.news.crud import news as news_crud
 from src.news.models import News
 from src.news.schema import NewsCreate, NewsFilter, NewsRead, NewsUpdate
@@ -49,6 +51,7 @@ async def delete_news(
     # * Verify news existence
     await news_crud.verify_existence(db=db, news_id=delete_data.id)
     await news_crud.delete(db=db, item_id=delete_data.id)
+    response_cache.invalidate("news")
     return DeleteResponse(result="News Deleted Successfully")
 
 
@@ -80,6 +83,7 @@ async def create_news(
         New news
     """
     obj = await news_crud.create(db=db, obj_in=create_data)
+    response_cache.invalidate("news")
     return obj
 
 
@@ -122,6 +126,7 @@ async def update_news(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    response_cache.invalidate("news")
     return obj
 
 
@@ -166,6 +171,7 @@ async def find_news(
 @router.get(path="/list", response_model=List[NewsRead])
 async def get_news_list(
     *,
+    request: Request,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_NEWS]),
@@ -173,7 +179,8 @@ async def get_news_list(
     filter_data: NewsFilter,
     skip: int = 0,
     limit: int = 20,
-) -> List[NewsRead]:
+    cursor: str | None = None,
+) -> Response:
     """
     ! Get All News
 
@@ -187,6 +194,8 @@ async def get_news_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -195,17 +204,32 @@ async def get_news_list(
     obj_list
         List of ability
     """
-    # * Prepare filter fields
-    filter_data.title = (
-        (News.title.contain(filter_data.title)) if filter_data.title else False
-    )
-    # * Add filter fields
-    query = select(News).filter(
-        or_(
-            filter_data.return_all,
-            filter_data.title,
-        ),
+
+    async def load_page() -> Page:
+        # * Prepare filter fields
+        filter_data.title = (
+            (News.title.contain(filter_data.title)) if filter_data.title else False
+        )
+        # * Add filter fields
+        query = select(News).filter(
+            or_(
+                filter_data.return_all,
+                filter_data.title,
+            ),
+        )
+        # * Find All agent with filters
+        return await news_crud.get_multi_with_total(
+            db=db,
+            skip=skip,
+            limit=limit,
+            query=query,
+            cursor=cursor,
+        )
+
+    return await response_cache.respond(
+        request=request,
+        namespace="news",
+        schema=NewsRead,
+        load=load_page,
+        params=filter_data,
     )
-    # * Find All agent with filters
-    obj_list = await news_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
-    return obj_list
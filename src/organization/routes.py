@@ -1,8 +1,9 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
 from src import deps
+from src.database.pagination import set_page_headers
 from src.organization.crud import organization as organization_crud
 from src.organization.schema import OrganizationRead
 from src.schema import IDRequest
@@ -51,8 +52,12 @@ async def find_organization(
 @router.get(path="/list", response_model=List[OrganizationRead])
 async def get_organization(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
+    skip: int = 0,
+    limit: int = 20,
+    cursor: str | None = None,
 ) -> List[OrganizationRead]:
     """
     ! Get All Organization
@@ -63,11 +68,23 @@ async def get_organization(
         Target database connection
     current_user
         Requester User
+    skip
+        Pagination skip
+    limit
+        Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     obj_list
         List of organization
     """
-    obj_list = await organization_crud.get_multi(db=db)
+    page = await organization_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import deps
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.permission.crud import permission as permission_crud
 from src.permission.schema import PermissionRead
@@ -16,12 +17,14 @@ router = APIRouter(prefix="/permission", tags=["permission"])
 @router.get("/list", response_model=list[PermissionRead])
 async def read_permissions_list(
     *,
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_PERMISSION]),
     ),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ):
     """
     ! Get All Permissions
@@ -36,6 +39,8 @@ async def read_permissions_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
@@ -43,7 +48,13 @@ async def read_permissions_list(
         List of permissions
 
     """
-    permission_list = await permission_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await permission_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    permission_list = set_page_headers(response=response, page=page)
     return permission_list
 
 
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import deps
+from src.database.pagination import set_page_headers
 from src.merchant.crud import merchant as merchant_crud
 from src.permission import permission_codes as permission
 from src.pos.crud import pos as pos_crud
@@ -150,12 +151,14 @@ async def update_pos(
 @router.get("/list", response_model=list[PosRead])
 async def read_pos_list(
     *,
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_POS]),
     ),
     skip: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
 ) -> list[PosRead]:
     """
     ! Read Pos
@@ -170,13 +173,21 @@ async def read_pos_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     pos_list
         List of pos
     """
-    pos_list = await pos_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await pos_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    pos_list = set_page_headers(response=response, page=page)
     return pos_list
 
 
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import UUID, Boolean, Column, Enum, ForeignKey
+from sqlalchemy import UUID, Boolean, Column, Enum, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 
 from src.contract.models import Contract
@@ -23,6 +23,34 @@ class PositionRequestStatusType(enum.Enum):
 # ---------------------------------------------------------------------------
 class PositionRequest(Base, BaseMixin):
     __tablename__ = "position_request"
+    __table_args__ = (
+        Index("ix_position_request_created_at_id", "created_at", "id"),
+        Index(
+            "ix_position_request_next_approve_user_id_created_at",
+            "next_approve_user_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_position_request_requester_user_id_created_at",
+            "requester_user_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_position_request_creator_id_created_at",
+            "creator_id",
+            "created_at",
+            "id",
+        ),
+        # ? Open requests that wait for admin
+        Index(
+            "ix_position_request_admin_queue",
+            "created_at",
+            "id",
+            postgresql_where=text("next_approve_user_id IS NULL AND status = 'OPEN'"),
+        ),
+    )
 
     is_approve = Column(Boolean, default=False)
     target_position = Column(Enum(PositionRequestType))
@@ -3,13 +3,15 @@ from random import randint
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import or_, select
 
 from src import deps
 from src.agent.crud import agent as agent_crud
 from src.agent.models import Agent
+from src.auth.principal import principal_cache
 from src.contract.crud import contract as contract_crud
+from src.database.pagination import set_page_headers
 from src.location.crud import location as location_crud
 from src.merchant.models import Merchant
 from src.organization.models import Organization
@@ -210,7 +212,7 @@ async def update_position_request(
     # ? must approve from admin
     elif obj_current.status == PositionRequestStatusType.OPEN:
         admin_role = await role_crud.find_by_name(db=db, name="ادمین")
-        if current_user.role == admin_role:
+        if admin_role and current_user.role_id == admin_role.id:
             # ! Is Accept ?
             if accept:
                 obj_current.is_approve = True
@@ -257,6 +259,8 @@ async def update_position_request(
                     db.add(new_org)
                     await db.commit()
 
+                # * Requester role is changed, drop its cached principal
+                principal_cache.invalidate_user(requester_user.username)
             else:
                 obj_current.status = PositionRequestStatusType.CLOSE
 
@@ -297,21 +301,30 @@ async def get_position_request(
 @router.get(path="/list", response_model=List[PositionRequestRead])
 async def get_list_position_request(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[PositionRequestRead]:
     """
     ! Get All PositionRequest
 
     :param current_user: Required permissions
     :param limit: Pagination limit
+    :param cursor: Pagination cursor of previous page
     :param skip: Pagination skip
     :param db: Target database connection
     :return: List of ability
     """
-    obj_list = await position_request_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await position_request_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
@@ -319,16 +332,19 @@ async def get_list_position_request(
 @router.get(path="/list/my/must_approve", response_model=List[PositionRequestRead])
 async def get_must_approve_position_request(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[PositionRequestRead]:
     """
     ! Get All Position Request
 
     :param current_user: Required permissions
     :param limit: Pagination limit
+    :param cursor: Pagination cursor of previous page
     :param skip: Pagination skip
     :param db: Target database connection
     :return: List of ability
@@ -336,12 +352,14 @@ async def get_must_approve_position_request(
     query = select(PositionRequest).where(
         PositionRequest.next_approve_user_id == current_user.id,
     )
-    obj_list = await position_request_crud.get_multi(
+    page = await position_request_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        cursor=cursor,
     )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
@@ -349,16 +367,19 @@ async def get_must_approve_position_request(
 @router.get(path="/list/admin/must_approve", response_model=List[PositionRequestRead])
 async def get_must_approve_addmin_position_request(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[PositionRequestRead]:
     """
     ! Get All Position Request
 
     :param current_user: Required permissions
     :param limit: Pagination limit
+    :param cursor: Pagination cursor of previous page
     :param skip: Pagination skip
     :param db: Target database connection
     :return: List of ability
@@ -367,12 +388,14 @@ async def get_must_approve_addmin_position_request(
         PositionRequest.next_approve_user_id.is_(None),
         PositionRequest.status == PositionRequestStatusType.OPEN,
     )
-    obj_list = await position_request_crud.get_multi(
+    page = await position_request_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        cursor=cursor,
     )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
@@ -380,16 +403,19 @@ async def get_must_approve_addmin_position_request(
 @router.get(path="/list/my", response_model=List[PositionRequestRead])
 async def get_my_position_requests(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[PositionRequestRead]:
     """
     ! Get All Position Request
 
     :param current_user: Required permissions
     :param limit: Pagination limit
+    :param cursor: Pagination cursor of previous page
     :param skip: Pagination skip
     :param db: Target database connection
     :return: List of ability
@@ -400,10 +426,12 @@ async def get_my_position_requests(
             PositionRequest.creator_id == current_user.id,
         ),
     )
-    obj_list = await position_request_crud.get_multi(
+    page = await position_request_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        cursor=cursor,
     )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
@@ -2,7 +2,7 @@ import uuid
 from typing import Type
 from uuid import UUID
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.base_crud import BaseCRUD
@@ -159,12 +159,61 @@ class RoleCRUD(BaseCRUD[Role, RoleCreate, RoleUpdate]):
         RoleHaveUserException
 
         """
-        target_role = await self.verify_existence(db=db, role_id=role_id)
-        if len(target_role.users):
+        response = await db.execute(
+            select(self.model.users.any()).where(self.model.id == role_id),
+        )
+        if response.scalar_one_or_none():
             raise RoleHaveUserException()
 
         return True
 
+    async def get_version(self, *, db: AsyncSession, role_id: UUID) -> int | None:
+        """
+        ! Get role's permission version
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        role_id
+            Target role's id
+
+        Returns
+        -------
+        version
+            Current version or None if role does not exist
+        """
+        response = await db.execute(
+            select(self.model.version).where(self.model.id == role_id),
+        )
+        return response.scalar_one_or_none()
+
+    async def bump_version(self, *, db: AsyncSession, role_id: UUID) -> int | None:
+        """
+        ! Increase role's permission version
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        role_id
+            Target role's id
+
+        Returns
+        -------
+        version
+            New version or None if role does not exist
+        """
+        response = await db.execute(
+            update(self.model)
+            .where(self.model.id == role_id)
+            .values(version=self.model.version + 1)
+            .returning(self.model.version),
+        )
+        version = response.scalar_one_or_none()
+        await db.commit()
+        return version
+
 
 # ---------------------------------------------------------------------------
 class RolePermissionCRUD(BaseCRUD[RolePermission, RolePermissionCreate, None]):
@@ -1,4 +1,4 @@
-from sqlalchemy import UUID, Column, ForeignKey, String
+from sqlalchemy import UUID, Column, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -9,6 +9,8 @@ from src.permission.models import Permission
 class Role(Base, BaseMixin):
     __tablename__ = "role"
     name = Column(String, index=True, nullable=False)
+    # ? Bumped whenever permissions of role change, older tokens are rejected
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # !Relations
     permissions = relationship(
@@ -17,7 +19,13 @@ class Role(Base, BaseMixin):
         secondary="role_permission",
         back_populates="roles",
     )
-    users = relationship("User", back_populates="role", lazy="selectin")
+    # ? Big collection, never loaded implicitly
+    users = relationship(
+        "User",
+        back_populates="role",
+        lazy="raise",
+        passive_deletes=True,
+    )
 
 
 # ---------------------------------------------------------------------------
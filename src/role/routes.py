@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import deps
+from src.auth.principal import principal_cache, role_versions
+from src.database.loading import COLUMNS_ONLY
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.permission.crud import permission as permission_crud
 from src.role.crud import role as role_crud
@@ -62,6 +65,9 @@ async def delete_role(
     await role_crud.verify_connections(db=db, role_id=delete_data.id)
     # * Delete Role
     await role_crud.delete(db=db, item_id=delete_data.id)
+    # * Drop cached principals and version of role
+    role_versions.set(role_id=delete_data.id, version=None)
+    principal_cache.invalidate_role(delete_data.id)
 
     return DeleteResponse(result="Role Deleted Successfully")
 
@@ -150,6 +156,10 @@ async def update_role(
         obj_current=obj_current,
         obj_new=update_data.data,
     )
+    # * Reject issued tokens and drop cached principals of role
+    version = await role_crud.bump_version(db=db, role_id=role.id)
+    role_versions.set(role_id=role.id, version=version)
+    principal_cache.invalidate_role(role.id)
     return role
 
 
@@ -157,6 +167,7 @@ async def update_role(
 @router.post("/list", response_model=list[RoleRead])
 async def get_roles_list(
     *,
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_ROLE]),
@@ -164,6 +175,7 @@ async def get_roles_list(
     filter_data: RoleFilter,
     skip: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
 ) -> list[RoleRead]:
     """
     ! Get All Role
@@ -178,6 +190,8 @@ async def get_roles_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -209,7 +223,15 @@ async def get_roles_list(
             if field == RoleFilterOrderFild.name:
                 query = query.order_by(Role.name.asc())
     # * Find All agent with filters
-    role_list = await role_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
+    page = await role_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        query=query,
+        options=COLUMNS_ONLY,
+        cursor=cursor,
+    )
+    role_list = set_page_headers(response=response, page=page)
     return role_list
 
 
@@ -301,6 +323,10 @@ async def add_permissions_to_role(
         if not role_perm:
             create_data = RolePermissionCreate(role_id=role.id, permission_id=perm.id)
             await role_permission_crud.create(db=db, obj_in=create_data)
+    # * Reject issued tokens and drop cached principals of role
+    version = await role_crud.bump_version(db=db, role_id=role.id)
+    role_versions.set(role_id=role.id, version=version)
+    principal_cache.invalidate_role(role.id)
     return ResultResponse(result="Permissions Added Successfully")
 
 
@@ -1,9 +1,8 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
-from src.user.models import User
-
 
 # ---------------------------------------------------------------------------
 class DeleteResponse(BaseModel):
@@ -21,8 +20,45 @@ class ResultResponse(BaseModel):
 
 
 # ---------------------------------------------------------------------------
-class VerifyUserDep(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+class UploadedFileRead(BaseModel):
+    file_name: str
+    version_id: str | None
+    content_type: str
+    size: int
+    sha256: str
+
+
+# ---------------------------------------------------------------------------
+class PrincipalRole(BaseModel):
+    id: UUID
+    name: str
+
+
+# ---------------------------------------------------------------------------
+class PrincipalWallet(BaseModel):
+    id: UUID
 
+
+# ---------------------------------------------------------------------------
+class UserPrincipal(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: UUID
+    username: str
+    is_active: bool
+    first_name: str | None
+    last_name: str | None
+    subscribe_newsletter: bool | None
+    role_id: UUID | None
+    role: PrincipalRole | None
+    wallet: PrincipalWallet | None
+    permissions: frozenset[int] = frozenset()
+
+    created_at: datetime
+    updated_at: datetime | None
+
+
+# ---------------------------------------------------------------------------
+class VerifyUserDep(BaseModel):
     is_valid: bool | None = None
-    user: User | None = None
+    user: UserPrincipal | None = None
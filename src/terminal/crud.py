@@ -2,11 +2,13 @@ from typing import Type
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.base_crud import BaseCRUD
 from src.terminal.exception import TerminalNotFoundException
 from src.terminal.models import Terminal
+from src.terminal.store import TerminalClaims
 
 
 # ---------------------------------------------------------------------------
@@ -77,6 +79,61 @@ class TerminalCRUD(BaseCRUD[Terminal, None, None]):
 
         return obj
 
+    async def find_by_invoice_id(
+        self,
+        *,
+        db: AsyncSession,
+        invoice_id: UUID,
+    ) -> Terminal | None:
+        """
+        ! Find terminal of invoice
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        invoice_id
+            Target invoice's ID
+
+        Returns
+        -------
+        obj
+            Found Item or None
+        """
+        response = await db.execute(
+            select(self.model).where(Terminal.invoice_id == invoice_id),
+        )
+        return response.scalar_one_or_none()
+
+    async def create_paid(self, *, db: AsyncSession, claims: TerminalClaims) -> bool:
+        """
+        ! Store paid terminal, nothing is committed
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        claims
+            Claims of paid terminal
+
+        Returns
+        -------
+        created
+            False if terminal or another terminal of its invoice exists
+        """
+        response = await db.execute(
+            insert(self.model)
+            .values(
+                id=claims.id,
+                number=claims.number,
+                redirect_url=claims.redirect_url,
+                invoice_id=claims.invoice_id,
+            )
+            .on_conflict_do_nothing()
+            .returning(self.model.id),
+        )
+        return response.scalar_one_or_none() is not None
+
 
 # ---------------------------------------------------------------------------
 terminal = TerminalCRUD(Terminal)
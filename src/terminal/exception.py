@@ -18,3 +18,63 @@ class TerminalNotFoundException(HTTPException):
             "english_message": "Terminal Is not found!",
         }
         self.headers = None
+
+
+class TerminalTokenIsInvalidException(HTTPException):
+    """
+    ? Exception when terminal token is invalid or expired
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 2701,
+            "persian_message": "توکن ترمینال نامعتبر یا منقضی شده است!",
+            "english_message": "Terminal Token Is Invalid!",
+        }
+        self.headers = None
+
+
+class TerminalIsPaidException(HTTPException):
+    """
+    ? Exception when terminal or its invoice is already paid
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 2702,
+            "persian_message": "فاکتور مورد نظر قبلا پرداخت شده است!",
+            "english_message": "Invoice Is Already Paid!",
+        }
+        self.headers = None
+
+
+class TerminalIsLockedException(HTTPException):
+    """
+    ? Exception when terminal has too many failed attempts
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 2703,
+            "persian_message": "تعداد تلاش های ناموفق بیش از حد مجاز است!",
+            "english_message": "Too Many Failed Attempts!",
+        }
+        self.headers = None
+
+
+class TerminalInvoiceMismatchException(HTTPException):
+    """
+    ? Exception when value or type of terminal does not match its invoice
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 2704,
+            "persian_message": "مبلغ یا نوع پرداخت با فاکتور مطابقت ندارد!",
+            "english_message": "Terminal Does Not Match Invoice!",
+        }
+        self.headers = None
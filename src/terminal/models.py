@@ -1,4 +1,4 @@
-from sqlalchemy import UUID, Column, ForeignKey, String
+from sqlalchemy import UUID, Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -7,6 +7,11 @@ from src.database.base_class import Base, BaseMixin
 # ---------------------------------------------------------------------------
 class Terminal(Base, BaseMixin):
     __tablename__ = "terminal"
+    __table_args__ = (
+        Index("ix_terminal_created_at_id", "created_at", "id"),
+        # ? Terminals are stored when paid, an invoice is paid once
+        Index("ix_terminal_invoice_id", "invoice_id", unique=True),
+    )
 
     number = Column(String, index=True, unique=True, nullable=False)
     redirect_url = Column(String, nullable=False)
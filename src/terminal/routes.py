@@ -0,0 +1,267 @@
+import hmac
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import deps
+from src.card.crud import card as card_crud
+from src.card.exception import CardIsExpiredException, WrongCardInformationException
+from src.core.secret_store import SecretPurpose, secret_store
+from src.invoice.crud import invoice as invoice_crud
+from src.invoice.exception import InvoiceNotFoundException
+from src.invoice.schema import InvoiceRead
+from src.merchant.crud import merchant as merchant_crud
+from src.terminal.crud import terminal as terminal_crud
+from src.terminal.exception import (
+    TerminalInvoiceMismatchException,
+    TerminalIsPaidException,
+)
+from src.terminal.schema import (
+    GenerateTerminalInput,
+    GenerateTerminalOutput,
+    TerminalPayInput,
+    TerminalTokenInput,
+    TerminalVerifyOutput,
+)
+from src.terminal.store import TerminalClaims, TerminalStatus, terminal_store
+from src.transaction.ledger import Posting, ledger
+from src.transaction.models import TransactionValueType
+from src.utils.sms import send_decrease_money_sms
+from src.wallet.crud import wallet as wallet_crud
+
+# ---------------------------------------------------------------------------
+router = APIRouter(prefix="/terminal", tags=["terminal"])
+
+
+# ---------------------------------------------------------------------------
+@router.post("/generate", response_model=GenerateTerminalOutput)
+async def generate_terminal(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    input_data: GenerateTerminalInput,
+) -> GenerateTerminalOutput:
+    """
+    ! Generate terminal token for merchant's invoice
+    # Todo:
+        Verify IP
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    input_data
+        Merchant token, invoice and redirect url
+
+    Returns
+    -------
+    response
+        Signed terminal token
+
+    Raises
+    ------
+    MerchantNotFoundException
+    InvoiceNotFoundException
+    TerminalInvoiceMismatchException
+    TerminalIsPaidException
+    WalletNotFoundException
+    """
+    # ? Verify merchant token
+    merchant = await merchant_crud.verify_existence_by_number(
+        db=db,
+        merchant_number=input_data.merchant_token,
+    )
+    invoice = await invoice_crud.verify_existence_by_number(
+        db=db,
+        invoice_number=input_data.invoice_number,
+    )
+    if invoice.merchant_id != merchant.id:
+        raise InvoiceNotFoundException()
+    if invoice.value != input_data.value or invoice.type.value != input_data.type.value:
+        raise TerminalInvoiceMismatchException()
+
+    # ? Paid invoices have a terminal
+    if await terminal_crud.find_by_invoice_id(db=db, invoice_id=invoice.id):
+        raise TerminalIsPaidException()
+
+    wallet = await wallet_crud.verify_by_user_id(db=db, user_id=merchant.user_id)
+    claims = TerminalClaims(
+        id=uuid4(),
+        number=uuid4().hex,
+        redirect_url=input_data.redirect_url,
+        value=invoice.value,
+        value_type=input_data.type,
+        invoice_id=invoice.id,
+        invoice_icart_number=invoice.icart_number,
+        invoice_number=invoice.number,
+        merchant_id=merchant.id,
+        receiver_id=wallet.id,
+    )
+    terminal_token = terminal_store.issue(
+        claims=claims,
+        invoice=InvoiceRead.model_validate(invoice, from_attributes=True),
+    )
+
+    return GenerateTerminalOutput(terminal_token=terminal_token)
+
+
+# ---------------------------------------------------------------------------
+@router.post("/verify", response_model=TerminalVerifyOutput)
+async def verify_terminal(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    input_data: TerminalTokenInput,
+) -> TerminalVerifyOutput:
+    """
+    ! Verify terminal token in payment page
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    input_data
+        Terminal token
+
+    Returns
+    -------
+    terminal
+        Terminal with its invoice
+
+    Raises
+    ------
+    TerminalTokenIsInvalidException
+    TerminalIsLockedException
+    TerminalIsPaidException
+    InvoiceNotFoundException
+    """
+    state = await terminal_store.open(terminal_token=input_data.terminal_token)
+    if state.status == TerminalStatus.PAID:
+        raise TerminalIsPaidException()
+
+    # ? Token is issued by another worker
+    if state.invoice is None:
+        invoice = await invoice_crud.verify_existence(
+            db=db,
+            invoice_id=state.claims.invoice_id,
+        )
+        state.invoice = InvoiceRead.model_validate(invoice, from_attributes=True)
+
+    return TerminalVerifyOutput(
+        id=state.claims.id,
+        number=state.claims.number,
+        redirect_url=state.claims.redirect_url,
+        invoice=state.invoice,
+    )
+
+
+# ---------------------------------------------------------------------------
+@router.post("/pay", response_class=RedirectResponse, status_code=303)
+async def pay_terminal(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    input_data: TerminalPayInput,
+) -> RedirectResponse:
+    """
+    ! Pay terminal's invoice with card and redirect to merchant
+
+    Card is authorized, the terminal is stored and the transaction is
+    posted in one database transaction.
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    input_data
+        Terminal token and card information
+
+    Returns
+    -------
+    response
+        Redirect to terminal's redirect url
+
+    Raises
+    ------
+    TerminalTokenIsInvalidException
+    TerminalIsLockedException
+    TerminalIsPaidException
+    CardNotFoundException
+    CardIsExpiredException
+    WrongCardInformationException
+    LackOfMoneyException
+    LackOfCreditException
+    """
+    state = await terminal_store.open(terminal_token=input_data.terminal_token)
+    claims = state.claims
+    if state.status == TerminalStatus.PAID:
+        raise TerminalIsPaidException()
+
+    # ? Verify card
+    card = await card_crud.verify_by_number(db=db, number=input_data.card_number)
+    if card.expiration_at <= datetime.now(tz=timezone.utc):
+        raise CardIsExpiredException()
+    await terminal_store.verify_card(card_number=card.number)
+    # ? Both are checked, so a wrong cvv2 can not skip the dynamic password
+    # ? attempts, dynamic password is kept until payment is committed
+    dynamic_password_is_valid = await secret_store.verify(
+        purpose=SecretPurpose.CARD_DYNAMIC_PASSWORD,
+        subject=card.number,
+        secret=input_data.dynamic_password,
+        consume=False,
+    )
+    cvv2_is_valid = hmac.compare_digest(str(card.cvv2), str(input_data.cvv2))
+    if not (cvv2_is_valid and dynamic_password_is_valid):
+        await terminal_store.mark_failed(state, card_number=card.number)
+        raise WrongCardInformationException()
+
+    # ? Only one terminal of invoice can be stored
+    if not await terminal_crud.create_paid(db=db, claims=claims):
+        terminal_store.mark_paid(state)
+        raise TerminalIsPaidException()
+
+    balances = await ledger.post(
+        db=db,
+        postings=[
+            Posting(
+                transferor_id=card.wallet_id,
+                receiver_id=claims.receiver_id,
+                value=claims.value,
+                value_type=claims.value_type,
+                text=f"پرداخت فاکتور {claims.invoice_icart_number}",
+            ),
+        ],
+    )
+    await db.commit()
+    terminal_store.mark_paid(state)
+    # ? Dynamic password is used once
+    await secret_store.discard(
+        purpose=SecretPurpose.CARD_DYNAMIC_PASSWORD,
+        subject=card.number,
+    )
+
+    # ? Send SMS message in background
+    balance = balances[card.wallet_id]
+    send_decrease_money_sms(
+        phone_number=card.wallet.user.phone_number,
+        user_card_number=card.number,
+        amount=claims.value,
+        current_money=(
+            balance.cash_balance
+            if claims.value_type == TransactionValueType.CASH
+            else balance.credit_balance
+        ),
+    )
+
+    query = urlencode(
+        {
+            "terminal_number": claims.number,
+            "invoice_number": claims.invoice_number,
+        },
+    )
+    separator = "&" if "?" in claims.redirect_url else "?"
+    return RedirectResponse(
+        url=f"{claims.redirect_url}{separator}{query}",
+        status_code=303,
+    )
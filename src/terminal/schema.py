@@ -3,7 +3,7 @@ from uuid import UUID
 from pydantic import BaseModel
 
 from src.invoice.schema import InvoiceRead
-from src.transaction.models import TransactionEnum
+from src.transaction.models import TransactionValueType
 
 
 # ---------------------------------------------------------------------------
@@ -43,4 +43,17 @@ class GenerateTerminalInput(BaseModel):
     merchant_token: str
     invoice_number: int
     value: int
-    type: TransactionEnum
+    type: TransactionValueType
+    redirect_url: str
+
+
+# ---------------------------------------------------------------------------
+class TerminalTokenInput(BaseModel):
+    terminal_token: str
+
+
+# ---------------------------------------------------------------------------
+class TerminalPayInput(TerminalTokenInput):
+    card_number: str
+    cvv2: int
+    dynamic_password: int
@@ -0,0 +1,232 @@
+import enum
+from datetime import timedelta
+from uuid import UUID
+
+from jose import JWTError, jwt
+from pydantic import BaseModel, ValidationError
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.secret_store import SecretStore, secret_store
+from src.core.security import generate_access_token
+from src.invoice.schema import InvoiceRead
+from src.terminal.exception import (
+    TerminalIsLockedException,
+    TerminalTokenIsInvalidException,
+)
+from src.transaction.models import TransactionValueType
+
+# ---------------------------------------------------------------------------
+TERMINAL_TOKEN_TYPE = "terminal"
+# ? Names of failure counters in secret store
+TERMINAL_FAILURES = "terminal"
+CARD_FAILURES = "terminal_card"
+
+
+# ---------------------------------------------------------------------------
+class TerminalStatus(enum.Enum):
+    CREATED = "CREATED"
+    PAID = "PAID"
+
+
+# ---------------------------------------------------------------------------
+class TerminalClaims(BaseModel):
+    """
+    ? Signed content of terminal token, enough to pay without any lookup
+    """
+
+    id: UUID
+    number: str
+    redirect_url: str
+    value: int
+    value_type: TransactionValueType
+    invoice_id: UUID
+    invoice_icart_number: int
+    invoice_number: str
+    merchant_id: UUID
+    receiver_id: UUID
+
+
+# ---------------------------------------------------------------------------
+class TerminalState(BaseModel):
+    claims: TerminalClaims
+    status: TerminalStatus = TerminalStatus.CREATED
+    invoice: InvoiceRead | None = None
+
+
+# ---------------------------------------------------------------------------
+class TerminalStore:
+    """
+    ! Expiring in-process state of terminals
+
+    Terminal tokens are signed and carry everything a payment needs, so any
+    worker can serve any step. The store only keeps per worker state
+    (cached invoice, paid flag) that expires with the token, the terminal
+    row is written once in the payment transaction. Failed payments are
+    counted per terminal and per card in the secret store, which all
+    workers share, so guesses are limited however they are spread.
+
+    Parameters
+    ----------
+    expire_minutes
+        Life time of terminal tokens, their state and failure counters
+    max_attempts
+        Failed payments before terminal (or card on every terminal) is locked
+    max_size
+        Maximum number of kept terminals
+    failures
+        Shared store of failure counters
+    """
+
+    def __init__(
+        self,
+        *,
+        expire_minutes: int,
+        max_attempts: int,
+        max_size: int,
+        failures: SecretStore,
+    ):
+        self.expire_delta = timedelta(minutes=expire_minutes)
+        self.max_attempts = max_attempts
+        self.failures = failures
+        self._states: TTLCache[str, TerminalState] = TTLCache(
+            ttl_seconds=self.expire_delta.total_seconds(),
+            max_size=max_size,
+        )
+
+    def issue(self, claims: TerminalClaims, invoice: InvoiceRead) -> str:
+        """
+        ! Store new terminal and sign its token
+
+        Parameters
+        ----------
+        claims
+            Terminal claims
+        invoice
+            Terminal's invoice
+
+        Returns
+        -------
+        terminal_token
+            Signed terminal token
+        """
+        self._states.set(claims.number, TerminalState(claims=claims, invoice=invoice))
+        return generate_access_token(
+            data={
+                "sub": claims.number,
+                "type": TERMINAL_TOKEN_TYPE,
+                **claims.model_dump(mode="json"),
+            },
+            expire_delta=self.expire_delta,
+        )
+
+    async def open(self, terminal_token: str) -> TerminalState:
+        """
+        ! Verify terminal token and get its state
+
+        Parameters
+        ----------
+        terminal_token
+            Signed terminal token
+
+        Returns
+        -------
+        state
+            Terminal state, created from token if this worker did not have it
+
+        Raises
+        ------
+        TerminalTokenIsInvalidException
+        TerminalIsLockedException
+        """
+        try:
+            payload = jwt.decode(
+                token=terminal_token,
+                key=settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM],
+            )
+            if payload.get("type") != TERMINAL_TOKEN_TYPE:
+                raise TerminalTokenIsInvalidException()
+            claims = TerminalClaims(**payload)
+        except (JWTError, ValidationError):
+            raise TerminalTokenIsInvalidException()
+
+        state = self._states.get(claims.number)
+        if state is None:
+            state = TerminalState(claims=claims)
+            self._states.set(claims.number, state)
+        if (
+            await self.failures.count_failures(
+                counter=TERMINAL_FAILURES,
+                subject=claims.number,
+            )
+            >= self.max_attempts
+        ):
+            raise TerminalIsLockedException()
+
+        return state
+
+    async def verify_card(self, card_number: str) -> None:
+        """
+        ! Verify card is not locked by failed payments on any terminal
+
+        Parameters
+        ----------
+        card_number
+            Number of paying card
+
+        Raises
+        ------
+        TerminalIsLockedException
+        """
+        if (
+            await self.failures.count_failures(
+                counter=CARD_FAILURES,
+                subject=card_number,
+            )
+            >= self.max_attempts
+        ):
+            raise TerminalIsLockedException()
+
+    async def mark_failed(self, state: TerminalState, card_number: str) -> None:
+        """
+        ! Count failed payment of terminal and card
+
+        Parameters
+        ----------
+        state
+            Target terminal state
+        card_number
+            Number of paying card
+        """
+        ttl_seconds = self.expire_delta.total_seconds()
+        await self.failures.add_failure(
+            counter=TERMINAL_FAILURES,
+            subject=state.claims.number,
+            ttl_seconds=ttl_seconds,
+        )
+        await self.failures.add_failure(
+            counter=CARD_FAILURES,
+            subject=card_number,
+            ttl_seconds=ttl_seconds,
+        )
+
+    def mark_paid(self, state: TerminalState) -> None:
+        """
+        ! Mark terminal as paid
+
+        Parameters
+        ----------
+        state
+            Target terminal state
+        """
+        state.status = TerminalStatus.PAID
+
+
+# ---------------------------------------------------------------------------
+terminal_store = TerminalStore(
+    expire_minutes=settings.TERMINAL_EXPIRE_MINUTES,
+    max_attempts=settings.TERMINAL_MAX_ATTEMPTS,
+    max_size=settings.TERMINAL_STORE_MAX_SIZE,
+    failures=secret_store,
+)
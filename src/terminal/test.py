@@ -9,5 +9,9 @@
 #       * User not authentication
 #       * Verify Permission
 #    ? terminal_token Api
+#   ? Pay Api
+#       * Wrong cvv2 with valid dynamic password is counted
+#       * Terminal is locked after max attempts on any worker
+#       * Card is locked after max attempts on any terminal
 
 # ! Tot Time = 30m
@@ -1,4 +1,3 @@
-from random import randint
 from typing import Type
 from uuid import UUID
 
@@ -13,6 +12,7 @@ from src.ticket.exception import (
     TicketNotFoundException,
 )
 from src.ticket.models import Ticket, TicketPosition
+from src.utils.number_allocator import ticket_number
 
 
 # ---------------------------------------------------------------------------
@@ -154,15 +154,18 @@ class TicketCRUD(BaseCRUD[Ticket, schema.TicketCreate, schema.TicketUpdate]):
         -------
         code
             generated number
+
+        Raises
+        ------
+        NumberSpaceIsFullException
         """
-        number = 0
-        while not number:
-            generate_number = randint(100000, 999999)
-            is_duplicate = await self.find_by_number(db=db, number=generate_number)
-            if not is_duplicate:
-                number = generate_number
-
-        return number
+        # ? Tickets created before the allocator use random numbers of the
+        # ? same range, allocated numbers never repeat so each is skipped once
+        while True:
+            number = await ticket_number.allocate(db=db)
+            query = select(self.model).where(self.model.number == number)
+            if not await self.exists(db=db, query=query):
+                return number
 
 
 # ---------------------------------------------------------------------------
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import UUID, Column, Enum, ForeignKey, Integer, String
+from sqlalchemy import UUID, Column, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -23,6 +23,10 @@ class TicketPosition(enum.Enum):
 # ---------------------------------------------------------------------------
 class Ticket(Base, BaseMixin):
     __tablename__ = "ticket"
+    __table_args__ = (
+        Index("ix_ticket_created_at_id", "created_at", "id"),
+        Index("ix_ticket_creator_id_created_at", "creator_id", "created_at", "id"),
+    )
 
     title = Column(String, nullable=False)
     importance = Column(Integer, default=0)
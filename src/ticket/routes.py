@@ -1,12 +1,13 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import deps
 from src.auth.exception import AccessDeniedException
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.schema import VerifyUserDep
 from src.ticket.crud import ticket as ticket_crud
@@ -29,10 +30,12 @@ router = APIRouter(prefix="/ticket", tags=["ticket"])
 @router.get("/my", response_model=List[TicketRead])
 async def read_my_tickets(
     *,
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 5,
+    cursor: str | None = None,
 ) -> List[TicketRead]:
     """
     ! Get All my tickets
@@ -47,6 +50,8 @@ async def read_my_tickets(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
@@ -54,7 +59,14 @@ async def read_my_tickets(
         All my ticket list
     """
     query = select(Ticket).where(Ticket.creator_id == current_user.id)
-    my_tickets = await ticket_crud.get_multi(db=db, skip=skip, limit=limit, query=query)
+    page = await ticket_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        query=query,
+        cursor=cursor,
+    )
+    my_tickets = set_page_headers(response=response, page=page)
     return my_tickets
 
 
@@ -62,12 +74,14 @@ async def read_my_tickets(
 @router.get("/list", response_model=List[TicketRead])
 async def read_tickets(
     *,
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_TICKET]),
     ),
     skip: int = 0,
     limit: int = 5,
+    cursor: str | None = None,
 ) -> List[TicketRead]:
     """
     ! Get All tickets
@@ -82,13 +96,21 @@ async def read_tickets(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     my_tickets
         All ticket list
     """
-    my_tickets = await ticket_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await ticket_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    my_tickets = set_page_headers(response=response, page=page)
     return my_tickets
 
 
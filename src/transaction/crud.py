@@ -1,16 +1,29 @@
-from typing import Type
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Type
 from uuid import UUID
+from zoneinfo import ZoneInfo
 
+from sqlalchemy import and_, delete, func, literal, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import settings
 from src.database.base_crud import BaseCRUD
 from src.transaction.exception import TransactionNotFoundException
-from src.transaction.models import Transaction
-from src.transaction.schema import TransactionCreate
+from src.transaction.models import (
+    RollupPeriod,
+    Transaction,
+    TransactionRollup,
+    TransactionValueType,
+)
+from src.transaction.schema import StatementItem, TransactionCreate
 
 
 # ---------------------------------------------------------------------------
 class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, None]):
+    estimate_count = True
+
     async def verify_existence(
         self,
         *,
@@ -45,3 +58,285 @@ class TransactionCRUD(BaseCRUD[Transaction, TransactionCreate, None]):
 
 # ---------------------------------------------------------------------------
 transaction = TransactionCRUD(Transaction)
+
+
+# ---------------------------------------------------------------------------
+def period_start(moment: datetime, period: RollupPeriod) -> datetime:
+    """
+    ! Start of the rollup period that contains moment
+
+    Parameters
+    ----------
+    moment
+        Aware datetime
+    period
+        Rollup period
+
+    Returns
+    -------
+    start
+        Start of period in rollup timezone
+    """
+    local = moment.astimezone(ZoneInfo(settings.ROLLUP_TIMEZONE))
+    start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == RollupPeriod.MONTH:
+        start = start.replace(day=1)
+    return start
+
+
+# ---------------------------------------------------------------------------
+def next_month(start: datetime) -> datetime:
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+# ---------------------------------------------------------------------------
+class TransactionRollupCRUD(BaseCRUD[TransactionRollup, None, None]):
+    async def add_transactions(
+        self,
+        *,
+        db: AsyncSession,
+        rows: list[dict[str, Any]],
+        created_at: datetime,
+    ) -> None:
+        """
+        ! Add new transactions to daily & monthly rollups
+
+        Buckets of the batch are summed in python and upserted with one
+        statement, rows are sorted so buckets are locked in the same order.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        rows
+            Values of inserted transactions
+        created_at
+            Creation time of all transactions
+        """
+        buckets: dict[tuple, list] = defaultdict(lambda: [0.0, 0, 0.0, 0])
+        starts = {period: period_start(created_at, period) for period in RollupPeriod}
+        for row in rows:
+            for period, start in starts.items():
+                receiver = buckets[
+                    (row["receiver_id"], period, start, row["value_type"])
+                ]
+                receiver[0] += row["value"]
+                receiver[1] += 1
+                transferor = buckets[
+                    (row["transferor_id"], period, start, row["value_type"])
+                ]
+                transferor[2] += row["value"]
+                transferor[3] += 1
+        if not buckets:
+            return
+
+        values = [
+            {
+                "wallet_id": wallet_id,
+                "period": period,
+                "period_start": start,
+                "value_type": value_type,
+                "in_total": in_total,
+                "in_count": in_count,
+                "out_total": out_total,
+                "out_count": out_count,
+            }
+            for (wallet_id, period, start, value_type), (
+                in_total,
+                in_count,
+                out_total,
+                out_count,
+            ) in sorted(
+                buckets.items(),
+                key=lambda item: (str(item[0][0]), item[0][1].value, item[0][3].value),
+            )
+        ]
+        query = insert(self.model).values(values)
+        await db.execute(
+            query.on_conflict_do_update(
+                constraint="uq_transaction_rollup_bucket",
+                set_={
+                    "in_total": self.model.in_total + query.excluded.in_total,
+                    "in_count": self.model.in_count + query.excluded.in_count,
+                    "out_total": self.model.out_total + query.excluded.out_total,
+                    "out_count": self.model.out_count + query.excluded.out_count,
+                    "updated_at": func.now(),
+                },
+            ),
+        )
+
+    async def rebuild(self, *, db: AsyncSession, wallet_id: UUID | None = None) -> None:
+        """
+        ! Rebuild rollups from transaction table
+
+        Used after changing rollup timezone or fixing transactions by hand,
+        nothing is committed.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        wallet_id
+            Rebuild rollups of this wallet only, all wallets if not passed
+        """
+        delete_query = delete(self.model)
+        if wallet_id:
+            delete_query = delete_query.where(self.model.wallet_id == wallet_id)
+        await db.execute(delete_query)
+
+        entries = union_all(
+            select(
+                Transaction.receiver_id.label("wallet_id"),
+                Transaction.value_type.label("value_type"),
+                Transaction.created_at.label("created_at"),
+                Transaction.value.label("in_value"),
+                literal(1).label("in_count"),
+                literal(0.0).label("out_value"),
+                literal(0).label("out_count"),
+            ),
+            select(
+                Transaction.transferor_id,
+                Transaction.value_type,
+                Transaction.created_at,
+                literal(0.0),
+                literal(0),
+                Transaction.value,
+                literal(1),
+            ),
+        ).subquery("entry")
+        for period in RollupPeriod:
+            start = func.date_trunc(
+                period.value.lower(),
+                entries.c.created_at,
+                settings.ROLLUP_TIMEZONE,
+            )
+            query = select(
+                func.gen_random_uuid(),
+                entries.c.wallet_id,
+                literal(period, self.model.period.type),
+                start,
+                entries.c.value_type,
+                func.sum(entries.c.in_value),
+                func.sum(entries.c.in_count),
+                func.sum(entries.c.out_value),
+                func.sum(entries.c.out_count),
+            ).group_by(entries.c.wallet_id, start, entries.c.value_type)
+            if wallet_id:
+                query = query.where(entries.c.wallet_id == wallet_id)
+            await db.execute(
+                insert(self.model).from_select(
+                    [
+                        "id",
+                        "wallet_id",
+                        "period",
+                        "period_start",
+                        "value_type",
+                        "in_total",
+                        "in_count",
+                        "out_total",
+                        "out_count",
+                    ],
+                    query,
+                ),
+            )
+
+    async def statement(
+        self,
+        *,
+        db: AsyncSession,
+        wallet_id: UUID,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> list[StatementItem]:
+        """
+        ! Totals of wallet's transactions in [start_time, end_time)
+
+        Whole months are read from monthly rollups, the other whole days from
+        daily rollups and only the trailing partial day from transactions,
+        all in one query.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        wallet_id
+            Target wallet's id
+        start_time
+            Start of statement, must be start of a day
+        end_time
+            End of statement
+
+        Returns
+        -------
+        items
+            Totals of every value type
+        """
+        end_day = max(period_start(end_time, RollupPeriod.DAY), start_time)
+        first_month = period_start(start_time, RollupPeriod.MONTH)
+        if first_month < start_time:
+            first_month = next_month(first_month)
+        last_month = max(period_start(end_day, RollupPeriod.MONTH), first_month)
+
+        rollup = self.model
+        rollup_query = select(
+            rollup.value_type,
+            rollup.in_total,
+            rollup.in_count,
+            rollup.out_total,
+            rollup.out_count,
+        ).where(
+            rollup.wallet_id == wallet_id,
+            or_(
+                and_(
+                    rollup.period == RollupPeriod.MONTH,
+                    rollup.period_start >= first_month,
+                    rollup.period_start < last_month,
+                ),
+                and_(
+                    rollup.period == RollupPeriod.DAY,
+                    rollup.period_start >= start_time,
+                    rollup.period_start < end_day,
+                    or_(
+                        rollup.period_start < first_month,
+                        rollup.period_start >= last_month,
+                    ),
+                ),
+            ),
+        )
+        is_in = Transaction.receiver_id == wallet_id
+        is_out = Transaction.transferor_id == wallet_id
+        raw_query = (
+            select(
+                Transaction.value_type,
+                func.coalesce(func.sum(Transaction.value).filter(is_in), 0.0),
+                func.count().filter(is_in),
+                func.coalesce(func.sum(Transaction.value).filter(is_out), 0.0),
+                func.count().filter(is_out),
+            )
+            .where(
+                or_(is_in, is_out),
+                Transaction.created_at >= end_day,
+                Transaction.created_at < end_time,
+            )
+            .group_by(Transaction.value_type)
+        )
+        response = await db.execute(union_all(rollup_query, raw_query))
+
+        items = {
+            value_type: StatementItem(value_type=value_type)
+            for value_type in TransactionValueType
+        }
+        for value_type, in_total, in_count, out_total, out_count in response.all():
+            item = items[value_type]
+            item.in_total += in_total
+            item.in_count += in_count
+            item.out_total += out_total
+            item.out_count += out_count
+
+        return list(items.values())
+
+
+# ---------------------------------------------------------------------------
+transaction_rollup = TransactionRollupCRUD(TransactionRollup)
@@ -0,0 +1,209 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import Boolean, Integer, and_, column, func, insert, or_, select, update
+from sqlalchemy import values as sql_values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.transaction.crud import transaction_rollup as transaction_rollup_crud
+from src.transaction.models import Transaction, TransactionValueType
+from src.wallet.exception import (
+    LackOfCreditException,
+    LackOfMoneyException,
+    WalletNotFoundException,
+)
+from src.wallet.models import Wallet
+
+# ---------------------------------------------------------------------------
+# ? Wallet of the system, counterparty of money that enters or leaves icart
+SYSTEM_WALLET_NUMBER = "0" * 16
+
+
+# ---------------------------------------------------------------------------
+class Posting(NamedTuple):
+    transferor_id: UUID
+    receiver_id: UUID
+    value: float
+    value_type: TransactionValueType
+    text: str
+
+
+# ---------------------------------------------------------------------------
+class WalletBalance(NamedTuple):
+    cash_balance: int
+    credit_balance: int
+
+
+# ---------------------------------------------------------------------------
+class Ledger:
+    """
+    ! Double entry ledger of wallets
+
+    Every posting moves value from transferor to receiver and is stored as one
+    transaction row. Balances are never read into python: deltas of a batch
+    are summed per wallet and applied by one ``UPDATE ... RETURNING`` that
+    checks the balances in its where clause, so concurrent postings on the
+    same wallet are serialized by postgres row locks for one statement only.
+    The system wallet is the only wallet that may go negative.
+    """
+
+    def __init__(self):
+        self._system_wallet_id: UUID | None = None
+
+    async def system_wallet_id(self, db: AsyncSession) -> UUID:
+        """
+        ! Get id of system wallet
+
+        Parameters
+        ----------
+        db
+            Target database connection
+
+        Returns
+        -------
+        wallet_id
+            System wallet's id
+
+        Raises
+        ------
+        WalletNotFoundException
+        """
+        if self._system_wallet_id is None:
+            response = await db.execute(
+                select(Wallet.id).where(Wallet.number == SYSTEM_WALLET_NUMBER),
+            )
+            wallet_id = response.scalar_one_or_none()
+            if not wallet_id:
+                raise WalletNotFoundException()
+            self._system_wallet_id = wallet_id
+
+        return self._system_wallet_id
+
+    @staticmethod
+    def _deltas(postings: list[Posting]) -> dict[UUID, list[int]]:
+        deltas: dict[UUID, list[int]] = defaultdict(lambda: [0, 0])
+        for posting in postings:
+            amount = round(posting.value)
+            index = 0 if posting.value_type == TransactionValueType.CASH else 1
+            deltas[posting.transferor_id][index] -= amount
+            deltas[posting.receiver_id][index] += amount
+        return deltas
+
+    async def _raise_rejected(
+        self,
+        *,
+        db: AsyncSession,
+        deltas: dict[UUID, list[int]],
+        rejected: set[UUID],
+    ) -> None:
+        response = await db.execute(select(Wallet.id).where(Wallet.id.in_(rejected)))
+        if len(response.scalars().all()) != len(rejected):
+            raise WalletNotFoundException()
+        if any(deltas[wallet_id][0] < 0 for wallet_id in rejected):
+            raise LackOfMoneyException()
+        raise LackOfCreditException()
+
+    async def post(
+        self,
+        *,
+        db: AsyncSession,
+        postings: list[Posting],
+    ) -> dict[UUID, WalletBalance]:
+        """
+        ! Post transactions and update wallet balances
+
+        Balances of the whole batch are updated with one statement,
+        transactions are inserted with another one and daily & monthly
+        rollups are upserted with a third one, nothing is committed.
+        If any wallet is rejected the batch is partially applied, so the
+        caller must not commit and its session is rolled back on close.
+
+        Parameters
+        ----------
+        db
+            Target database connection
+        postings
+            Postings of batch
+
+        Returns
+        -------
+        balances
+            New balance of every touched wallet
+
+        Raises
+        ------
+        WalletNotFoundException
+        LackOfMoneyException
+        LackOfCreditException
+        """
+        if not postings:
+            return {}
+
+        system_wallet_id = await self.system_wallet_id(db=db)
+        deltas = self._deltas(postings)
+
+        # ? Sorted rows lock wallets in the same order on every worker
+        delta_table = sql_values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("cash_delta", Integer),
+            column("credit_delta", Integer),
+            column("guarded", Boolean),
+            name="delta",
+        ).data(
+            [
+                (wallet_id, cash_delta, credit_delta, wallet_id != system_wallet_id)
+                for wallet_id, (cash_delta, credit_delta) in sorted(deltas.items())
+            ],
+        )
+        locked = (
+            select(Wallet.id)
+            .where(Wallet.id.in_(deltas.keys()))
+            .order_by(Wallet.id)
+            .with_for_update()
+            .cte("locked")
+            .prefix_with("MATERIALIZED")
+        )
+        new_cash = func.coalesce(Wallet.cash_balance, 0) + delta_table.c.cash_delta
+        new_credit = (
+            func.coalesce(Wallet.credit_balance, 0) + delta_table.c.credit_delta
+        )
+        response = await db.execute(
+            update(Wallet)
+            .where(
+                Wallet.id == locked.c.id,
+                Wallet.id == delta_table.c.id,
+                or_(
+                    delta_table.c.guarded.is_(False),
+                    and_(new_cash >= 0, new_credit >= 0),
+                ),
+            )
+            .values(cash_balance=new_cash, credit_balance=new_credit)
+            .returning(Wallet.id, Wallet.cash_balance, Wallet.credit_balance)
+            .execution_options(synchronize_session=False),
+        )
+        balances = {
+            wallet_id: WalletBalance(cash_balance, credit_balance)
+            for wallet_id, cash_balance, credit_balance in response.all()
+        }
+
+        rejected = set(deltas.keys()) - set(balances.keys())
+        if rejected:
+            await self._raise_rejected(db=db, deltas=deltas, rejected=rejected)
+
+        # ? Rollups and transactions share the same creation time
+        created_at = datetime.now(tz=timezone.utc)
+        rows = [{**posting._asdict(), "created_at": created_at} for posting in postings]
+        await db.execute(insert(Transaction).values(rows))
+        await transaction_rollup_crud.add_transactions(
+            db=db,
+            rows=rows,
+            created_at=created_at,
+        )
+        return balances
+
+
+# ---------------------------------------------------------------------------
+ledger = Ledger()
@@ -1,6 +1,17 @@
 import enum
 
-from sqlalchemy import UUID, Column, Enum, Float, ForeignKey, String
+from sqlalchemy import (
+    UUID,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -11,9 +22,31 @@ class TransactionValueType(enum.Enum):
     CREDIT = "CREDIT"
 
 
+# ---------------------------------------------------------------------------
+class RollupPeriod(enum.Enum):
+    DAY = "DAY"
+    MONTH = "MONTH"
+
+
 # ---------------------------------------------------------------------------
 class Transaction(Base, BaseMixin):
     __tablename__ = "transaction"
+    __table_args__ = (
+        Index("ix_transaction_created_at_id", "created_at", "id"),
+        # ? Wallet statements & transaction list of wallet owner
+        Index(
+            "ix_transaction_receiver_id_created_at",
+            "receiver_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_transaction_transferor_id_created_at",
+            "transferor_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     value = Column(Float, nullable=False)
     text = Column(String, nullable=False)
@@ -25,3 +58,34 @@ class Transaction(Base, BaseMixin):
 
     transferor_id = Column(UUID(as_uuid=True), ForeignKey("wallet.id"), nullable=False)
     transferor = relationship("Wallet", foreign_keys=[transferor_id], lazy="selectin")
+
+
+# ---------------------------------------------------------------------------
+class TransactionRollup(Base, BaseMixin):
+    __tablename__ = "transaction_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "wallet_id",
+            "period",
+            "period_start",
+            "value_type",
+            name="uq_transaction_rollup_bucket",
+        ),
+        Index("ix_transaction_rollup_created_at_id", "created_at", "id"),
+    )
+
+    period = Column(Enum(RollupPeriod), nullable=False)
+    period_start = Column(DateTime(timezone=True), nullable=False)
+    value_type = Column(Enum(TransactionValueType), nullable=False)
+
+    in_total = Column(Float, nullable=False, default=0)
+    in_count = Column(Integer, nullable=False, default=0)
+    out_total = Column(Float, nullable=False, default=0)
+    out_count = Column(Integer, nullable=False, default=0)
+
+    # ! Relations
+    wallet_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("wallet.id", ondelete="CASCADE"),
+        nullable=False,
+    )
@@ -1,52 +1,50 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import Select
 
 from src import deps
 from src.auth.exception import AccessDeniedException
+from src.core.config import settings
+from src.database.export import ExportFormat, export_response
+from src.database.loading import COLUMNS_ONLY
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.schema import IDRequest, VerifyUserDep
 from src.transaction.crud import transaction as transaction_crud
+from src.transaction.crud import transaction_rollup as transaction_rollup_crud
 from src.transaction.models import Transaction
-from src.transaction.schema import TransactionFilter, TransactionRead
+from src.transaction.schema import (
+    StatementRequest,
+    TransactionFilter,
+    TransactionRead,
+    TransactionStatement,
+)
+from src.user.models import User
+from src.wallet.exception import WalletNotFoundException
 
 # ---------------------------------------------------------------------------
 router = APIRouter(prefix="/transaction", tags=["transaction"])
 
 
 # ---------------------------------------------------------------------------
-@router.post("/list", response_model=list[TransactionRead])
-async def read_transaction_list(
-    *,
-    db: AsyncSession = Depends(deps.get_db),
-    verify_data: VerifyUserDep = Depends(
-        deps.is_user_have_permission([permission.VIEW_TRANSACTION]),
-    ),
-    filter_data: TransactionFilter,
-    skip: int = 0,
-    limit: int = 10,
-) -> list[TransactionRead]:
+def _filter_query(filter_data: TransactionFilter) -> Select:
     """
-    ! Read transactions list
+    ! Transactions query of filter
 
     Parameters
     ----------
-    db
-        Target database connection
-    verify_data
-        user's verified data
-    skip
-        Pagination skip
-    limit
-        Pagination limit
     filter_data
         Filter data
 
     Returns
     -------
-    transaction_list
-        List of transaction
-
+    query
+        Filtered query
     """
     # * Prepare filter fields
     filter_data.gt_value = (
@@ -88,29 +86,118 @@ async def read_transaction_list(
         ),
     )
 
+    return query
+
+
+# ---------------------------------------------------------------------------
+@router.post("/list", response_model=list[TransactionRead])
+async def read_transaction_list(
+    *,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_db),
+    verify_data: VerifyUserDep = Depends(
+        deps.is_user_have_permission([permission.VIEW_TRANSACTION]),
+    ),
+    filter_data: TransactionFilter,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> list[TransactionRead]:
+    """
+    ! Read transactions list
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    verify_data
+        user's verified data
+    skip
+        Pagination skip
+    limit
+        Pagination limit
+    cursor
+        Pagination cursor of previous page
+    filter_data
+        Filter data
+
+    Returns
+    -------
+    transaction_list
+        List of transaction
+
+    """
+    query = _filter_query(filter_data)
+
     # * Have permissions
     if verify_data.is_valid:
-        transaction_list = await transaction_crud.get_multi(
+        page = await transaction_crud.get_multi_with_total(
             db=db,
             skip=skip,
             limit=limit,
             query=query,
+            options=COLUMNS_ONLY,
+            cursor=cursor,
         )
+        transaction_list = set_page_headers(response=response, page=page)
     # * Verify transaction receiver & transferor
     else:
         q1 = Transaction.receiver_id == verify_data.user.wallet.id
         q2 = Transaction.transferor_id == verify_data.user.wallet.id
         query = query.where(or_(q1, q2))
-        transaction_list = await transaction_crud.get_multi(
+        page = await transaction_crud.get_multi_with_total(
             db=db,
             skip=skip,
             limit=limit,
             query=query,
+            options=COLUMNS_ONLY,
+            cursor=cursor,
         )
+        transaction_list = set_page_headers(response=response, page=page)
 
     return transaction_list
 
 
+# ---------------------------------------------------------------------------
+@router.post("/export", response_class=StreamingResponse)
+async def export_transaction_list(
+    *,
+    current_user: User = Depends(
+        deps.get_current_user_with_permissions([permission.VIEW_TRANSACTION]),
+    ),
+    filter_data: TransactionFilter,
+    export_format: ExportFormat = ExportFormat.CSV,
+) -> StreamingResponse:
+    """
+    ! Export all filtered transactions
+
+    Parameters
+    ----------
+    current_user
+        Requester User
+    filter_data
+        Filter data
+    export_format
+        Format of file
+
+    Returns
+    -------
+    response
+        Streamed file of transactions
+
+    Raises
+    ------
+    ServerIsBusyException
+    """
+    return export_response(
+        crud=transaction_crud,
+        schema=TransactionRead,
+        filename="transactions",
+        export_format=export_format,
+        query=_filter_query(filter_data),
+    )
+
+
 # ---------------------------------------------------------------------------
 @router.post("/find", response_model=TransactionRead)
 async def find_transaction_by_id(
@@ -160,3 +247,64 @@ async def find_transaction_by_id(
             return transaction
         else:
             raise AccessDeniedException()
+
+
+# ---------------------------------------------------------------------------
+@router.post("/statement", response_model=TransactionStatement)
+async def read_transaction_statement(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    verify_data: VerifyUserDep = Depends(
+        deps.is_user_have_permission([permission.VIEW_TRANSACTION]),
+    ),
+    input_data: StatementRequest,
+) -> TransactionStatement:
+    """
+    ! Read wallet statement
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    verify_data
+        user's verified data
+    input_data
+        Target wallet and time range, user's wallet is used by default
+
+    Returns
+    -------
+    statement
+        Totals of wallet's transactions
+
+    Raises
+    ------
+    AccessDeniedException
+    WalletNotFoundException
+    """
+    own_wallet_id = verify_data.user.wallet.id if verify_data.user.wallet else None
+    wallet_id = input_data.wallet_id or own_wallet_id
+    if not wallet_id:
+        raise WalletNotFoundException()
+    # * Verify wallet owner
+    if not verify_data.is_valid and wallet_id != own_wallet_id:
+        raise AccessDeniedException()
+
+    rollup_timezone = ZoneInfo(settings.ROLLUP_TIMEZONE)
+    start_time = datetime.combine(input_data.start_date, time(), tzinfo=rollup_timezone)
+    end_time = input_data.end_time or datetime.now(tz=timezone.utc)
+    # ? Naive times are local times of rollups, like start_date
+    if end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=rollup_timezone)
+    items = await transaction_rollup_crud.statement(
+        db=db,
+        wallet_id=wallet_id,
+        start_time=start_time,
+        end_time=max(end_time, start_time),
+    )
+
+    return TransactionStatement(
+        wallet_id=wallet_id,
+        start_time=start_time,
+        end_time=end_time,
+        items=items,
+    )
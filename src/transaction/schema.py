@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -37,3 +37,27 @@ class TransactionFilter(BaseModel):
     value_type: TransactionValueType | None = None
     gt_created_date: datetime | None = None
     lt_created_date: datetime | None = None
+
+
+# ---------------------------------------------------------------------------
+class StatementRequest(BaseModel):
+    wallet_id: UUID | None = None
+    start_date: date
+    end_time: datetime | None = None
+
+
+# ---------------------------------------------------------------------------
+class StatementItem(BaseModel):
+    value_type: TransactionValueType
+    in_total: float = 0
+    in_count: int = 0
+    out_total: float = 0
+    out_count: int = 0
+
+
+# ---------------------------------------------------------------------------
+class TransactionStatement(BaseModel):
+    wallet_id: UUID
+    start_time: datetime
+    end_time: datetime
+    items: list[StatementItem]
@@ -3,19 +3,47 @@ from uuid import UUID
 
 from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 
 from src.database.base_crud import BaseCRUD
+from src.database.loading import LoadProfile
+from src.role.models import Role
 from src.user.exception import (
     NationalCodeIsDuplicatedException,
     UsernameIsDuplicatedException,
     UserNotFoundException,
 )
 from src.user.models import User
+from src.wallet.models import Wallet
+
+
+# ---------------------------------------------------------------------------
+def auth_load_profile() -> LoadProfile:
+    """
+    ! Role with its permissions and wallet, used by auth dependencies
+
+    Built on call, mappers are not configured while models are imported
+
+    Returns
+    -------
+    options
+        Loading profile of user
+    """
+    return (
+        selectinload(User.role).selectinload(Role.permissions),
+        selectinload(User.wallet).raiseload(Wallet.user),
+        raiseload("*"),
+    )
 
 
 # ---------------------------------------------------------------------------
 class UserCRUD(BaseCRUD[User, None, None]):
-    async def find_by_username(self, db: AsyncSession, username: str) -> User | None:
+    async def find_by_username(
+        self,
+        db: AsyncSession,
+        username: str,
+        options: LoadProfile | None = None,
+    ) -> User | None:
         """
         ! Find user with username
 
@@ -25,15 +53,18 @@ class UserCRUD(BaseCRUD[User, None, None]):
             Target database connection
         username
             Target username
+        options
+            Loading profile of relations
 
         Returns
         -------
         obj
             Found user or None
         """
-        response = await db.execute(
-            select(self.model).where(self.model.username == username),
-        )
+        query = select(self.model).where(self.model.username == username)
+        if options:
+            query = query.options(*options)
+        response = await db.execute(query)
         obj = response.scalar_one_or_none()
 
         return obj
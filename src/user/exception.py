@@ -63,3 +63,18 @@ class NationalCodeIsDuplicatedException(HTTPException):
             "persian_message": "کد ملی تکراری است!",
         }
         self.headers = None
+
+
+class ProfileImageNotFoundException(HTTPException):
+    """
+    ? Exception When User Has No Profile Image
+    """
+
+    def __init__(self):
+        self.status_code = 400
+        self.detail = {
+            "code": 104,
+            "english_message": "Profile image not found!",
+            "persian_message": "تصویر پروفایل پیدا نشد!",
+        }
+        self.headers = None
@@ -0,0 +1,202 @@
+import asyncio
+import enum
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from uuid import UUID
+
+from src.core.config import settings
+from src.exception import FileTypeIsNotAllowedException, ServerIsBusyException
+
+# ---------------------------------------------------------------------------
+# ? Keys contain the version, so stored variants never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# ---------------------------------------------------------------------------
+class ProfileImageSize(enum.Enum):
+    SMALL = "small"
+    MEDIUM = "medium"
+    LARGE = "large"
+
+
+# ? Edge of square variants in pixels
+PROFILE_IMAGE_PIXELS = {
+    ProfileImageSize.SMALL: 64,
+    ProfileImageSize.MEDIUM: 256,
+    ProfileImageSize.LARGE: 1024,
+}
+
+
+# ---------------------------------------------------------------------------
+def profile_image_key(user_id: UUID, version_id: str, size: ProfileImageSize) -> str:
+    """
+    ! Object name of profile image variant
+
+    Parameters
+    ----------
+    user_id
+        Owner of image
+    version_id
+        Version of image, new on every upload
+    size
+        Target variant
+
+    Returns
+    -------
+    key
+        Object name in profile image bucket
+    """
+    return f"{user_id.hex}/{version_id}/{size.value}.jpg"
+
+
+# ---------------------------------------------------------------------------
+def render_profile_image(
+    data: bytes,
+    sizes: dict[str, int],
+    max_pixels: int,
+) -> dict[str, bytes]:
+    """
+    ! Decode image and encode its square JPEG variants
+
+    Runs in a worker process. Orientation is applied and all metadata
+    (EXIF, GPS, ICC ...) is dropped, as variants are saved without it.
+
+    Parameters
+    ----------
+    data
+        Uploaded file
+    sizes
+        Edge of every variant by name
+    max_pixels
+        Images with more pixels are rejected before they are decoded
+
+    Returns
+    -------
+    variants
+        Encoded variants by name
+
+    Raises
+    ------
+    ValueError
+        File is not a valid image
+    """
+    # ? Imported in worker processes only, api workers never load pillow
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > max_pixels:
+                raise ValueError("Image has too many pixels")
+            # ? JPEGs are decoded at a reduced scale when it is enough
+            largest = max(sizes.values())
+            source.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(source).convert("RGB")
+    except (OSError, SyntaxError, Image.DecompressionBombError) as error:
+        raise ValueError(f"Invalid image: {error}") from None
+
+    variants = {}
+    for name, edge in sizes.items():
+        variant = ImageOps.fit(image, (edge, edge), method=Image.LANCZOS)
+        buffer = io.BytesIO()
+        variant.save(buffer, format="JPEG", quality=85, optimize=True, progressive=True)
+        variants[name] = buffer.getvalue()
+    return variants
+
+
+# ---------------------------------------------------------------------------
+class ProfileImageProcessor:
+    """
+    ! Profile image rendering off the event loop
+
+    Decoding & resizing is CPU bound and holds the GIL, so it runs in a
+    small process pool. Workers are spawned (not forked from the running
+    loop) and replaced after some tasks to bound their memory. At most
+    max_pending images are accepted at once, the others fail fast.
+
+    Parameters
+    ----------
+    workers
+        Number of worker processes
+    max_pending
+        Maximum number of running & waiting images
+    max_pixels
+        Images with more pixels are rejected
+    """
+
+    def __init__(self, workers: int, max_pending: int, max_pixels: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_pixels = max_pixels
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=100,
+            )
+        return self._executor
+
+    async def render(self, data: bytes) -> dict[ProfileImageSize, bytes]:
+        """
+        ! Render all variants of uploaded image
+
+        Parameters
+        ----------
+        data
+            Uploaded file
+
+        Returns
+        -------
+        variants
+            JPEG of every size
+
+        Raises
+        ------
+        ServerIsBusyException
+        FileTypeIsNotAllowedException
+        """
+        if self.pending >= self.max_pending:
+            raise ServerIsBusyException()
+        executor = self._get_executor()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            variants = await loop.run_in_executor(
+                executor,
+                render_profile_image,
+                data,
+                {size.value: edge for size, edge in PROFILE_IMAGE_PIXELS.items()},
+                self.max_pixels,
+            )
+        except ValueError:
+            raise FileTypeIsNotAllowedException()
+        except BrokenProcessPool:
+            # ? A worker died (e.g. out of memory), start a new pool next time
+            self.shutdown()
+            raise ServerIsBusyException()
+        finally:
+            self.pending -= 1
+
+        return {ProfileImageSize(name): variant for name, variant in variants.items()}
+
+    def shutdown(self) -> None:
+        """
+        ! Stop worker processes
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# ---------------------------------------------------------------------------
+profile_image_processor = ProfileImageProcessor(
+    workers=settings.PROFILE_IMAGE_WORKERS,
+    max_pending=settings.PROFILE_IMAGE_MAX_PENDING,
+    max_pixels=settings.PROFILE_IMAGE_MAX_PIXELS,
+)
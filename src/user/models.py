@@ -2,9 +2,7 @@ from sqlalchemy import (
     UUID,
     Boolean,
     Column,
-    DateTime,
     ForeignKey,
-    Integer,
     String,
 )
 from sqlalchemy.orm import relationship
@@ -30,8 +28,6 @@ class User(Base, BaseMixin):
     subscribe_newsletter = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     is_valid = Column(Boolean, default=False)
-    one_time_password = Column(Integer, index=True, nullable=True)
-    expiration_password_at = Column(DateTime(timezone=True), nullable=True)
     phone_number = Column(String, unique=False)
 
     # ! Relations
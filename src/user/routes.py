@@ -1,8 +1,25 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import io
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select, update
 
 from src import deps
+from src.core.config import settings
+from src.schema import UserPrincipal
+from src.user.exception import ProfileImageNotFoundException
+from src.user.image import (
+    IMMUTABLE_CACHE_CONTROL,
+    ProfileImageSize,
+    profile_image_key,
+    profile_image_processor,
+)
 from src.user.models import User
-from src.user.schema import UserReadWithRole
+from src.user.schema import ProfileImageRead, UserReadWithRole
+from src.utils.minio_client import minio_client
+from src.utils.upload import IMAGE_TYPES, read_upload
 
 # ---------------------------------------------------------------------------
 router = APIRouter(prefix="/user", tags=["user"])
@@ -27,3 +44,132 @@ async def current_user(current_user: User = Depends(deps.get_current_user())) ->
     """
     user = current_user
     return user
+
+
+# ---------------------------------------------------------------------------
+@router.put("/profile_image", response_model=ProfileImageRead)
+async def upload_profile_image(
+    *,
+    request: Request,
+    db=Depends(deps.get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user()),
+) -> ProfileImageRead:
+    """
+    ! Upload My Profile Image
+
+    Request body is the raw image (png or jpeg). Square JPEG variants are
+    rendered without metadata and stored under a new version.
+
+    Parameters
+    ----------
+    request
+        Request with image as body
+    db
+        Target database connection
+    current_user
+        Requester User
+
+    Returns
+    -------
+    image
+        Version & presigned urls of variants
+
+    Raises
+    ------
+    FileIsTooLargeException
+    FileTypeIsNotAllowedException
+    ServerIsBusyException
+    """
+    data, _ = await read_upload(
+        request=request,
+        max_bytes=settings.PROFILE_IMAGE_MAX_BYTES,
+        allowed_types=IMAGE_TYPES,
+    )
+    variants = await profile_image_processor.render(data)
+
+    version_id = uuid4().hex
+    keys = {
+        size: profile_image_key(current_user.id, version_id, size) for size in variants
+    }
+    await asyncio.gather(
+        *(
+            minio_client.put_object(
+                bucket_name=settings.MINIO_PROFILE_IMAGE_BUCKET,
+                file_data=io.BytesIO(variant),
+                file_name=keys[size],
+                content_type="image/jpeg",
+                metadata={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+            )
+            for size, variant in variants.items()
+        ),
+    )
+
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(image_version_id=version_id),
+    )
+    await db.commit()
+
+    urls = {
+        size: await minio_client.presigned_get_object(
+            bucket_name=settings.MINIO_PROFILE_IMAGE_BUCKET,
+            object_name=key,
+        )
+        for size, key in keys.items()
+    }
+    return ProfileImageRead(version_id=version_id, urls=urls)
+
+
+# ---------------------------------------------------------------------------
+@router.get("/profile_image/{user_id}", response_class=RedirectResponse)
+async def read_profile_image(
+    *,
+    db=Depends(deps.get_db),
+    current_user: UserPrincipal = Depends(deps.get_current_user()),
+    user_id: UUID,
+    size: ProfileImageSize = ProfileImageSize.SMALL,
+) -> RedirectResponse:
+    """
+    ! Redirect To User's Profile Image
+
+    Parameters
+    ----------
+    db
+        Target database connection
+    current_user
+        Requester User
+    user_id
+        Owner of image
+    size
+        Target variant
+
+    Returns
+    -------
+    response
+        Redirect to presigned url of variant, cacheable while url is reused
+
+    Raises
+    ------
+    ProfileImageNotFoundException
+    """
+    response = await db.execute(
+        select(User.image_version_id).where(User.id == user_id),
+    )
+    version_id = response.scalar_one_or_none()
+    if not version_id:
+        raise ProfileImageNotFoundException()
+
+    url = await minio_client.presigned_get_object(
+        bucket_name=settings.MINIO_PROFILE_IMAGE_BUCKET,
+        object_name=profile_image_key(user_id, version_id, size),
+    )
+    return RedirectResponse(
+        url=url,
+        status_code=307,
+        headers={
+            "Cache-Control": (
+                f"private, max-age={settings.MINIO_PRESIGNED_CACHE_SECONDS}"
+            ),
+        },
+    )
@@ -4,6 +4,7 @@ from uuid import UUID
 from pydantic import BaseModel
 
 from src.role.schema import RoleRead
+from src.user.image import ProfileImageSize
 
 
 # ---------------------------------------------------------------------------
@@ -32,3 +33,9 @@ class UserReadWithRole(UserRead):
 
     created_at: datetime
     updated_at: datetime | None
+
+
+# ---------------------------------------------------------------------------
+class ProfileImageRead(BaseModel):
+    version_id: str
+    urls: dict[ProfileImageSize, str]
@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import select
 
 from src import deps
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.schema import IDRequest
 from src.user.models import User
@@ -56,12 +57,14 @@ async def get_user_crypto(
 @router.get(path="/list", response_model=List[UserCryptoRead])
 async def get_user_crypto_list(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_USER_CRYPTO]),
     ),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[UserCryptoRead]:
     """
     ! Get All UserCrypto
@@ -76,13 +79,21 @@ async def get_user_crypto_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     obj_list
         list of user crypto
     """
-    obj_list = await user_crypto_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await user_crypto_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
 
 
@@ -90,10 +101,12 @@ async def get_user_crypto_list(
 @router.get(path="/my", response_model=List[UserCryptoRead])
 async def get_user_crypto_list_my(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[UserCryptoRead]:
     """
     ! Get My UserCrypto
@@ -108,6 +121,8 @@ async def get_user_crypto_list_my(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
@@ -120,10 +135,12 @@ async def get_user_crypto_list_my(
     """
     wallet = await wallet_crud.find_by_user_id(db=db, user_id=current_user.id)
     query = select(UserCrypto).where(UserCrypto.wallet_id == wallet.id)
-    obj_list = await user_crypto_crud.get_multi(
+    page = await user_crypto_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        cursor=cursor,
     )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
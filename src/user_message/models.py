@@ -1,4 +1,5 @@
-from sqlalchemy import UUID, Boolean, Column, ForeignKey, String, Text
+from sqlalchemy import UUID, Boolean, Column, ForeignKey, Index, String, Text
+from sqlalchemy import text as sql_text
 from sqlalchemy.orm import relationship
 
 from src.database.base_class import Base, BaseMixin
@@ -7,6 +8,18 @@ from src.database.base_class import Base, BaseMixin
 # ---------------------------------------------------------------------------
 class UserMessage(Base, BaseMixin):
     __tablename__ = "user_message"
+    __table_args__ = (
+        Index("ix_user_message_created_at_id", "created_at", "id"),
+        Index("ix_user_message_user_id_created_at", "user_id", "created_at", "id"),
+        # ? Unread messages of user
+        Index(
+            "ix_user_message_user_id_unread",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=sql_text("status IS NOT true"),
+        ),
+    )
 
     title = Column(String, nullable=True)
     text = Column(Text, nullable=True)
@@ -1,10 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy import or_, select
 
 from src import deps
 from src.auth.exception import AccessDeniedException
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.schema import DeleteResponse, IDRequest
 from src.user.crud import user as user_crud
@@ -182,6 +183,7 @@ async def get_user_message(
 @router.get(path="/list", response_model=List[UserMessageRead])
 async def get_user_message_list(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_USER_MESSAGE]),
@@ -189,6 +191,7 @@ async def get_user_message_list(
     filter_data: UserMessageFilter,
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[UserMessageRead]:
     """
     ! Get All User Message
@@ -203,6 +206,8 @@ async def get_user_message_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -218,12 +223,14 @@ async def get_user_message_list(
     # * Add filter fields
     query = select(UserMessage).filter(or_(filter_data.return_all, filter_data.stasus))
     # * Find All user message with filters
-    message_list = await user_message_crud.get_multi(
+    page = await user_message_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        cursor=cursor,
     )
+    message_list = set_page_headers(response=response, page=page)
     return message_list
 
 
@@ -231,11 +238,13 @@ async def get_user_message_list(
 @router.get(path="/my", response_model=List[UserMessageRead])
 async def get_user_message_list_my(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user()),
     filter_data: UserMessageFilter,
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[UserMessageRead]:
     """
     ! Get All User Message
@@ -250,6 +259,8 @@ async def get_user_message_list_my(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
     filter_data
         Filter data
 
@@ -268,10 +279,12 @@ async def get_user_message_list_my(
     # * Add filter fields
     query = query.filter(or_(filter_data.return_all, filter_data.stasus))
     # * Find All user message with filters
-    obj_list = await user_message_crud.get_multi(
+    page = await user_message_crud.get_multi_with_total(
         db=db,
         skip=skip,
         limit=limit,
         query=query,
+        cursor=cursor,
     )
+    obj_list = set_page_headers(response=response, page=page)
     return obj_list
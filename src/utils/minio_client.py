@@ -1,76 +1,525 @@
-from datetime import timedelta
+import abc
+import asyncio
+import contextlib
+import io
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, AsyncIterable, BinaryIO, Callable, TypeVar
 
 from minio import Minio
+from minio.error import S3Error
 from minio.versioningconfig import ENABLED, VersioningConfig
 from pydantic import BaseModel
 
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.metrics import track_outbound
 
-# Todo: documentation
-# ---------------------------------------------------------------
+# ---------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+ResultType = TypeVar("ResultType")
+
+
+# ---------------------------------------------------------------------------
 class IMinioResponse(BaseModel):
     bucket_name: str
     file_name: str
+    version_id: str | None = None
+
+
+# ---------------------------------------------------------------------------
+class ObjectStore(abc.ABC):
+    """
+    ! Storage of uploaded files
+    """
+
+    async def start(self) -> None:
+        return None
+
+    @abc.abstractmethod
+    async def presigned_get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        version_id: str | None = None,
+    ) -> str:
+        ...
+
+    @abc.abstractmethod
+    async def check_file_name_exists(self, bucket_name: str, file_name: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    async def put_object(
+        self,
+        bucket_name: str,
+        file_data: BinaryIO,
+        file_name: str,
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+    ) -> IMinioResponse:
+        ...
+
+    @abc.abstractmethod
+    async def put_stream(
+        self,
+        bucket_name: str,
+        chunks: AsyncIterable[bytes],
+        file_name: str,
+        content_type: str,
+    ) -> IMinioResponse:
+        ...
+
+    def shutdown(self) -> None:
+        return None
+
+
+# ---------------------------------------------------------------------------
+class ChunkReader:
+    """
+    ! Blocking file of chunks that are pushed by the event loop
+
+    The upload thread reads the file while the loop pushes request chunks,
+    at most max_chunks wait in between, so a slow store slows the client
+    down instead of filling memory.
+
+    Parameters
+    ----------
+    loop
+        Event loop that pushes chunks
+    max_chunks
+        Maximum number of pushed chunks that are not read yet
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_chunks: int = 4):
+        self._loop = loop
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=max_chunks)
+        self._buffer = bytearray()
+        self._eof = False
+        self.error: BaseException | None = None
+
+    async def push(self, chunk: bytes | None, reading: asyncio.Future) -> None:
+        """
+        ! Push chunk, None is end of file
+
+        Parameters
+        ----------
+        chunk
+            Next chunk
+        reading
+            Future of reader, raises its error when it stops early
+        """
+        put = asyncio.ensure_future(self._queue.put(chunk))
+        await asyncio.wait({put, reading}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            reading.result()
+            raise RuntimeError("Reader stopped before end of file")
+
+    def read(self, size: int = -1) -> bytes:
+        # ? Runs in upload thread
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = asyncio.run_coroutine_threadsafe(
+                self._queue.get(),
+                self._loop,
+            ).result()
+            if chunk is None:
+                if self.error is not None:
+                    raise IOError("Upload is aborted") from self.error
+                self._eof = True
+            else:
+                self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
 
+# ---------------------------------------------------------------------------
+class MinioClient(ObjectStore):
+    """
+    ! Async facade of the MinIO SDK
+
+    The SDK is blocking, so every call runs on a small thread pool instead
+    of the event loop. Presigned urls are cached per bucket, object and
+    version, a cached url always has at least half of expires to live.
+
+    Parameters
+    ----------
+    url
+        MinIO endpoint
+    access_key
+        Access key of MinIO
+    secret_key
+        Secret key of MinIO
+    buckets
+        Buckets that are created (with versioning) on start
+    region
+        Region of server, urls are signed without asking server when set
+    workers
+        Number of threads of blocking calls
+    part_size
+        Size of parts of streamed uploads, memory of every upload
+    presigned_expires_seconds
+        Life time of presigned urls
+    presigned_cache_seconds
+        Life time of cached presigned urls
+    """
 
-# ---------------------------------------------------------------
-class MinioClient:
     def __init__(
         self,
         url: str,
         access_key: str,
         secret_key: str,
-        default_bucket: str,
-        site_media_bucket: str,
-        profile_image_bucket: str,
+        buckets: list[str],
+        region: str | None = None,
+        workers: int = 4,
+        part_size: int = 5 * 1024 * 1024,
+        presigned_expires_seconds: int = 7 * 24 * 3600,
+        presigned_cache_seconds: int = 3600,
     ):
-        self.minio_url = url
-        self.access_key = access_key
-        self.secret_key = secret_key
+        self.buckets = buckets
+        self.workers = workers
+        self.part_size = part_size
+        self.presigned_expires = timedelta(seconds=presigned_expires_seconds)
+        # ? Creating client does not connect to server
         self.client = Minio(
-            endpoint=self.minio_url,
-            access_key=self.access_key,
-            secret_key=self.secret_key,
+            endpoint=url,
+            access_key=access_key,
+            secret_key=secret_key,
             secure=False,
+            region=region,
+        )
+        self._executor: ThreadPoolExecutor | None = None
+        self.presigned_window = min(
+            presigned_cache_seconds,
+            presigned_expires_seconds // 4,
+        )
+        self._presigned_urls: TTLCache[tuple[str, str, str | None], str] = TTLCache(
+            ttl_seconds=self.presigned_window,
         )
-        self.make_bucket([default_bucket, site_media_bucket, profile_image_bucket])
 
-    def make_bucket(self, buckets: list[str]) -> bool:
-        for bucket in buckets:
+    async def _run(
+        self,
+        function: Callable[..., ResultType],
+        *args: Any,
+        **kwargs: Any,
+    ) -> ResultType:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="minio",
+            )
+
+        loop = asyncio.get_running_loop()
+        with track_outbound("minio", getattr(function, "__name__", "call")):
+            return await loop.run_in_executor(
+                self._executor,
+                partial(function, *args, **kwargs),
+            )
+
+    def _make_buckets(self) -> None:
+        for bucket in self.buckets:
             if not self.client.bucket_exists(bucket):
                 self.client.make_bucket(bucket)
                 self.client.set_bucket_versioning(bucket, VersioningConfig(ENABLED))
-        return True
 
-    def presigned_get_object(self, bucket_name, object_name):
-        url = self.client.get_presigned_url(
-            bucket_name=bucket_name,
-            object_name=object_name,
-            expires=timedelta(days=7),
-        )
+    async def start(self) -> None:
+        """
+        ! Create missing buckets, once per worker
+
+        Unreachable server is logged and does not stop the application,
+        calls that need the server fail on their own.
+        """
+        try:
+            await self._run(self._make_buckets)
+        except Exception:
+            logger.exception("MinIO buckets are not prepared")
+
+    async def presigned_get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        version_id: str | None = None,
+    ) -> str:
+        """
+        ! Presigned download url of object
+
+        Parameters
+        ----------
+        bucket_name
+            Target bucket
+        object_name
+            Target object
+        version_id
+            Target version, latest version if not passed
+
+        Returns
+        -------
+        url
+            Presigned url
+        """
+        key = (bucket_name, object_name, version_id)
+        url = self._presigned_urls.get(key)
+        if url is None:
+            # ? Every worker signs the same url in a window, so browsers and
+            # ? proxies can cache the object by its url
+            now = int(time.time())
+            request_date = datetime.fromtimestamp(
+                now - now % self.presigned_window,
+                tz=timezone.utc,
+            )
+            url = await self._run(
+                self.client.presigned_get_object,
+                bucket_name=bucket_name,
+                object_name=object_name,
+                expires=self.presigned_expires,
+                request_date=request_date,
+                version_id=version_id,
+            )
+            self._presigned_urls.set(key, url)
         return url
 
-    def check_file_name_exists(self, bucket_name, file_name):
+    async def check_file_name_exists(self, bucket_name: str, file_name: str) -> bool:
+        """
+        ! Object exists in bucket
+
+        Parameters
+        ----------
+        bucket_name
+            Target bucket
+        file_name
+            Target object
+
+        Returns
+        -------
+        res
+            Object is found
+        """
         try:
-            self.client.stat_object(bucket_name=bucket_name, object_name=file_name)
-            return True
-        except Exception as e:
-            print(f"[x] Exception {e}")
+            await self._run(
+                self.client.stat_object,
+                bucket_name=bucket_name,
+                object_name=file_name,
+            )
+        except S3Error:
             return False
+        return True
 
-    def put_object(self, file_data, file_name, content_type):
-        try:
-            self.client.put_object(
-                bucket_name=self.bucket_name,
+    async def put_object(
+        self,
+        bucket_name: str,
+        file_data: BinaryIO,
+        file_name: str,
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+    ) -> IMinioResponse:
+        """
+        ! Upload object
+
+        Parameters
+        ----------
+        bucket_name
+            Target bucket
+        file_data
+            Readable file
+        file_name
+            Name of object
+        content_type
+            Content type of object
+        metadata
+            Headers of object, e.g. Cache-Control
+
+        Returns
+        -------
+        data_file
+            Stored object & its version
+        """
+        result = await self._run(
+            self.client.put_object,
+            bucket_name=bucket_name,
+            object_name=file_name,
+            data=file_data,
+            content_type=content_type,
+            length=-1,
+            part_size=10 * 1024 * 1024,
+            metadata=metadata,
+        )
+        return IMinioResponse(
+            bucket_name=bucket_name,
+            file_name=file_name,
+            version_id=result.version_id,
+        )
+
+    async def put_stream(
+        self,
+        bucket_name: str,
+        chunks: AsyncIterable[bytes],
+        file_name: str,
+        content_type: str,
+    ) -> IMinioResponse:
+        """
+        ! Upload chunks as multipart object, without buffering whole file
+
+        Chunks are read while the upload thread sends parts, one part is
+        kept in memory at a time. When chunks raise, the multipart upload
+        is aborted and the error is raised again.
+
+        Parameters
+        ----------
+        bucket_name
+            Target bucket
+        chunks
+            Content of object
+        file_name
+            Name of object
+        content_type
+            Content type of object
+
+        Returns
+        -------
+        data_file
+            Stored object & its version
+        """
+        reader = ChunkReader(loop=asyncio.get_running_loop())
+        upload = asyncio.ensure_future(
+            self._run(
+                self.client.put_object,
+                bucket_name=bucket_name,
                 object_name=file_name,
-                data=file_data,
+                data=reader,
                 content_type=content_type,
                 length=-1,
-                part_size=10 * 1024 * 1024,
-            )
-            data_file = IMinioResponse(
-                bucket_name=self.bucket_name,
-                file_name=file_name,
-            )
-            return data_file
-        except Exception as e:
-            raise e
+                part_size=self.part_size,
+            ),
+        )
+        try:
+            async for chunk in chunks:
+                await reader.push(chunk, upload)
+        except BaseException as error:
+            # ? Reader raises on end of file, so multipart upload is aborted
+            reader.error = error
+            if not upload.done():
+                with contextlib.suppress(Exception):
+                    await reader.push(None, upload)
+            await asyncio.gather(upload, return_exceptions=True)
+            raise
+        await reader.push(None, upload)
+
+        result = await upload
+        return IMinioResponse(
+            bucket_name=bucket_name,
+            file_name=file_name,
+            version_id=result.version_id,
+        )
+
+    def shutdown(self) -> None:
+        """
+        ! Stop threads of blocking calls
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# ---------------------------------------------------------------------------
+class MemoryObjectStore(ObjectStore):
+    """
+    ! Versioned objects in memory of current worker
+
+    Stand-in of MinIO for tests & local development, selected with
+    MINIO_URL=memory://. Files are fully buffered.
+    """
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], list[tuple[str, bytes, str]]] = {}
+
+    def get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        version_id: str | None = None,
+    ) -> tuple[bytes, str]:
+        """
+        ! Content & content type of object version, latest if not passed
+        """
+        versions = self.objects[(bucket_name, object_name)]
+        if version_id is None:
+            return versions[-1][1:]
+        return next(item[1:] for item in versions if item[0] == version_id)
+
+    async def presigned_get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        version_id: str | None = None,
+    ) -> str:
+        url = f"memory://{bucket_name}/{object_name}"
+        return f"{url}?versionId={version_id}" if version_id else url
+
+    async def check_file_name_exists(self, bucket_name: str, file_name: str) -> bool:
+        return (bucket_name, file_name) in self.objects
+
+    async def put_object(
+        self,
+        bucket_name: str,
+        file_data: BinaryIO,
+        file_name: str,
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+    ) -> IMinioResponse:
+        version_id = uuid.uuid4().hex
+        self.objects.setdefault((bucket_name, file_name), []).append(
+            (version_id, file_data.read(), content_type),
+        )
+        return IMinioResponse(
+            bucket_name=bucket_name,
+            file_name=file_name,
+            version_id=version_id,
+        )
+
+    async def put_stream(
+        self,
+        bucket_name: str,
+        chunks: AsyncIterable[bytes],
+        file_name: str,
+        content_type: str,
+    ) -> IMinioResponse:
+        buffer = io.BytesIO()
+        async for chunk in chunks:
+            buffer.write(chunk)
+        buffer.seek(0)
+        return await self.put_object(
+            bucket_name=bucket_name,
+            file_data=buffer,
+            file_name=file_name,
+            content_type=content_type,
+        )
+
+
+# ---------------------------------------------------------------------------
+minio_client: ObjectStore = (
+    MemoryObjectStore()
+    if settings.MINIO_URL.startswith("memory://")
+    else MinioClient(
+        url=settings.MINIO_URL,
+        access_key=settings.MINIO_ROOT_USER,
+        secret_key=settings.MINIO_ROOT_PASSWORD,
+        buckets=[
+            settings.MINIO_DEFAULT_BUCKET,
+            settings.MINIO_SITE_MEDIA_BUCKET,
+            settings.MINIO_PROFILE_IMAGE_BUCKET,
+        ],
+        region=settings.MINIO_REGION,
+        workers=settings.MINIO_WORKERS,
+        part_size=settings.MINIO_PART_SIZE,
+        presigned_expires_seconds=settings.MINIO_PRESIGNED_EXPIRE_SECONDS,
+        presigned_cache_seconds=settings.MINIO_PRESIGNED_CACHE_SECONDS,
+    )
+)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import hmac
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.exception import NumberSpaceIsFullException
+
+
+# ---------------------------------------------------------------------------
+class FeistelPermutation:
+    """
+    ! Keyed bijection on [0, domain)
+
+    A balanced feistel network over the smallest even bit width that covers
+    the domain, outputs out of the domain are walked again until they fit.
+    Every counter maps to a different random looking number.
+
+    Parameters
+    ----------
+    domain
+        Size of permuted range
+    key
+        Secret key of permutation, changing it breaks uniqueness
+    rounds
+        Number of feistel rounds
+    """
+
+    def __init__(self, domain: int, key: bytes, rounds: int = 4):
+        self.domain = domain
+        self.key = key
+        self.rounds = rounds
+        self.half_bits = max(1, ((domain - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+
+    def _round(self, number: int, value: int) -> int:
+        message = number.to_bytes(1, "big") + value.to_bytes(8, "big")
+        digest = hmac.new(self.key, message, hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], "big") & self.half_mask
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for number in range(self.rounds):
+            left, right = right, left ^ self._round(number, right)
+        return (left << self.half_bits) | right
+
+    def permute(self, value: int) -> int:
+        """
+        ! Map value of domain to its permuted value
+
+        Parameters
+        ----------
+        value
+            Value in [0, domain)
+
+        Returns
+        -------
+        permuted
+            Permuted value in [0, domain)
+        """
+        permuted = self._encrypt(value)
+        while permuted >= self.domain:
+            permuted = self._encrypt(permuted)
+        return permuted
+
+
+# ---------------------------------------------------------------------------
+class NumberAllocator:
+    """
+    ! Collision free number generator
+
+    Every worker reserves a block of counters with one ``nextval`` of a
+    postgres sequence and hands them out from memory, counters are permuted
+    into [low, high] so numbers still look random.
+
+    Parameters
+    ----------
+    name
+        Allocator name, its sequence is ``<name>_seq``
+    low
+        Smallest generated number
+    high
+        Biggest generated number
+    block_size
+        Counters reserved per ``nextval``, must never change after use
+    cyclic
+        Start over when the range is used up, for short living codes only
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        low: int,
+        high: int,
+        block_size: int = 100,
+        cyclic: bool = False,
+    ):
+        self.name = name
+        self.sequence_name = f"{name}_seq"
+        self.low = low
+        self.domain = high - low + 1
+        self.block_size = block_size
+        self.cyclic = cyclic
+        self._key = hmac.new(
+            (settings.NUMBER_PERMUTATION_KEY or settings.SECRET_KEY).encode(),
+            name.encode(),
+            hashlib.sha256,
+        ).digest()
+        self._permutation = FeistelPermutation(domain=self.domain, key=self._key)
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def _next_counter(self, db: AsyncSession) -> int:
+        async with self._lock:
+            if self._next >= self._end:
+                response = await db.execute(
+                    text("SELECT nextval(:name)"),
+                    {"name": self.sequence_name},
+                )
+                self._next = response.scalar_one() * self.block_size
+                self._end = self._next + self.block_size
+            counter = self._next
+            self._next += 1
+        return counter
+
+    async def allocate(self, db: AsyncSession) -> int:
+        """
+        ! Allocate new number
+
+        Parameters
+        ----------
+        db
+            Target database connection
+
+        Returns
+        -------
+        number
+            Allocated number
+
+        Raises
+        ------
+        NumberSpaceIsFullException
+        """
+        counter = await self._next_counter(db=db)
+        cycle, counter = divmod(counter, self.domain)
+        if cycle and not self.cyclic:
+            raise NumberSpaceIsFullException()
+
+        permutation = self._permutation
+        if cycle:
+            # ? Every cycle is shuffled with its own key
+            permutation = FeistelPermutation(
+                domain=self.domain,
+                key=self._key + cycle.to_bytes(8, "big"),
+            )
+        return self.low + permutation.permute(counter)
+
+
+# ---------------------------------------------------------------------------
+ticket_number = NumberAllocator(name="ticket_number", low=100000, high=999999)
+invoice_icart_number = NumberAllocator(
+    name="invoice_icart_number",
+    low=10_000_000,
+    high=99_999_999,
+)
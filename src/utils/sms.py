@@ -1,13 +1,330 @@
+import abc
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 
 from src.core.config import settings
+from src.core.metrics import track_outbound
 
-token = settings.KAVENEGAR_TOKEN
-base_url = "https://api.kavenegar.com/v1/{}/verify/lookup.json?".format(token)
+# ---------------------------------------------------------------------------
+logger = logging.getLogger(__name__)
+RETRYABLE_STATUSES = frozenset({408, 429})
 
 
+# ---------------------------------------------------------------------------
+class SmsMessage(BaseModel):
+    receptor: str
+    template: str
+    tokens: list[str]
+    attempts: int = 0
+    last_error: str | None = None
+
+
+# ---------------------------------------------------------------------------
+class SmsTransportError(Exception):
+    """
+    ? Provider did not accept the message
+    """
+
+
+class SmsPermanentError(SmsTransportError):
+    """
+    ? Provider rejected the message (e.g. invalid receptor), retry never helps
+    """
+
+
+# ---------------------------------------------------------------------------
+class SmsTransport(abc.ABC):
+    """
+    ? Base of sms transports, every provider implements send
+    """
+
+    @abc.abstractmethod
+    async def send(self, message: SmsMessage) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+class KavenegarTransport(SmsTransport):
+    """
+    ! Kavenegar verify lookup transport
+
+    Requests go through one pooled session on a dedicated thread pool, so
+    the event loop never waits for the provider.
+
+    Parameters
+    ----------
+    api_token
+        Kavenegar api token
+    pool_size
+        Number of pooled connections & threads
+    timeout
+        Timeout of every request in seconds
+    """
+
+    def __init__(self, api_token: str, pool_size: int, timeout: float):
+        self.url = f"https://api.kavenegar.com/v1/{api_token}/verify/lookup.json"
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size,
+            thread_name_prefix="sms",
+        )
+
+    def _send(self, message: SmsMessage) -> None:
+        params = {"receptor": message.receptor, "template": message.template}
+        for index, token in enumerate(message.tokens):
+            params["token" if index == 0 else f"token{index + 1}"] = token
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            # ? 4xx are rejected messages, except timeouts & rate limits
+            status = e.response.status_code
+            if 400 <= status < 500 and status not in RETRYABLE_STATUSES:
+                raise SmsPermanentError(str(e)) from e
+            raise SmsTransportError(str(e)) from e
+        except requests.RequestException as e:
+            raise SmsTransportError(str(e)) from e
+
+    async def send(self, message: SmsMessage) -> None:
+        loop = asyncio.get_running_loop()
+        with track_outbound("sms", message.template):
+            await loop.run_in_executor(self.executor, self._send, message)
+
+    async def close(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+
+# ---------------------------------------------------------------------------
+class FakeTransport(SmsTransport):
+    """
+    ! Local transport that keeps messages in memory, used in tests
+
+    Parameters
+    ----------
+    fail_times
+        Number of first calls that fail
+    """
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.sent: list[SmsMessage] = []
+
+    async def send(self, message: SmsMessage) -> None:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise SmsTransportError("Fake transport failure")
+        self.sent.append(message)
+
+
+# ---------------------------------------------------------------------------
+class SmsDispatcher:
+    """
+    ! Background sms sender
+
+    Handlers only put messages in a bounded queue, workers deliver them with
+    limited concurrency and retry failures with exponential backoff. Messages
+    that run out of retries (or do not fit in the queue) go to dead letters.
+
+    Parameters
+    ----------
+    transport
+        Target sms transport
+    queue_size
+        Maximum number of waiting messages
+    concurrency
+        Number of messages that are sent at the same time
+    max_retries
+        Number of retries of a failed message
+    backoff_base
+        Delay of first retry in seconds, doubled on every retry
+    backoff_max
+        Maximum delay between retries in seconds
+    dead_letter_size
+        Number of kept dead letters
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: SmsTransport,
+        queue_size: int,
+        concurrency: int,
+        max_retries: int,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        dead_letter_size: int = 1000,
+    ):
+        self.transport = transport
+        self.queue_size = queue_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.dead_letters: deque[SmsMessage] = deque(maxlen=dead_letter_size)
+        self._queue: asyncio.Queue[SmsMessage] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self._stopped = False
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """
+        ! Start workers on running event loop
+
+        Raises
+        ------
+        RuntimeError
+            Dispatcher is stopped, its transport is closed
+        """
+        if self._stopped:
+            raise RuntimeError("SMS dispatcher is stopped")
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"sms-worker-{number}")
+            for number in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        ! Deliver waiting messages and stop workers
+
+        Parameters
+        ----------
+        timeout
+            Maximum seconds to wait for waiting messages
+        """
+        if not self.is_running:
+            return
+        self._stopped = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("SMS queue stopped with %s messages", self._queue.qsize())
+
+        for task in [*self._workers, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._retries = set()
+        await self.transport.close()
+
+    def enqueue(self, message: SmsMessage) -> bool:
+        """
+        ! Put message in queue without waiting
+
+        Parameters
+        ----------
+        message
+            Target message
+
+        Returns
+        -------
+        res
+            Message is queued
+        """
+        if self._stopped:
+            self._dead_letter(message, "Dispatcher is stopped")
+            return False
+        if not self.is_running:
+            self.start()
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._dead_letter(message, "Queue is full")
+            return False
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self.transport.send(message)
+            except SmsPermanentError as e:
+                message.attempts += 1
+                self._dead_letter(message, repr(e))
+            except Exception as e:
+                self._retry(message, repr(e))
+            finally:
+                self._queue.task_done()
+
+    def _retry(self, message: SmsMessage, error: str) -> None:
+        message.attempts += 1
+        message.last_error = error
+        if message.attempts > self.max_retries:
+            self._dead_letter(message, error)
+            return
+
+        delay = min(self.backoff_base * 2 ** (message.attempts - 1), self.backoff_max)
+        task = asyncio.create_task(self._requeue_later(message, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue_later(self, message: SmsMessage, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._dead_letter(message, "Queue is full")
+
+    def _dead_letter(self, message: SmsMessage, error: str) -> None:
+        message.last_error = error
+        self.dead_letters.append(message)
+        logger.error(
+            "SMS %s to %s is dead lettered: %s",
+            message.template,
+            message.receptor,
+            error,
+        )
+
+
+# ---------------------------------------------------------------------------
+def get_sms_transport() -> SmsTransport:
+    """
+    ! Build sms transport of settings
+
+    Returns
+    -------
+    transport
+        Selected transport
+    """
+    if settings.SMS_TRANSPORT == "fake":
+        return FakeTransport()
+    return KavenegarTransport(
+        api_token=settings.KAVENEGAR_TOKEN,
+        pool_size=settings.SMS_CONCURRENCY,
+        timeout=settings.SMS_TIMEOUT_SECONDS,
+    )
+
+
+# ---------------------------------------------------------------------------
+sms_dispatcher = SmsDispatcher(
+    transport=get_sms_transport(),
+    queue_size=settings.SMS_QUEUE_SIZE,
+    concurrency=settings.SMS_CONCURRENCY,
+    max_retries=settings.SMS_MAX_RETRIES,
+)
+
+
+# ---------------------------------------------------------------------------
 def send_dynamic_password_sms(
     phone_number: str,
     dynamic_password: int,
@@ -28,23 +345,17 @@ def send_dynamic_password_sms(
     Returns
     -------
     res
-        result of operation
-    """
-    receptor = phone_number
-    token = dynamic_password
-    token2 = exp_time
-    template = "dynami-password"
-
-    url = base_url + "receptor={}&token={}&token2={}&template={}".format(
-        receptor,
-        token,
-        token2,
-        template,
+        Message is queued
+    """
+    message = SmsMessage(
+        receptor=phone_number,
+        template="dynami-password",
+        tokens=[str(dynamic_password), str(exp_time)],
     )
-    requests.get(url)
-    return True
+    return sms_dispatcher.enqueue(message)
 
 
+# ---------------------------------------------------------------------------
 def send_decrease_money_sms(
     phone_number: str,
     user_card_number: str,
@@ -66,25 +377,17 @@ def send_decrease_money_sms(
     Returns
     -------
     res
-        result of operation
-    """
-    receptor = phone_number
-    token = user_card_number
-    token2 = amount
-    token3 = current_money
-    template = "decrease-money"
-
-    url = base_url + "receptor={}&token={}&token2={}&token3{}&template={}".format(
-        receptor,
-        token,
-        token2,
-        token3,
-        template,
+        Message is queued
+    """
+    message = SmsMessage(
+        receptor=phone_number,
+        template="decrease-money",
+        tokens=[user_card_number, str(amount), str(current_money)],
     )
-    requests.get(url)
-    return True
+    return sms_dispatcher.enqueue(message)
 
 
+# ---------------------------------------------------------------------------
 def send_verify_phone_sms(
     phone_number: str,
     code: int,
@@ -101,11 +404,12 @@ def send_verify_phone_sms(
 
     Returns
     -------
-
+    res
+        Message is queued
     """
-    receptor = phone_number
-    template = "verify-phone"
-
-    url = base_url + "receptor={}&token={}&template={}".format(receptor, code, template)
-    requests.get(url)
-    return True
+    message = SmsMessage(
+        receptor=phone_number,
+        template="verify-phone",
+        tokens=[str(code)],
+    )
+    return sms_dispatcher.enqueue(message)
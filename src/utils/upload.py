@@ -0,0 +1,185 @@
+import hashlib
+from typing import AsyncIterator, NamedTuple
+
+from fastapi import Request
+
+from src.exception import FileIsTooLargeException, FileTypeIsNotAllowedException
+from src.utils.minio_client import ObjectStore
+
+# ---------------------------------------------------------------------------
+# ? Leading bytes of allowed files, content type is never taken from client
+SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+SNIFF_BYTES = max(len(signature) for signature, _ in SIGNATURES)
+DOCUMENT_TYPES = frozenset(content_type for _, content_type in SIGNATURES)
+IMAGE_TYPES = frozenset({"image/png", "image/jpeg"})
+
+
+# ---------------------------------------------------------------------------
+class StoredFile(NamedTuple):
+    file_name: str
+    version_id: str | None
+    content_type: str
+    size: int
+    sha256: str
+
+
+# ---------------------------------------------------------------------------
+def sniff_content_type(head: bytes) -> str | None:
+    """
+    ! Content type of file from its first bytes
+
+    Parameters
+    ----------
+    head
+        First bytes of file
+
+    Returns
+    -------
+    content_type
+        Detected type, None for unknown files
+    """
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+# ---------------------------------------------------------------------------
+def _verify_content_length(request: Request, max_bytes: int) -> None:
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise FileIsTooLargeException()
+
+
+# ---------------------------------------------------------------------------
+async def read_upload(
+    *,
+    request: Request,
+    max_bytes: int,
+    allowed_types: frozenset[str],
+) -> tuple[bytes, str]:
+    """
+    ! Read raw request body of small files that are processed in memory
+
+    Parameters
+    ----------
+    request
+        Request whose body is the file
+    max_bytes
+        Maximum size of file
+    allowed_types
+        Allowed sniffed content types
+
+    Returns
+    -------
+    data
+        Content of file
+    content_type
+        Sniffed content type
+
+    Raises
+    ------
+    FileIsTooLargeException
+    FileTypeIsNotAllowedException
+    """
+    _verify_content_length(request, max_bytes)
+
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > max_bytes:
+            raise FileIsTooLargeException()
+
+    content_type = sniff_content_type(bytes(data[:SNIFF_BYTES]))
+    if content_type not in allowed_types:
+        raise FileTypeIsNotAllowedException()
+    return bytes(data), content_type
+
+
+# ---------------------------------------------------------------------------
+async def store_upload(
+    *,
+    request: Request,
+    store: ObjectStore,
+    bucket_name: str,
+    file_name: str,
+    max_bytes: int,
+    allowed_types: frozenset[str] = DOCUMENT_TYPES,
+) -> StoredFile:
+    """
+    ! Stream raw request body to object store
+
+    The body is never held in memory as a whole. It is sniffed, hashed
+    and measured chunk by chunk while it is uploaded, an oversized body
+    aborts the upload.
+
+    Parameters
+    ----------
+    request
+        Request whose body is the file
+    store
+        Target object store
+    bucket_name
+        Target bucket
+    file_name
+        Name of object
+    max_bytes
+        Maximum size of file
+    allowed_types
+        Allowed sniffed content types
+
+    Returns
+    -------
+    stored
+        Stored object, its size & sha256 digest
+
+    Raises
+    ------
+    FileIsTooLargeException
+    FileTypeIsNotAllowedException
+    """
+    _verify_content_length(request, max_bytes)
+
+    body = request.stream()
+    head = b""
+    async for chunk in body:
+        head += chunk
+        if len(head) >= SNIFF_BYTES:
+            break
+    content_type = sniff_content_type(head)
+    if content_type not in allowed_types:
+        raise FileTypeIsNotAllowedException()
+
+    digest = hashlib.sha256()
+    size = 0
+
+    async def chunks() -> AsyncIterator[bytes]:
+        nonlocal size
+        pending = head
+        while pending is not None:
+            size += len(pending)
+            if size > max_bytes:
+                raise FileIsTooLargeException()
+            digest.update(pending)
+            yield pending
+            pending = await anext(body, None)
+
+    stored = await store.put_stream(
+        bucket_name=bucket_name,
+        chunks=chunks(),
+        file_name=file_name,
+        content_type=content_type,
+    )
+    return StoredFile(
+        file_name=stored.file_name,
+        version_id=stored.version_id,
+        content_type=content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+    )
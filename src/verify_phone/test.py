@@ -1,13 +1,4 @@
 #   ? verify Api
 #       * Successfully
-#       * User not authentication
-#       * Verify Permission
-#   ? Find Api
-#       * Successfully
-#       * Verify Phone Not Found
-#       * User not authentication
-#       * Verify Permission
-#   ? List Api
-#       * Successfully with complete filter
-#       * User not authentication
-#       * Verify Permission
+#       * New code replaces previous code
+#       * Code expires after DYNAMIC_PASSWORD_EXPIRE_MINUTES
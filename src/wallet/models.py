@@ -15,7 +15,7 @@ class Wallet(Base, BaseMixin):
     number = Column(String, unique=True, index=True)
 
     # ! Relations
-    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"), index=True)
     user = relationship(
         "User",
         foreign_keys=[user_id],
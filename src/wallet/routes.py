@@ -1,8 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 
 from src import deps
+from src.database.export import ExportFormat, export_response
+from src.database.loading import COLUMNS_ONLY
+from src.database.pagination import set_page_headers
 from src.permission import permission_codes as permission
 from src.schema import IDRequest
 from src.user.models import User
@@ -54,12 +58,14 @@ async def get_wallet(
 @router.get(path="/list", response_model=List[WalletRead])
 async def get_wallet_list(
     *,
+    response: Response,
     db=Depends(deps.get_db),
     current_user: User = Depends(
         deps.get_current_user_with_permissions([permission.VIEW_WALLET]),
     ),
     skip: int = 0,
     limit: int = 20,
+    cursor: str | None = None,
 ) -> List[WalletRead]:
     """
     ! Get All Wallet
@@ -74,16 +80,61 @@ async def get_wallet_list(
         Pagination skip
     limit
         Pagination limit
+    cursor
+        Pagination cursor of previous page
 
     Returns
     -------
     wallet_list
         all system wallets
     """
-    wallet_list = await wallet_crud.get_multi(db=db, skip=skip, limit=limit)
+    page = await wallet_crud.get_multi_with_total(
+        db=db,
+        skip=skip,
+        limit=limit,
+        options=COLUMNS_ONLY,
+        cursor=cursor,
+    )
+    wallet_list = set_page_headers(response=response, page=page)
     return wallet_list
 
 
+# ---------------------------------------------------------------------------
+@router.get(path="/export", response_class=StreamingResponse)
+async def export_wallet_list(
+    *,
+    current_user: User = Depends(
+        deps.get_current_user_with_permissions([permission.VIEW_WALLET]),
+    ),
+    export_format: ExportFormat = ExportFormat.CSV,
+) -> StreamingResponse:
+    """
+    ! Export All Wallet
+
+    Parameters
+    ----------
+    current_user
+        Requester User
+    export_format
+        Format of file
+
+    Returns
+    -------
+    response
+        Streamed file of wallets
+
+    Raises
+    ------
+    ServerIsBusyException
+    """
+    return export_response(
+        crud=wallet_crud,
+        schema=WalletRead,
+        filename="wallets",
+        export_format=export_format,
+    )
+
+
 # ---------------------------------------------------------------------------
 @router.get(path="/my", response_model=WalletRead)
 async def get_my_wallet(